@@ -10,6 +10,8 @@ Functions:
 """
 
 
+from src.api.http_cache import HttpCache
+from src.utils.stage_cache import StageCache
 from src.learning import learning_controller
 from src.evaluation import evaluation_controller
 
@@ -36,7 +38,7 @@ def main():
 
     if should_train:
         model, data, scaler = learning_controller.prep_data_and_train_model(
-            start_date, end_date
+            start_date, end_date, cache=HttpCache(), stage_cache=StageCache()
         )
     else:
         existing_model_folder_name = "20231121"
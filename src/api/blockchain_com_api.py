@@ -12,11 +12,53 @@ Example usage:
 
     data = fetch_blockchain_chart_data('hash-rate')
 
+Responses can be cached on disk by passing an `HttpCache`. Cached responses are reused while fresh, revalidated with
+ETag/If-Modified-Since once stale, and never expire when the request covers a closed historical range (a start date
+plus a timespan that ends before today).
+
+Requests can share a pooled `requests.Session` (see `create_session`) so connections are kept alive across charts,
+and at most `MAX_CONNECTIONS_PER_HOST` requests are in flight to the same host at once, however many threads fetch
+charts concurrently. A `BlockchainComClient` can be passed in place of a session to also get request timeouts and
+retries with exponential backoff on rate limiting, server errors and dropped connections.
+
 Functions:
-- fetch_blockchain_chart_data(chart_name, timespan=None, rolling_average=None, start=None, format='json', sampled='true'): Fetches chart data from the Blockchain.com Charts API.
+- fetch_blockchain_chart_data(chart_name, timespan=None, rolling_average=None, start=None, format='json', sampled='true', cache=None, session=None): Fetches chart data from the Blockchain.com Charts API.
+- create_session(pool_size=MAX_CONNECTIONS_PER_HOST): Creates a requests Session with a connection pool sized for concurrent fetches.
+- is_closed_range(start, timespan): Returns whether a start date and timespan cover a range that has already ended.
+
+Classes:
+- BlockchainComClient: A pooled HTTP client with timeouts and retries with exponential backoff and jitter.
+
+Constants:
+- TIMESPAN_UNITS: The length of each timespan unit accepted by the API.
+- MAX_CONNECTIONS_PER_HOST: The maximum number of concurrent requests to one host.
+- RETRY_STATUS_CODES: The HTTP status codes that are retried by BlockchainComClient.
 """
 
+import datetime
+import email.utils
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+
+TIMESPAN_UNITS = {
+    "minute": datetime.timedelta(minutes=1),
+    "hour": datetime.timedelta(hours=1),
+    "day": datetime.timedelta(days=1),
+    "week": datetime.timedelta(weeks=1),
+    "month": datetime.timedelta(days=31),
+    "year": datetime.timedelta(days=366),
+}
+MAX_CONNECTIONS_PER_HOST = 4
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
 
 
 def fetch_blockchain_chart_data(
@@ -26,6 +68,8 @@ def fetch_blockchain_chart_data(
     start=None,
     format="json",
     sampled="true",
+    cache=None,
+    session=None,
 ):
     """
     Fetches chart data from the Blockchain.com Charts API.
@@ -36,6 +80,8 @@ def fetch_blockchain_chart_data(
     :param start: The datetime at which to start the chart (optional).
     :param format: The format of the data, either 'json' or 'csv'. Defaults to 'json'.
     :param sampled: Whether to limit the number of datapoints returned for performance reasons. Defaults to 'true'.
+    :param cache: An optional HttpCache used to reuse and revalidate previously fetched responses.
+    :param session: An optional requests Session whose pooled connections are reused, e.g. from `create_session`.
     :return: The fetched chart data.
     """
     base_url = "https://api.blockchain.info/charts/"
@@ -50,9 +96,212 @@ def fetch_blockchain_chart_data(
     if start is not None:
         url += f"&start={start}"
 
-    response = requests.get(url)
+    if cache is None:
+        response = _get(url, session=session)
+    else:
+        entry = cache.get(url)
+        if entry is not None and cache.is_fresh(entry):
+            return entry["body"]
+
+        headers = cache.revalidation_headers(entry) if entry is not None else {}
+        response = _get(url, headers=headers, session=session)
+
+        if response.status_code == 304:
+            if entry is not None:
+                cache.refresh(url, entry)
+                return entry["body"]
+            # There is no cached body to reuse, so the full response is requested again, bypassing any cache
+            # between us and the server that answered the request as if it were conditional
+            response = _get(url, headers={"Cache-Control": "no-cache"}, session=session)
 
     if response.status_code == 200:
-        return response.json()  # or response.text if format is 'csv'
+        data = response.json()  # or response.text if format is 'csv'
+        if cache is not None:
+            cache.put(
+                url,
+                data,
+                response.headers,
+                permanent=is_closed_range(start, timespan),
+            )
+        return data
     else:
         response.raise_for_status()
+
+
+def create_session(pool_size=MAX_CONNECTIONS_PER_HOST):
+    """
+    Creates a requests Session whose connection pool is sized for concurrent fetches.
+
+    Connections are kept alive and reused between requests, so fetching several charts from the same host
+    only pays for the TCP and TLS handshakes once per pooled connection.
+
+    :param pool_size: The number of connections kept open per host.
+    :return: A requests Session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class BlockchainComClient:
+    def __init__(
+        self,
+        pool_size=MAX_CONNECTIONS_PER_HOST,
+        timeout=(3.05, 30),
+        max_retries=5,
+        backoff_factor=0.5,
+        max_backoff=60,
+        seed=None,
+    ):
+        """
+        Initializes the client with a pooled keep-alive session.
+
+        The client can be passed anywhere a requests Session is accepted, e.g. as the `session` argument of
+        `fetch_blockchain_chart_data`.
+
+        :param pool_size: The number of connections kept open per host.
+        :param timeout: The request timeout in seconds, or a (connect, read) tuple.
+        :param max_retries: The number of times a failed request is retried before giving up.
+        :param backoff_factor: The base delay in seconds; retry n waits a random time of up to
+                               backoff_factor * 2 ** n seconds.
+        :param max_backoff: The longest delay in seconds between two attempts, including delays requested
+                            by the server through Retry-After.
+        :param seed: An optional seed for the backoff jitter.
+        """
+        self.session = create_session(pool_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rng = random.Random(seed)
+
+    def get(self, url, headers=None):
+        """
+        Sends a GET request, retrying on connection errors, timeouts and the status codes in RETRY_STATUS_CODES.
+
+        :param url: The request URL.
+        :param headers: Optional request headers.
+        :return: The response. If every attempt returned a retryable status code, the last response is returned.
+        :raises requests.exceptions.ConnectionError: If every attempt failed to connect.
+        :raises requests.exceptions.Timeout: If every attempt timed out.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if (
+                response.status_code not in RETRY_STATUS_CODES
+                or attempt == self.max_retries
+            ):
+                return response
+
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = min(retry_after, self.max_backoff)
+            else:
+                delay = self._backoff(attempt)
+            time.sleep(delay)
+
+    def close(self):
+        """
+        Closes the pooled connections.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _backoff(self, attempt):
+        """
+        Returns the delay before the next attempt: a random time of up to backoff_factor * 2 ** attempt seconds,
+        capped at max_backoff (exponential backoff with full jitter).
+        """
+        return self.rng.uniform(
+            0, min(self.max_backoff, self.backoff_factor * 2**attempt)
+        )
+
+
+def is_closed_range(start, timespan):
+    """
+    Returns whether a start date and timespan cover a range that ended before today, so its data can no longer change.
+
+    Timespans are given as a count and a unit, e.g. '5weeks' or '1year'. Months and years are taken at their longest
+    so a range is never considered closed too early.
+
+    :param start: The start of the range, as a YYYY-MM-DD date or a Unix timestamp (optional).
+    :param timespan: The duration of the range, e.g. '5weeks' (optional).
+    :return: True if both are given and the range ends before today, otherwise False.
+    """
+    if start is None or timespan is None:
+        return False
+
+    match = re.fullmatch(r"(\d+)\s*([a-z]+?)s?", str(timespan).strip().lower())
+    if match is None or match.group(2) not in TIMESPAN_UNITS:
+        return False
+
+    if str(start).isdigit():
+        start_date = datetime.datetime.fromtimestamp(
+            int(start), tz=datetime.timezone.utc
+        ).replace(tzinfo=None)
+    else:
+        try:
+            start_date = datetime.datetime.fromisoformat(str(start))
+        except ValueError:
+            return False
+
+    end_date = start_date + int(match.group(1)) * TIMESPAN_UNITS[match.group(2)]
+    return end_date.date() < datetime.datetime.now(datetime.timezone.utc).date()
+
+
+def _get(url, headers=None, session=None):
+    """
+    Sends a GET request, waiting while `MAX_CONNECTIONS_PER_HOST` requests to the same host are in flight.
+
+    :param url: The request URL.
+    :param headers: Optional request headers.
+    :param session: An optional requests Session to send the request with.
+    :return: The response.
+    """
+    host = urlsplit(url).netloc
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.setdefault(
+            host, threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        )
+
+    with semaphore:
+        if session is not None:
+            return session.get(url, headers=headers)
+        return requests.get(url, headers=headers)
+
+
+def _parse_retry_after(value):
+    """
+    Parses a Retry-After header given either as a number of seconds or as an HTTP date.
+
+    :param value: The header value, or None.
+    :return: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
@@ -0,0 +1,188 @@
+"""
+http_cache.py
+-------------
+
+This module provides a persistent on-disk cache for HTTP API responses.
+
+Each response is stored as a JSON file named after a hash of the request URL, which encodes the chart name and all
+query parameters. Entries expire after a time-to-live, except for entries marked permanent (e.g. closed historical
+ranges, which never change). Expired entries keep their ETag and Last-Modified validators so they can be revalidated
+with a conditional request instead of downloaded again. The cache is bounded in size: when it grows past `max_bytes`,
+the least recently used entries are evicted first.
+
+Example usage:
+
+    from src.api.http_cache import HttpCache
+    from src.api.blockchain_com_api import fetch_blockchain_chart_data
+
+    cache = HttpCache('.cache/http')
+    data = fetch_blockchain_chart_data('hash-rate', cache=cache)
+
+Classes:
+- HttpCache: A size-bounded, least recently used on-disk cache of HTTP responses with a time-to-live.
+
+Constants:
+- DEFAULT_CACHE_DIR: The default directory the cache is stored in.
+- DEFAULT_TTL: The default number of seconds an entry is fresh for.
+- DEFAULT_MAX_BYTES: The default maximum total size of the cache in bytes.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_CACHE_DIR = ".cache/http"
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+class HttpCache:
+    def __init__(
+        self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES
+    ):
+        """
+        Initializes the cache, creating the cache directory if needed.
+
+        :param cache_dir: The directory the cached responses are stored in.
+        :param ttl: The number of seconds a non-permanent entry is fresh for.
+        :param max_bytes: The maximum total size of the cached responses in bytes.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def get(self, url):
+        """
+        Returns the cached entry for a URL, whether or not it is still fresh, and marks it as recently used.
+
+        :param url: The request URL, including its query parameters.
+        :return: The entry as a dictionary with 'body', 'etag', 'last_modified', 'fetched_at' and 'permanent' keys,
+                 or None if the URL is not cached.
+        """
+        path = self._path(url)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # The modification time records the last use, for least recently used eviction. The entry may have been
+        # evicted by another thread or process since it was read, which counts as a miss
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """
+        Returns whether a cached entry can be used without contacting the server.
+
+        :param entry: An entry returned by `get`.
+        :return: True if the entry is permanent or younger than the time-to-live.
+        """
+        return entry["permanent"] or time.time() - entry["fetched_at"] < self.ttl
+
+    def put(self, url, body, headers=None, permanent=False):
+        """
+        Stores a response, then evicts least recently used entries until the cache fits in `max_bytes`.
+
+        :param url: The request URL, including its query parameters.
+        :param body: The JSON-serializable response body.
+        :param headers: The response headers, from which the ETag and Last-Modified validators are kept.
+        :param permanent: Whether the response never changes, so the entry never expires.
+        """
+        headers = headers or {}
+        entry = {
+            "url": url,
+            "body": body,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "permanent": permanent,
+        }
+
+        # Write to a temporary file first so readers never see a partial entry. The temporary file has a unique name,
+        # so threads and processes storing the same URL concurrently do not write to the same file
+        path = self._path(url)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(entry, f)
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.remove(f.name)
+            raise
+
+        self._evict()
+
+    def refresh(self, url, entry):
+        """
+        Marks a cached entry as fresh again after the server confirmed it is unchanged (HTTP 304).
+
+        :param url: The request URL, including its query parameters.
+        :param entry: The entry returned by `get`.
+        """
+        self.put(
+            url,
+            entry["body"],
+            {"ETag": entry["etag"], "Last-Modified": entry["last_modified"]},
+            permanent=entry["permanent"],
+        )
+
+    def revalidation_headers(self, entry):
+        """
+        Builds the conditional request headers for revalidating a stale entry.
+
+        :param entry: The entry returned by `get`.
+        :return: A dictionary with If-None-Match and/or If-Modified-Since headers, empty if the server
+                 sent no validators.
+        """
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def clear(self):
+        """
+        Removes every cached entry.
+        """
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def _path(self, url):
+        """
+        Returns the file path of the entry for a URL.
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache fits in `max_bytes`.
+        """
+        # Other threads or processes may evict the same entries concurrently, so missing files are skipped
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,17 +1,24 @@
 """
-This module provides a function for fetching historical Bitcoin data from Yahoo Finance, calculating log returns, and cleaning the data.
+This module provides functions for fetching historical price data from Yahoo Finance.
 
-Function:
+Functions:
 - fetch_bitcoin_data: Fetches historical Bitcoin data from Yahoo Finance, calculates log returns, and cleans the data.
+- fetch_price_data: Fetches the historical prices of several tickers from Yahoo Finance in one bulk request.
+
+Constants:
+- PRICE_FIELDS: The price fields kept for every ticker.
 
 This module uses the yfinance library to fetch data and the data_cleaning module to clean the data.
 """
 
 import yfinance as yf
 import numpy as np
+import pandas as pd
 
 from src.data.data_cleaning import clean_data
 
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
 
 def fetch_bitcoin_data(start_date, end_date, interval="1d"):
     """
@@ -43,3 +50,33 @@ def fetch_bitcoin_data(start_date, end_date, interval="1d"):
     btc_data = clean_data(btc_data)
 
     return btc_data
+
+
+def fetch_price_data(tickers, start_date, end_date, interval="1d"):
+    """
+    Fetches the historical prices of several tickers (e.g. 'BTC-USD', 'ETH-USD', 'SOL-USD') from Yahoo Finance in one
+    bulk request.
+
+    Dates on which a ticker has no data, such as the dates before it was listed, are left as NaN.
+
+    :param tickers: A list of Yahoo Finance tickers.
+    :param start_date: The start date for the data in YYYY-MM-DD format.
+    :param end_date: The end date for the data in YYYY-MM-DD format.
+    :param interval: The interval for the data (e.g., '1d' for daily data, '1wk' for weekly data, '1mo' for monthly data).
+    :return: A Pandas DataFrame with (field, ticker) columns for the fields in PRICE_FIELDS and the requested tickers, in
+             order.
+    """
+    tickers = list(tickers)
+    data = yf.download(
+        tickers,
+        start=start_date,
+        end=end_date,
+        interval=interval,
+        group_by="column",
+        auto_adjust=True,
+        progress=False,
+    )
+    # The yfinance version in requirements.txt returns single-level (field) columns when there is one ticker
+    if data.columns.nlevels == 1:
+        data.columns = pd.MultiIndex.from_product([data.columns, tickers])
+    return data.reindex(columns=pd.MultiIndex.from_product([PRICE_FIELDS, tickers]))
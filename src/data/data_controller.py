@@ -2,58 +2,146 @@
 This module provides functions to control the data fetching, cleaning, feature engineering process, and loading of data and scalers.
 
 Functions:
-- main: Fetches Bitcoin data, adds blockchain data, adds technical indicators, normalizes the data, extracts features using an LSTM model, and stores the resulting DataFrame in a CSV file.
-- load_data: Loads a DataFrame from a CSV file.
+- main: Fetches Bitcoin data, adds blockchain data, adds technical indicators, normalizes the data, extracts features using an LSTM model, and stores the resulting DataFrame in the model directory.
+- build_panel: Fetches the prices of many assets in one request and builds their normalized features as one panel.
+- save_data: Stores a DataFrame in the model directory as CSV, Parquet or Feather.
+- load_data: Loads a DataFrame from a CSV, Parquet or Feather file.
+- find_data_path: Finds the stored data file in a model directory.
 - load_scaler: Loads a scaler object from a file.
 
-This module uses functions from the src.api, src.data, and src.features modules. The resulting DataFrame is stored in a CSV file in the specified model directory.
+This module uses functions from the src.api, src.data, and src.features modules. The resulting DataFrame is stored in the specified model directory,
+either as a CSV file or in a binary columnar format (Parquet or Feather) that preserves dtypes and the DatetimeIndex and supports
+reading a subset of the columns. Given a StageCache, `main` skips every stage whose inputs, parameters and code are
+unchanged since a previous run.
+
+Constants:
+- DATA_FILENAMES: The file name of the stored data for each supported format, in the order `find_data_path` prefers them.
+- DEFAULT_DATA_FORMAT: The format `main` stores the data in by default.
+- FEATHER_INDEX_COLUMN: The column the index is stored in for Feather files.
+- LSTM_SEQUENCE_LENGTH: The length of the sequences the LSTM encoder is trained on.
+- LSTM_ENCODER_FILENAME: The file name of the trained LSTM encoder in the model directory.
+- LSTM_SCALER_FILENAME: The file name of the scaler that normalizes the data for the LSTM encoder.
 """
+
+import os
+
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 import pandas as pd
 import joblib
 
-from src.api.yfinance import fetch_bitcoin_data
+from src.api.yfinance import fetch_bitcoin_data, fetch_price_data
+from src.data import incremental
 from src.data.data_cleaning import clean_data, normalize_data
+from src.data.panel import (
+    PricePanel,
+    add_log_returns,
+    add_technical_indicators,
+    normalize_panel,
+)
 from src.features.feature_engineering import (
     add_all_technical_indicators,
     add_blockchain_data,
-    extract_lstm_features,
+    train_lstm_encoder,
+    add_lstm_features,
 )
-
-
-def main(start_date, end_date, model_dir):
+from src.features.extraction.lstm import save_encoder, load_encoder
+
+DATA_FILENAMES = {
+    "parquet": "data.parquet",
+    "feather": "data.feather",
+    "csv": "data.csv",
+}
+DEFAULT_DATA_FORMAT = "parquet"
+FEATHER_INDEX_COLUMN = "__index_level_0__"
+LSTM_SEQUENCE_LENGTH = 30
+LSTM_ENCODER_FILENAME = "lstm_encoder.h5"
+LSTM_SCALER_FILENAME = "lstm_scaler.pkl"
+
+
+def main(
+    start_date,
+    end_date,
+    model_dir,
+    cache=None,
+    store_dir=None,
+    data_format=DEFAULT_DATA_FORMAT,
+    stage_cache=None,
+    encoder_dir=None,
+):
     """
     Main function to control the data fetching, cleaning, and feature engineering process.
 
     This function fetches Bitcoin data, adds blockchain data, adds technical indicators, normalizes the data,
-    and finally extracts features using an LSTM model. The resulting DataFrame is stored in a CSV file in the
-    specified model directory.
+    and finally extracts features using an LSTM model. The resulting DataFrame is stored in the specified model
+    directory, as a Parquet file by default.
 
     :param start_date: The start date for the data in YYYY-MM-DD format.
     :param end_date: The end date for the data in YYYY-MM-DD format.
-    :param model_dir: The directory where the resulting DataFrame will be stored as a CSV file.
+    :param model_dir: The directory where the resulting DataFrame will be stored.
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged blockchain data on reruns.
+    :param store_dir: An optional directory of an incremental store. If given, only the data added since the
+                      previous run is fetched and has its technical indicators computed (see src.data.incremental).
+    :param data_format: The format the resulting DataFrame is stored in, one of 'csv', 'parquet' or 'feather'.
+    :param stage_cache: An optional StageCache. If given, each stage whose inputs, parameters and code are unchanged
+                        since a previous run is skipped and its stored result is used (see src.utils.stage_cache).
+                        The fetching stages are only cached for date ranges that have ended.
+    :param encoder_dir: An optional model directory of a previous run. If given, its LSTM encoder and scaler are
+                        loaded and only run, instead of training a new encoder. Either way, the encoder and scaler
+                        used are stored in `model_dir`.
     :return: A cleaned DataFrame with the extracted features and target variable.
     """
-    # Fetch initial data
-    print("fetching data...")
-    df = fetch_bitcoin_data(start_date, end_date)
-
-    # Add features
-    print("adding features...")
-    df = add_all_technical_indicators(df)
-    df = add_blockchain_data(df, timespan="5years", start=start_date)
+    # Data for a range that has not ended yet changes between runs, so it is always fetched
+    fetch_cache = stage_cache if _is_closed_range(end_date) else None
+
+    if store_dir is not None:
+        # Fetch and add features for the new data only
+        print("refreshing data incrementally...")
+        df = incremental.refresh(store_dir, start_date, end_date, cache=cache)
+    else:
+        # Fetch initial data
+        print("fetching data...")
+        df = _run_stage(fetch_cache, fetch_bitcoin_data, start_date, end_date)
+
+        # Add features
+        print("adding features...")
+        df = _run_stage(stage_cache, add_all_technical_indicators, df)
+        df = _run_stage(
+            fetch_cache,
+            add_blockchain_data,
+            df,
+            timespan="5years",
+            start=start_date,
+            cache=cache,
+            ignore=("cache",),
+        )
 
     # Temporarily remove the log returns column
     log_returns = df.pop("log_return")
 
     # Normalize the data before extraction
     print("normalizing data...")
-    df, scaler = normalize_data(df)
+    if encoder_dir is None:
+        df, scaler = _run_stage(stage_cache, normalize_data, df)
+    else:
+        # Normalize the data like the data the encoder was trained on
+        scaler = load_scaler(os.path.join(encoder_dir, LSTM_SCALER_FILENAME))
+        df = pd.DataFrame(scaler.transform(df), columns=df.columns, index=df.index)
+    joblib.dump(scaler, os.path.join(str(model_dir), LSTM_SCALER_FILENAME))
 
     # Extract features
     print("extracting additional features using lstm...")
-    df = extract_lstm_features(df, sequence_length=30)
+    if encoder_dir is None:
+        encoder = _run_stage(
+            stage_cache,
+            train_lstm_encoder,
+            df,
+            sequence_length=LSTM_SEQUENCE_LENGTH,
+        )
+    else:
+        encoder = load_encoder(os.path.join(encoder_dir, LSTM_ENCODER_FILENAME))
+    save_encoder(encoder, os.path.join(str(model_dir), LSTM_ENCODER_FILENAME))
+    df = add_lstm_features(df, encoder)
 
     # add the target variable
     df["target"] = (df["Close"].shift(-1) > df["Close"]).astype(int)
@@ -64,7 +152,7 @@ def main(start_date, end_date, model_dir):
 
     # Analyze feature importance
     print("analyzing feature importance...")
-    top_features = analyze_feature_importance(df)
+    top_features = _run_stage(stage_cache, analyze_feature_importance, df)
 
     # Remove the target adn lstm features columns before inverse transforming
     target = df.pop("target")
@@ -82,29 +170,130 @@ def main(start_date, end_date, model_dir):
     df = df[top_features + ["target"] + ["log_return"]]
 
     # store the data in the model directory
-    df.to_csv(f"{model_dir}/data.csv")
+    save_data(df, model_dir, data_format)
 
     return df
 
 
-def load_data(data_path):
+def build_panel(tickers, start_date, end_date, stage_cache=None):
     """
-    Load a DataFrame from a CSV file.
+    Fetches the prices of many assets in one request and builds their normalized features as one panel.
 
-    :param data_path: The path to the CSV file.
-    :return: A DataFrame containing the data.
+    Every stage runs once for all assets instead of once per asset: the prices are fetched with one bulk request, and
+    the log returns, technical indicators and normalization are computed for all assets together (see src.data.panel).
+    The blockchain data and LSTM features of `main` are specific to Bitcoin and are not added.
+
+    :param tickers: A list of Yahoo Finance tickers, e.g. ['BTC-USD', 'ETH-USD', 'SOL-USD'].
+    :param start_date: The start date for the data in YYYY-MM-DD format.
+    :param end_date: The end date for the data in YYYY-MM-DD format.
+    :param stage_cache: An optional StageCache, used like in `main`.
+    :return: A tuple of the normalized PricePanel, with the prices, technical indicators and raw 'log_return' of every
+             asset, and the fitted PanelScaler.
     """
-    data = pd.read_csv(data_path, index_col=0)
+    fetch_cache = stage_cache if _is_closed_range(end_date) else None
+
+    print("fetching panel data...")
+    frame = _run_stage(
+        fetch_cache, fetch_price_data, list(tickers), start_date, end_date
+    )
+    panel = add_log_returns(PricePanel.from_frame(frame))
+
+    print("adding features...")
+    panel = _run_stage(stage_cache, add_technical_indicators, panel)
+
+    print("normalizing data...")
+    return normalize_panel(panel, exclude=("log_return",))
 
-    # convert the index to datetime
-    data.index = pd.to_datetime(data.index)
 
-    # set the frequency of the index
-    data.index = pd.date_range(start=data.index[0], periods=len(data), freq="D")
+def save_data(df, model_dir, data_format=DEFAULT_DATA_FORMAT):
+    """
+    Store a DataFrame in the model directory.
+
+    The binary formats store the index as a DatetimeIndex and keep the column dtypes, so the data can be loaded
+    without parsing text.
+
+    :param df: The DataFrame to store.
+    :param model_dir: The directory where the DataFrame will be stored.
+    :param data_format: The storage format, one of 'csv', 'parquet' or 'feather'.
+    :return: The path of the stored file.
+    """
+    if data_format not in DATA_FILENAMES:
+        raise ValueError(f"Unsupported data format: {data_format}")
+    data_path = os.path.join(str(model_dir), DATA_FILENAMES[data_format])
+
+    if data_format == "csv":
+        df.to_csv(data_path)
+        return data_path
+
+    df = df.copy()
+    df.index = pd.to_datetime(df.index)
+    if data_format == "parquet":
+        df.to_parquet(data_path)
+    else:
+        # Feather files cannot store an index, so it is kept as a column
+        df.index.name = FEATHER_INDEX_COLUMN
+        df.reset_index().to_feather(data_path)
+    return data_path
+
+
+def load_data(data_path, columns=None):
+    """
+    Load a DataFrame from a CSV, Parquet or Feather file, chosen by the file extension.
+
+    :param data_path: The path to the data file.
+    :param columns: An optional list of columns to load. For Parquet and Feather files the other columns are never read.
+    :return: A DataFrame containing the data.
+    """
+    data_path = str(data_path)
+    extension = os.path.splitext(data_path)[1]
+
+    if extension in (".parquet", ".feather"):
+        if extension == ".parquet":
+            data = pd.read_parquet(data_path, columns=columns)
+        else:
+            read_columns = None if columns is None else [FEATHER_INDEX_COLUMN] + columns
+            data = pd.read_feather(data_path, columns=read_columns)
+            data = data.set_index(FEATHER_INDEX_COLUMN)
+            data.index.name = None
+
+        # restore the frequency of the index, which binary formats do not store
+        if len(data) >= 3:
+            data.index.freq = pd.infer_freq(data.index)
+    else:
+        usecols = None
+        if columns is not None:
+            header = pd.read_csv(data_path, nrows=0).columns.tolist()
+            usecols = [0] + [header.index(column) for column in columns]
+        data = pd.read_csv(data_path, index_col=0, usecols=usecols)
+
+        # convert the index to datetime
+        data.index = pd.to_datetime(data.index)
+
+        # set the frequency of the index
+        data.index = pd.date_range(start=data.index[0], periods=len(data), freq="D")
+
+    # return the projected columns in the requested order
+    if columns is not None:
+        data = data[columns]
 
     return data
 
 
+def find_data_path(model_dir):
+    """
+    Find the stored data file in a model directory, preferring the binary formats over CSV.
+
+    :param model_dir: The model directory.
+    :return: The path of the data file.
+    :raises FileNotFoundError: If the directory contains no data file.
+    """
+    for filename in DATA_FILENAMES.values():
+        data_path = os.path.join(model_dir, filename)
+        if os.path.exists(data_path):
+            return data_path
+    raise FileNotFoundError(f"No data file found in {model_dir}")
+
+
 def load_scaler(scaler_path):
     """
     Load a scaler object from a file.
@@ -116,6 +305,27 @@ def load_scaler(scaler_path):
     return scaler
 
 
+def _run_stage(stage_cache, func, *args, ignore=(), **kwargs):
+    """
+    Runs a pipeline stage, through the stage cache if one is given.
+
+    :param stage_cache: An optional StageCache.
+    :param func: The stage function.
+    :param ignore: The names of keyword arguments left out of the cache key.
+    :return: The result of `func(*args, **kwargs)`.
+    """
+    if stage_cache is None:
+        return func(*args, **kwargs)
+    return stage_cache.run(func, *args, ignore=ignore, **kwargs)
+
+
+def _is_closed_range(end_date):
+    """
+    Returns whether a date range ending on `end_date` has ended, so the data fetched for it no longer changes.
+    """
+    return pd.Timestamp(end_date) < pd.Timestamp.now().normalize()
+
+
 def analyze_feature_importance(df, target_column="target", top_percent=0.5):
     """
     Analyze feature importance using a Random Forest model and return the top percent of features.
@@ -0,0 +1,108 @@
+"""
+This module provides functions to store and open the normalized feature matrix of a model directory as memory-mapped
+NumPy arrays.
+
+The matrix holds the training states (the normalized features followed by the raw log return) as float32, next to a
+float64 log-return vector, an index vector (datetime64 for time-indexed data) and a JSON header describing the
+columns. The arrays are opened with `numpy.load(mmap_mode='r')`, so opening them is zero-copy: every process that
+opens the same model directory shares one page-cached copy of the data instead of loading and normalizing its own
+DataFrame, and slices of the arrays are views that are only paged in when they are read.
+
+Functions:
+- save_feature_matrix: Stores the prepared training data of a model directory as NumPy arrays.
+- load_feature_matrix: Opens the stored arrays of a model directory as read-only memory maps.
+- has_feature_matrix: Returns whether a model directory holds a stored feature matrix.
+
+Constants:
+- FEATURES_FILENAME: The file name of the float32 feature matrix.
+- LOG_RETURNS_FILENAME: The file name of the float64 log-return vector.
+- INDEX_FILENAME: The file name of the index vector.
+- HEADER_FILENAME: The file name of the JSON header.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FEATURES_FILENAME = "features.npy"
+LOG_RETURNS_FILENAME = "log_returns.npy"
+INDEX_FILENAME = "index.npy"
+HEADER_FILENAME = "features.json"
+
+
+def save_feature_matrix(training_data, model_dir):
+    """
+    Stores the prepared training data of a model directory as NumPy arrays.
+
+    :param training_data: A DataFrame with the normalized features and the raw 'log_return' column, as used to
+                          build the trading environment.
+    :param model_dir: The directory where the arrays are stored.
+    :return: The path of the feature matrix file.
+    """
+    features = np.ascontiguousarray(training_data.to_numpy(dtype=np.float32))
+    log_returns = training_data["log_return"].to_numpy(dtype=np.float64)
+    index = training_data.index
+    if isinstance(index, pd.DatetimeIndex):
+        # Time zones are dropped so the index stores as a plain datetime64 array
+        if index.tz is not None:
+            index = index.tz_localize(None)
+    index = index.to_numpy()
+
+    np.save(os.path.join(model_dir, FEATURES_FILENAME), features)
+    np.save(os.path.join(model_dir, LOG_RETURNS_FILENAME), log_returns)
+    np.save(os.path.join(model_dir, INDEX_FILENAME), index)
+
+    header = {
+        "columns": [str(column) for column in training_data.columns],
+        "num_steps": int(features.shape[0]),
+        "num_features": int(features.shape[1]),
+        "dtype": str(features.dtype),
+    }
+    with open(os.path.join(model_dir, HEADER_FILENAME), "w") as f:
+        json.dump(header, f, indent=2)
+
+    return os.path.join(model_dir, FEATURES_FILENAME)
+
+
+def load_feature_matrix(model_dir, start=0, stop=None):
+    """
+    Opens the stored arrays of a model directory as read-only memory maps.
+
+    :param model_dir: The directory where the arrays are stored.
+    :param start: The first step to include.
+    :param stop: The step to stop before, or None to include every remaining step.
+    :return: A tuple of the feature matrix (steps, features), the log-return vector, the index vector and the list of
+             column names. The arrays are views of the memory maps, so no data is read until it is accessed.
+    """
+    features = np.load(os.path.join(model_dir, FEATURES_FILENAME), mmap_mode="r")
+    log_returns = np.load(os.path.join(model_dir, LOG_RETURNS_FILENAME), mmap_mode="r")
+    index = np.load(os.path.join(model_dir, INDEX_FILENAME), mmap_mode="r")
+
+    with open(os.path.join(model_dir, HEADER_FILENAME)) as f:
+        header = json.load(f)
+
+    return (
+        features[start:stop],
+        log_returns[start:stop],
+        index[start:stop],
+        header["columns"],
+    )
+
+
+def has_feature_matrix(model_dir):
+    """
+    Returns whether a model directory holds a stored feature matrix.
+
+    :param model_dir: The directory to check.
+    :return: True if the header and all arrays exist.
+    """
+    return all(
+        os.path.exists(os.path.join(model_dir, filename))
+        for filename in (
+            FEATURES_FILENAME,
+            LOG_RETURNS_FILENAME,
+            INDEX_FILENAME,
+            HEADER_FILENAME,
+        )
+    )
@@ -0,0 +1,302 @@
+"""
+This module provides an incremental, append-only refresh of the price and on-chain data.
+
+Instead of refetching the full date range on every run, the last fetched timestamp of each source is persisted, only
+the new tail is fetched, and it is appended to a local columnar store of Parquet part files. Technical indicators are
+then recomputed only for the new rows, over a trailing window of earlier rows long enough for the indicators to
+warm up.
+
+Recursive indicators (EMA, MACD, RSI, ATR) depend on their whole history, so recomputing them over a trailing window
+is an approximation. With INDICATOR_LOOKBACK rows of history the rows outside the window change the default-period
+indicators by less than one part in a million. Cumulative indicators such as OBV are continued from their last stored
+value instead.
+
+Classes:
+- IncrementalStore: An append-only store of one DataFrame per source, kept as Parquet part files.
+
+Functions:
+- refresh: Brings every source in a store up to date and returns the merged dataset.
+- refresh_prices: Fetches the Bitcoin prices since the last stored timestamp.
+- refresh_charts: Fetches the blockchain charts since their last stored timestamps.
+- refresh_indicators: Computes the technical indicators for the price rows that do not have them yet.
+
+Constants:
+- CHART_NAMES: The blockchain.com charts kept in the store.
+- INDICATOR_LOOKBACK: The number of rows before the new rows used to warm up the indicators.
+- CUMULATIVE_INDICATORS: The indicators that accumulate over the whole history and are continued from the stored value.
+"""
+import datetime
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.api.blockchain_com_api import BlockchainComClient
+from src.api.yfinance import fetch_bitcoin_data
+from src.features.blockchain import get_blockchain_data
+from src.features.feature_engineering import (
+    add_all_technical_indicators,
+    merge_blockchain_data,
+)
+
+CHART_NAMES = [
+    "hash-rate",
+    "avg-block-size",
+    "difficulty",
+    "miners-revenue",
+    "mempool-size",
+]
+INDICATOR_LOOKBACK = 250
+CUMULATIVE_INDICATORS = ("obv",)
+
+
+class IncrementalStore:
+    def __init__(self, store_dir):
+        """
+        Initializes the store, creating the store directory if needed.
+
+        Each source is kept in its own subdirectory of Parquet part files, and the last stored timestamp of every
+        source is kept in a 'state.json' file.
+
+        :param store_dir: The directory the store is kept in.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        self.store_dir = store_dir
+        self.state_path = os.path.join(store_dir, "state.json")
+
+    def last_timestamp(self, source):
+        """
+        Returns the last stored timestamp of a source.
+
+        :param source: The name of the source.
+        :return: The last stored timestamp as a pandas Timestamp, or None if nothing is stored for the source.
+        """
+        timestamp = self._load_state().get(source)
+        return pd.Timestamp(timestamp) if timestamp is not None else None
+
+    def append(self, source, data):
+        """
+        Appends the rows of a DataFrame that are newer than the last stored timestamp of a source.
+
+        :param source: The name of the source.
+        :param data: A DataFrame with a DatetimeIndex.
+        :return: The number of rows appended.
+        """
+        last = self.last_timestamp(source)
+        if last is not None:
+            data = data[data.index > last]
+        if data.empty:
+            return 0
+
+        data = data.sort_index()
+        source_dir = os.path.join(self.store_dir, source)
+        os.makedirs(source_dir, exist_ok=True)
+        part_name = "part-{:%Y%m%d%H%M%S}-{:%Y%m%d%H%M%S}.parquet".format(
+            data.index[0], data.index[-1]
+        )
+        data.to_parquet(os.path.join(source_dir, part_name))
+
+        state = self._load_state()
+        state[source] = data.index[-1].isoformat()
+        self._save_state(state)
+        return len(data)
+
+    def load(self, source, columns=None):
+        """
+        Loads every stored row of a source.
+
+        :param source: The name of the source.
+        :param columns: An optional list of columns to read, so other columns are never loaded.
+        :return: A DataFrame sorted by its index, empty if nothing is stored for the source.
+        """
+        paths = sorted(glob.glob(os.path.join(self.store_dir, source, "*.parquet")))
+        if not paths:
+            return pd.DataFrame()
+        parts = [pd.read_parquet(path, columns=columns) for path in paths]
+        return pd.concat(parts).sort_index()
+
+    def compact(self, source):
+        """
+        Rewrites the part files of a source as a single part file, so loading does not slow down as daily parts
+        accumulate.
+
+        :param source: The name of the source.
+        """
+        source_dir = os.path.join(self.store_dir, source)
+        paths = sorted(glob.glob(os.path.join(source_dir, "*.parquet")))
+        if len(paths) < 2:
+            return
+
+        data = self.load(source)
+        part_name = "part-{:%Y%m%d%H%M%S}-{:%Y%m%d%H%M%S}.parquet".format(
+            data.index[0], data.index[-1]
+        )
+        temp_path = os.path.join(source_dir, f"{part_name}.tmp")
+        data.to_parquet(temp_path)
+        for path in paths:
+            os.remove(path)
+        os.replace(temp_path, os.path.join(source_dir, part_name))
+
+    def _load_state(self):
+        """
+        Loads the last stored timestamps of all sources.
+        """
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        """
+        Saves the last stored timestamps of all sources, replacing the state file atomically.
+        """
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+
+def refresh(store_dir, start_date, end_date, cache=None, session=None):
+    """
+    Brings every source in a store up to date and returns the merged dataset.
+
+    The result matches the DataFrame built by fetching the prices, adding the technical indicators and adding
+    the blockchain data in `data_controller.main`, but only the rows added since the previous refresh are fetched
+    and computed.
+
+    :param store_dir: The directory of the IncrementalStore.
+    :param start_date: The start date for the data in YYYY-MM-DD format, used for sources with nothing stored yet.
+    :param end_date: The end date for the data in YYYY-MM-DD format.
+    :param cache: An optional HttpCache used for the blockchain chart requests.
+    :param session: An optional requests Session or BlockchainComClient used for the blockchain chart requests.
+    :return: A DataFrame with the prices, technical indicators and blockchain data from `start_date` onwards.
+    """
+    store = IncrementalStore(store_dir)
+
+    refresh_prices(store, start_date, end_date)
+    refresh_indicators(store)
+    refresh_charts(store, start_date, end_date, cache=cache, session=session)
+
+    data = store.load("features")
+    data = data[data.index >= pd.Timestamp(start_date)]
+    charts = []
+    for chart_name in CHART_NAMES:
+        chart = store.load(chart_name)
+        if chart.empty:
+            chart = pd.DataFrame(columns=[chart_name], index=pd.DatetimeIndex([]))
+        charts.append(chart)
+    return merge_blockchain_data(data, *charts)
+
+
+def refresh_prices(store, start_date, end_date):
+    """
+    Fetches the Bitcoin prices since the last stored timestamp and appends them to the store.
+
+    The fetch starts at the last stored day, so the log return of the first new day can be calculated.
+
+    :param store: The IncrementalStore to update.
+    :param start_date: The start date in YYYY-MM-DD format, used if no prices are stored yet.
+    :param end_date: The end date in YYYY-MM-DD format.
+    :return: The number of rows appended.
+    """
+    last = store.last_timestamp("prices")
+    fetch_start = last.strftime("%Y-%m-%d") if last is not None else start_date
+    if pd.Timestamp(fetch_start) >= pd.Timestamp(end_date):
+        return 0
+
+    prices = fetch_bitcoin_data(fetch_start, end_date)
+    return store.append("prices", _naive_index(prices))
+
+
+def refresh_indicators(store, lookback=INDICATOR_LOOKBACK):
+    """
+    Computes the technical indicators for the price rows that do not have them yet and appends them to the store.
+
+    Only the new rows, plus `lookback` earlier rows to warm the indicators up, are passed through
+    `add_all_technical_indicators`.
+
+    :param store: The IncrementalStore to update.
+    :param lookback: The number of rows before the new rows included in the computation.
+    :return: The number of rows appended.
+    """
+    prices = store.load("prices")
+    if prices.empty:
+        return 0
+
+    last = store.last_timestamp("features")
+    first_new = 0 if last is None else prices.index.searchsorted(last, side="right")
+    if first_new >= len(prices):
+        return 0
+
+    window = prices.iloc[max(0, first_new - lookback) :].copy()
+    features = add_all_technical_indicators(window)
+    if last is not None:
+        # Cumulative indicators restart from zero at the start of the window, so continue them from the stored value
+        stored = store.load("features", columns=list(CUMULATIVE_INDICATORS)).iloc[-1]
+        for column in CUMULATIVE_INDICATORS:
+            features[column] += stored[column] - features.loc[last, column]
+        features = features[features.index > last]
+    return store.append("features", features)
+
+
+def refresh_charts(store, start_date, end_date, cache=None, session=None):
+    """
+    Fetches the blockchain charts since their last stored timestamps, concurrently, and appends them to the store.
+
+    A chart whose fetch fails keeps its stored data and is retried on the next refresh.
+
+    :param store: The IncrementalStore to update.
+    :param start_date: The start date in YYYY-MM-DD format, used for charts with nothing stored yet.
+    :param end_date: The end date in YYYY-MM-DD format.
+    :param cache: An optional HttpCache used for the requests.
+    :param session: An optional requests Session or BlockchainComClient used for the requests. A
+                    BlockchainComClient is created (and closed afterwards) if none is given.
+    :return: A dictionary with the number of rows appended for each chart.
+    """
+    end = pd.Timestamp(end_date)
+    requests_by_chart = {}
+    for chart_name in CHART_NAMES:
+        last = store.last_timestamp(chart_name)
+        start = last.normalize() if last is not None else pd.Timestamp(start_date)
+        days = (end - start).days + 1
+        if last is None or last < end - datetime.timedelta(days=1):
+            requests_by_chart[chart_name] = (start.strftime("%Y-%m-%d"), days)
+
+    owns_session = session is None
+    if owns_session:
+        session = BlockchainComClient()
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(CHART_NAMES)) as pool:
+            futures = {
+                chart_name: pool.submit(
+                    get_blockchain_data,
+                    chart_name,
+                    timespan=f"{days}days",
+                    start_date=start,
+                    cache=cache,
+                    session=session,
+                )
+                for chart_name, (start, days) in requests_by_chart.items()
+            }
+            charts = {name: future.result() for name, future in futures.items()}
+    finally:
+        if owns_session:
+            session.close()
+
+    appended = {}
+    for chart_name, chart in charts.items():
+        appended[chart_name] = 0 if chart is None else store.append(chart_name, chart)
+    return appended
+
+
+def _naive_index(data):
+    """
+    Drops the time zone of a DataFrame's DatetimeIndex, so timestamps compare with the store's naive timestamps.
+    """
+    if getattr(data.index, "tz", None) is not None:
+        data = data.copy()
+        data.index = data.index.tz_localize(None)
+    return data
@@ -0,0 +1,240 @@
+"""
+This module provides a panel of the prices of many assets and functions to build features for all assets at once.
+
+A PricePanel stores the prices (and later the features) of every asset as one (time, asset, field) float64 array on a
+shared time index, instead of one DataFrame per asset. Log returns, technical indicators and normalization are then
+computed for all assets in one vectorized call each: a field of the panel is a (time, asset) array, and the indicator
+and scaling functions work column by column on such arrays.
+
+Example usage:
+
+    from src.api.yfinance import fetch_price_data
+    from src.data.panel import PricePanel, add_log_returns, add_technical_indicators, normalize_panel
+
+    frame = fetch_price_data(['BTC-USD', 'ETH-USD', 'SOL-USD'], '2021-01-01', '2023-01-01')
+    panel = add_technical_indicators(add_log_returns(PricePanel.from_frame(frame)))
+    panel, scaler = normalize_panel(panel)
+    eth = panel.asset('ETH-USD')  # a DataFrame laid out like the single-asset pipeline
+
+Classes:
+- PricePanel: The prices and features of many assets on a shared time index, as a (time, asset, field) array.
+- PanelScaler: Scales every field of every asset to [0, 1], like one MinMaxScaler per asset.
+
+Functions:
+- add_log_returns: Adds the log return of every asset to a panel.
+- add_technical_indicators: Adds the technical indicators of `add_all_technical_indicators` to every asset of a panel.
+- normalize_panel: Normalizes every field of every asset of a panel to [0, 1].
+"""
+import numpy as np
+import pandas as pd
+
+from src.features.indicator_graph import TECHNICAL_INDICATORS, compute_indicator_arrays
+
+
+class PricePanel:
+    def __init__(self, values, index, tickers, fields):
+        """
+        Initializes the panel.
+
+        :param values: A (time, asset, field) array with the data.
+        :param index: The time index, one entry per step.
+        :param tickers: The tickers of the assets, one per entry of the asset axis.
+        :param fields: The names of the fields, one per entry of the field axis.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        shape = (len(index), len(tickers), len(fields))
+        if values.shape != shape:
+            raise ValueError(
+                f"Panel values have shape {values.shape}, expected {shape} for the index, tickers and fields"
+            )
+        self.values = values
+        self.index = pd.Index(index)
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Builds a panel from a DataFrame with (field, ticker) columns, as returned by `fetch_price_data`.
+
+        Only the dates on which every asset has every field are kept, e.g. the dates after the latest listing of the
+        assets, so the features of all assets are computed over the same steps.
+
+        :param frame: A DataFrame with two column levels, the field and the ticker.
+        :return: A PricePanel.
+        """
+        fields = list(dict.fromkeys(frame.columns.get_level_values(0)))
+        tickers = list(dict.fromkeys(frame.columns.get_level_values(1)))
+        frame = frame.reindex(
+            columns=pd.MultiIndex.from_product([fields, tickers])
+        ).dropna()
+
+        values = frame.to_numpy(dtype=np.float64).reshape(
+            len(frame), len(fields), len(tickers)
+        )
+        return cls(
+            np.ascontiguousarray(values.transpose(0, 2, 1)),
+            frame.index,
+            tickers,
+            fields,
+        )
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, field):
+        """
+        Returns a field of every asset as a (time, asset) view, so a panel can be used like a DataFrame of prices.
+        """
+        return self.values[:, :, self.fields.index(field)]
+
+    def asset(self, ticker):
+        """
+        Returns the data of one asset.
+
+        :param ticker: The ticker of the asset.
+        :return: A DataFrame with one column per field and the time index of the panel.
+        """
+        return pd.DataFrame(
+            self.values[:, self.tickers.index(ticker), :],
+            index=self.index,
+            columns=self.fields,
+        )
+
+    def to_frame(self):
+        """
+        Returns the panel as a DataFrame with (field, ticker) columns, the layout `from_frame` reads.
+        """
+        columns = pd.MultiIndex.from_product([self.fields, self.tickers])
+        values = self.values.transpose(0, 2, 1).reshape(len(self), -1)
+        return pd.DataFrame(values, index=self.index, columns=columns)
+
+    def with_fields(self, fields):
+        """
+        Returns a panel with added or replaced fields.
+
+        :param fields: A mapping from field name to a (time, asset) array.
+        :return: A new PricePanel with the existing fields, updated, followed by the new ones.
+        """
+        names = self.fields + [name for name in fields if name not in self.fields]
+        values = np.empty((len(self), len(self.tickers), len(names)))
+        values[:, :, : len(self.fields)] = self.values
+        for name, field in fields.items():
+            values[:, :, names.index(name)] = field
+        return PricePanel(values, self.index, self.tickers, names)
+
+    def take(self, steps):
+        """
+        Returns a panel of some of the steps.
+
+        :param steps: A slice, boolean mask or integer array selecting steps.
+        :return: A new PricePanel.
+        """
+        return PricePanel(
+            self.values[steps], self.index[steps], self.tickers, self.fields
+        )
+
+
+class PanelScaler:
+    def __init__(self, exclude=()):
+        """
+        Initializes the scaler.
+
+        :param exclude: The names of fields that are left unscaled, such as 'log_return'.
+        """
+        self.exclude = tuple(exclude)
+        self.data_min_ = None
+        self.data_range_ = None
+
+    def fit(self, panel):
+        """
+        Computes the minimum and range of every field of every asset.
+
+        As with MinMaxScaler, fields with a zero range are only shifted, not scaled.
+
+        :param panel: The PricePanel to fit.
+        :return: The fitted scaler.
+        """
+        data_min = panel.values.min(axis=0)
+        data_range = panel.values.max(axis=0) - data_min
+        data_range[data_range == 0.0] = 1.0
+
+        for name in self.exclude:
+            if name in panel.fields:
+                data_min[:, panel.fields.index(name)] = 0.0
+                data_range[:, panel.fields.index(name)] = 1.0
+
+        self.data_min_ = data_min
+        self.data_range_ = data_range
+        return self
+
+    def transform(self, panel):
+        """
+        Scales a panel with the fitted minimum and range of every field of every asset.
+
+        :param panel: A PricePanel with the assets and fields the scaler was fitted on.
+        :return: A new, scaled PricePanel.
+        """
+        values = (panel.values - self.data_min_) / self.data_range_
+        return PricePanel(values, panel.index, panel.tickers, panel.fields)
+
+    def fit_transform(self, panel):
+        """
+        Fits the scaler to a panel and scales it.
+
+        :param panel: The PricePanel to fit and scale.
+        :return: A new, scaled PricePanel.
+        """
+        return self.fit(panel).transform(panel)
+
+    def inverse_transform(self, panel):
+        """
+        Undoes the scaling of a panel.
+
+        :param panel: A PricePanel scaled by this scaler.
+        :return: A new PricePanel with the original values.
+        """
+        values = panel.values * self.data_range_ + self.data_min_
+        return PricePanel(values, panel.index, panel.tickers, panel.fields)
+
+
+def add_log_returns(panel):
+    """
+    Adds the log return of the close price of every asset to a panel, as a 'log_return' field.
+
+    The first step, which has no previous close, is dropped.
+
+    :param panel: A PricePanel with a 'Close' field.
+    :return: A new PricePanel with the added field.
+    """
+    close = panel["Close"]
+    log_returns = np.full_like(close, np.nan)
+    log_returns[1:] = np.log(close[1:] / close[:-1])
+    return panel.with_fields({"log_return": log_returns}).take(slice(1, None))
+
+
+def add_technical_indicators(panel):
+    """
+    Adds the technical indicators of `add_all_technical_indicators` to every asset of a panel.
+
+    Each indicator is computed for all assets in one call, and the steps at the start of the panel that are within the
+    lookback of an indicator are dropped.
+
+    :param panel: A PricePanel with 'High', 'Low', 'Close' and 'Volume' fields.
+    :return: A new PricePanel with one added field per indicator column.
+    """
+    panel = panel.with_fields(compute_indicator_arrays(panel, TECHNICAL_INDICATORS))
+    complete = ~np.isnan(panel.values).any(axis=(1, 2))
+    return panel.take(complete)
+
+
+def normalize_panel(panel, exclude=("log_return",)):
+    """
+    Normalizes every field of every asset of a panel to [0, 1], like `normalize_data` does for one asset.
+
+    :param panel: The PricePanel to normalize.
+    :param exclude: The names of fields that are left unscaled.
+    :return: A tuple of the normalized PricePanel and the fitted PanelScaler.
+    """
+    scaler = PanelScaler(exclude)
+    return scaler.fit_transform(panel), scaler
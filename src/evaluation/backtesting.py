@@ -2,93 +2,148 @@
 This module contains the functionality for backtesting a trained model.
 
 The main functions in this module are `calculate_backtest_returns` and `calculate_benchmark_returns`.
+`calculate_backtest_returns` is composed of `prepare_backtest_states` and `calculate_strategy_returns`, which can be
+used separately to backtest several models on one shared state matrix. `calculate_backtest_returns_from_feature_matrix`
+backtests on the feature matrix stored in a model directory, memory-mapping it instead of normalizing the data again.
 
-`calculate_backtest_returns` takes in a trained model and market data, calculates the target and predicted output, 
+`calculate_backtest_returns` takes in a trained model and market data, calculates the target and predicted output,
 and calculates the return using a vectorized approach. It returns a DataFrame with the strategy return and its cumulative value at each time step.
 
-`calculate_benchmark_returns` takes in market data and calculates the benchmark return using a vectorized approach. 
+`calculate_benchmark_returns` takes in market data and calculates the benchmark return using a vectorized approach.
 It returns a DataFrame with the benchmark return and its cumulative value at each time step.
 
 Functions:
-    calculate_backtest_returns(model: dqn.DQN, data: pandas.DataFrame, scaler: sklearn.preprocessing.StandardScaler) -> pandas.DataFrame: 
+    calculate_backtest_returns(model: dqn.DQN, data: pandas.DataFrame, scaler: sklearn.preprocessing.StandardScaler) -> pandas.DataFrame:
         Calculates the strategy returns at each step and their cumulative values, and returns a DataFrame with these series.
-        
+
+    calculate_backtest_returns_from_feature_matrix(model: keras.Model, model_dir: str) -> pandas.DataFrame:
+        Calculates the strategy returns over the memory-mapped feature matrix stored in a model directory.
+
+    prepare_backtest_states(data: pandas.DataFrame, scaler: sklearn.preprocessing.StandardScaler) -> numpy.array:
+        Builds the normalized states the model was trained on.
+
+    calculate_strategy_returns(predicted_output: numpy.array, data: pandas.DataFrame) -> pandas.DataFrame:
+        Calculates the strategy returns and their cumulative values from a model's predicted output.
+
     calculate_benchmark_returns(data: pandas.DataFrame) -> pandas.DataFrame:
         Calculates the benchmark returns at each step and their cumulative values, and returns a DataFrame with these series.
+
+Constants:
+    PREDICT_BATCH_SIZE (int): The batch size used for the single inference pass over the backtest data.
 """
 
 import pandas as pd
 import numpy as np
 
+from src.data import feature_matrix
 
 # src/evaluation/backtesting.py
 
+PREDICT_BATCH_SIZE = 4096
+
 
 def calculate_backtest_returns(model, data, scaler):
     """
     Calculates the strategy returns at each step and their cumulative values.
 
-    The function takes in a trained model and market data, calculates the target and predicted output,
-    and calculates the return using a vectorized approach.
+    The function takes in a trained model and market data, predicts the action values of every step with a single
+    batched inference over the normalized data, and calculates the return using a vectorized approach.
+    The input data is not modified.
 
     Args:
         model (dqn.DQN): The trained DQN model to backtest.
         data (pandas.DataFrame): The data to use for backtesting.
-        scaler (sklearn.preprocessing.StandardScaler): The scaler used to inverse transform the data.
+        scaler (sklearn.preprocessing.StandardScaler): The scaler used to normalize the data during training.
 
     Returns:
         return_df (pandas.DataFrame): A DataFrame with the strategy return and its cumulative value at each time step.
     """
+    states = prepare_backtest_states(data, scaler)
 
-    # Remove the target column from the data before making predictions
-    log_returns = data["log_return"]
-    data_without_target = data.drop(
-        columns=[
-            "target",
-            "log_return",
-        ]
-    )
+    # Calculate the predicted output for every step in one batched pass
+    predicted_output = model.predict(states, batch_size=PREDICT_BATCH_SIZE, verbose=0)
 
-    # Normalize the data
-    normalized_data = scaler.transform(data_without_target)
+    return calculate_strategy_returns(predicted_output, data)
 
-    # add the log_returns back to the dataframe
-    data["log_return"] = log_returns
 
-    # Calculate the predicted output
-    predicted_output = model.predict(normalized_data)
-    print(predicted_output)
+def calculate_backtest_returns_from_feature_matrix(
+    model, model_dir, start=0, stop=None
+):
+    """
+    Calculates the strategy returns over the feature matrix stored in a model directory.
 
-    # Calculate the predicted output
-    predicted_output = model.predict(data_without_target)
+    The stored matrix already holds the normalized states the model was trained on, so it is memory-mapped and
+    passed to the model as it is, without loading the data or applying the scaler.
+
+    Args:
+        model (keras.Model): The trained model to backtest.
+        model_dir (str): The directory holding the feature matrix, as stored during training.
+        start (int): The first step to backtest.
+        stop (int): The step to stop before, or None to backtest every remaining step.
 
-    # Convert the predicted output to a DataFrame
-    predicted_output_df = pd.DataFrame(
-        predicted_output,
-        columns=["buy", "sell", "hold"],
-        index=data.index,
+    Returns:
+        return_df (pandas.DataFrame): A DataFrame with the strategy return and its cumulative value at each time step.
+    """
+    states, log_returns, index, _ = feature_matrix.load_feature_matrix(
+        model_dir, start=start, stop=stop
     )
 
-    # Choose the action with the highest probability
-    predicted_actions = predicted_output_df.idxmax(axis=1)
+    predicted_output = model.predict(states, batch_size=PREDICT_BATCH_SIZE, verbose=0)
 
-    # Create a 'position' column based on the predicted actions
-    data["position"] = predicted_actions.replace({"buy": 1, "sell": 0, "hold": np.nan})
+    return calculate_strategy_returns(
+        predicted_output, pd.DataFrame({"log_return": log_returns}, index=index)
+    )
 
-    # Calculate the strategy return at each step
-    data["strategy_return"] = data["position"].shift() * data["log_return"]
 
-    # Calculate the cumulative strategy return at each time step
-    data["cumulative_strategy_return"] = np.exp(data["strategy_return"].cumsum()) - 1
+def prepare_backtest_states(data, scaler):
+    """
+    Builds the states the model was trained on from the market data.
+
+    The states are the normalized features followed by the raw log return. The matrix does not depend on the model,
+    so it can be built once and shared by every model being backtested.
+
+    Args:
+        data (pandas.DataFrame): The data to use for backtesting.
+        scaler (sklearn.preprocessing.StandardScaler): The scaler used to normalize the data during training.
+
+    Returns:
+        states (numpy.array): The states, shaped (len(data), num_features + 1).
+    """
+    features = data.drop(columns=["target", "log_return"])
+    return np.column_stack(
+        [scaler.transform(features), data["log_return"].to_numpy()]
+    ).astype(np.float32)
+
+
+def calculate_strategy_returns(predicted_output, data):
+    """
+    Calculates the strategy returns at each step and their cumulative values from a model's predicted output.
+
+    Args:
+        predicted_output (numpy.array): The predicted values of the buy, sell and hold actions at each step.
+        data (pandas.DataFrame): The data the predictions were made on.
+
+    Returns:
+        return_df (pandas.DataFrame): A DataFrame with the strategy return and its cumulative value at each time step.
+    """
+    log_returns = data["log_return"].to_numpy()
+
+    # Choose the action with the highest value: buy (0) holds a position, sell (1) holds none
+    # and hold (2) leaves the step out
+    predicted_actions = np.argmax(predicted_output, axis=1)
+    position = np.select(
+        [predicted_actions == 0, predicted_actions == 1], [1.0, 0.0], np.nan
+    )
+
+    # Calculate the strategy return at each step
+    strategy_return = np.full(len(data), np.nan)
+    strategy_return[1:] = position[:-1] * log_returns[1:]
 
     # Create a DataFrame with the strategy return and its cumulative value at each time step
-    return_df = data[
-        [
-            "strategy_return",
-            "cumulative_strategy_return",
-        ]
-    ]
-    print(return_df)
+    return_df = pd.DataFrame({"strategy_return": strategy_return}, index=data.index)
+    return_df["cumulative_strategy_return"] = (
+        np.exp(return_df["strategy_return"].cumsum()) - 1
+    )
 
     # Drop rows with NaN values
     return_df = return_df.dropna()
@@ -1,20 +1,28 @@
 """
 This module contains the functionality for evaluating a trained model.
 
-The main function in this module is `evaluate_model`, which takes in a trained model, a scaler, and market data, 
-backtests the model, calculates various performance metrics, and creates visualizations.
+The main function in this module is `evaluate_models`, which takes in trained models, a scaler, and market data,
+backtests the models, calculates various performance metrics, and creates visualizations.
+
+In batched mode the data is normalized once and the resulting feature matrix is shared by every model. Models that
+are stacks of dense layers with the same shapes are evaluated together in one stacked NumPy forward pass, and any
+other models are run concurrently in a thread pool.
 
 Functions:
-    evaluate_model(model: keras.Model, scaler: Scaler, data: pandas.DataFrame): Evaluates the model using the provided data.
+    evaluate_models(models: list, data: pandas.DataFrame, scaler: Scaler, batched: bool, max_workers: int) -> pandas.DataFrame: Evaluates the models using the provided data and returns a table of their performance metrics.
 """
+from concurrent.futures import ThreadPoolExecutor
+
 import matplotlib.pyplot as plt
+import pandas as pd
 
 from src.evaluation import backtesting
 from src.evaluation import performance_metrics
 from src.evaluation import visualizations
+from src.learning.rl.models.numpy_policy import dense_weights, stacked_dense_forward
 
 
-def evaluate_models(models, data, scaler):
+def evaluate_models(models, data, scaler, batched=False, max_workers=None):
     """
     Evaluates multiple trained models using the provided data.
 
@@ -24,25 +32,81 @@ def evaluate_models(models, data, scaler):
         models (list of keras.Model): The trained models for evaluation.
         data (pandas.DataFrame): The data to use for evaluation.
         scaler (Scaler): The scaler used for data normalization.
-    """
-    backtest_dfs = []
-    metrics = []
+        batched (bool): Whether to normalize the data once and run inference for all models together,
+            instead of backtesting the models one after another.
+        max_workers (int): The number of threads used for models that cannot be stacked in batched mode.
 
-    for model in models:
-        backtest_df = backtesting.calculate_backtest_returns(model, data, scaler)
-        backtest_dfs.append(backtest_df)
-
-        # Calculate performance metrics
-        metric = performance_metrics.calculate_performance_metrics(backtest_df)
-        metrics.append(metric)
+    Returns:
+        metrics_df (pandas.DataFrame): The performance metrics of each model, one row per model.
+    """
+    labels = ["Model {}".format(i + 1) for i in range(len(models))]
 
-    # print(metrics)
-    # print(backtest_dfs)
+    if batched:
+        states = backtesting.prepare_backtest_states(data, scaler)
+        predicted_outputs = _predict_all(models, states, max_workers)
+        backtest_dfs = [
+            backtesting.calculate_strategy_returns(predicted_output, data)
+            for predicted_output in predicted_outputs
+        ]
+    else:
+        backtest_dfs = [
+            backtesting.calculate_backtest_returns(model, data, scaler)
+            for model in models
+        ]
 
     # Calculate benchmark returns
     benchmark_df = backtesting.calculate_benchmark_returns(data)
-    backtest_dfs.append(benchmark_df)
-    labels = ["Model {}".format(i + 1) for i in range(len(models))] + ["Benchmark"]
+
+    # Calculate performance metrics against the benchmark over the same steps
+    metrics = [
+        performance_metrics.calculate_performance_metrics(
+            backtest_df.join(benchmark_df, how="inner")
+        )
+        for backtest_df in backtest_dfs
+    ]
+    metrics_df = pd.DataFrame(metrics, index=labels)
 
     # Create visualizations
-    visualizations.plot_cumulative_returns(backtest_dfs, labels)
+    visualizations.plot_cumulative_returns(
+        backtest_dfs + [benchmark_df], labels + ["Benchmark"]
+    )
+
+    return metrics_df
+
+
+def _predict_all(models, states, max_workers=None):
+    """
+    Predicts the action values of every model for a shared matrix of states.
+
+    Models whose weights can be stacked are evaluated in one NumPy forward pass; the others are
+    run through `model.predict` concurrently in a thread pool.
+
+    Args:
+        models (list of keras.Model): The trained models.
+        states (numpy.array): The states, shaped (num_steps, state_size).
+        max_workers (int): The number of threads used for models that cannot be stacked.
+
+    Returns:
+        predicted_outputs (list of numpy.array): The predicted output of each model, in the order of `models`.
+    """
+    weight_sets = [dense_weights(model) for model in models]
+    if all(weights is not None for weights in weight_sets) and _same_shapes(
+        weight_sets
+    ):
+        return list(stacked_dense_forward(weight_sets, states))
+
+    def predict(model):
+        return model.predict(
+            states, batch_size=backtesting.PREDICT_BATCH_SIZE, verbose=0
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(predict, models))
+
+
+def _same_shapes(weight_sets):
+    """
+    Returns whether every set of weights has the same array shapes.
+    """
+    shapes = [tuple(w.shape for w in weights) for weights in weight_sets]
+    return all(shape == shapes[0] for shape in shapes)
@@ -11,7 +11,10 @@ It includes the following functions:
 - get_mempool_size: Fetches the mempool size over time from the Blockchain.com Charts API and returns it as a DataFrame.
 
 Each function takes optional parameters to specify the timespan and start date for the data, and returns a DataFrame with the fetched data.
+An optional HttpCache can be passed to each function to reuse previously fetched responses, and an optional requests
+Session to reuse pooled connections.
 """
+
 from src.api.blockchain_com_api import fetch_blockchain_chart_data
 import pandas as pd
 
@@ -23,6 +26,8 @@ def get_blockchain_data(
     start_date=None,
     format="json",
     sampled="true",
+    cache=None,
+    session=None,
 ):
     """
     Fetches data over time from the Blockchain.com Charts API and returns it as a DataFrame.
@@ -33,11 +38,20 @@ def get_blockchain_data(
     :param start_date: The start date for the chart data (optional).
     :param format: The format of the data, either 'json' or 'csv'. Defaults to 'json'.
     :param sampled: Whether to limit the number of datapoints returned for performance reasons. Defaults to 'true'.
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged chart data.
+    :param session: An optional requests Session whose pooled connections are reused.
     :return: A DataFrame with the fetched data.
     """
     try:
         data = fetch_blockchain_chart_data(
-            chart_name, timespan, rolling_average, start_date, format, sampled
+            chart_name,
+            timespan,
+            rolling_average,
+            start_date,
+            format,
+            sampled,
+            cache=cache,
+            session=session,
         )
 
         # Convert the list of dictionaries to a DataFrame
@@ -62,60 +76,96 @@ def get_blockchain_data(
         print(f"An error occurred while fetching the {chart_name} data: {e}")
 
 
-def get_hash_rate_over_time(timespan=None, start_date=None):
+def get_hash_rate_over_time(timespan=None, start_date=None, cache=None, session=None):
     """
     Fetches the hash rate over time from the Blockchain.com Charts API and returns it as a DataFrame.
 
     :param timespan: The duration of the chart (optional).
     :param start_date: The start date for the chart data (optional).
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged chart data.
+    :param session: An optional requests Session whose pooled connections are reused.
     :return: A DataFrame with the fetched hash rate data.
     """
-    return get_blockchain_data("hash-rate", timespan=timespan, start_date=start_date)
+    return get_blockchain_data(
+        "hash-rate",
+        timespan=timespan,
+        start_date=start_date,
+        cache=cache,
+        session=session,
+    )
 
 
-def get_avg_block_size(timespan=None, start_date=None):
+def get_avg_block_size(timespan=None, start_date=None, cache=None, session=None):
     """
     Fetches the average block size over time from the Blockchain.com Charts API and returns it as a DataFrame.
 
     :param timespan: The duration of the chart (optional).
     :param start_date: The start date for the chart data (optional).
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged chart data.
+    :param session: An optional requests Session whose pooled connections are reused.
     :return: A DataFrame with the fetched average block size data.
     """
     return get_blockchain_data(
-        "avg-block-size", timespan=timespan, start_date=start_date
+        "avg-block-size",
+        timespan=timespan,
+        start_date=start_date,
+        cache=cache,
+        session=session,
     )
 
 
-def get_network_difficulty(timespan=None, start_date=None):
+def get_network_difficulty(timespan=None, start_date=None, cache=None, session=None):
     """
     Fetches the network difficulty over time from the Blockchain.com Charts API and returns it as a DataFrame.
 
     :param timespan: The duration of the chart (optional).
     :param start_date: The start date for the chart data (optional).
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged chart data.
+    :param session: An optional requests Session whose pooled connections are reused.
     :return: A DataFrame with the fetched network difficulty data.
     """
-    return get_blockchain_data("difficulty", timespan=timespan, start_date=start_date)
+    return get_blockchain_data(
+        "difficulty",
+        timespan=timespan,
+        start_date=start_date,
+        cache=cache,
+        session=session,
+    )
 
 
-def get_miners_revenue(timespan=None, start_date=None):
+def get_miners_revenue(timespan=None, start_date=None, cache=None, session=None):
     """
     Fetches the miners revenue over time from the Blockchain.com Charts API and returns it as a DataFrame.
 
     :param timespan: The duration of the chart (optional).
     :param start_date: The start date for the chart data (optional).
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged chart data.
+    :param session: An optional requests Session whose pooled connections are reused.
     :return: A DataFrame with the fetched miners revenue data.
     """
     return get_blockchain_data(
-        "miners-revenue", timespan=timespan, start_date=start_date
+        "miners-revenue",
+        timespan=timespan,
+        start_date=start_date,
+        cache=cache,
+        session=session,
     )
 
 
-def get_mempool_size(timespan=None, start_date=None):
+def get_mempool_size(timespan=None, start_date=None, cache=None, session=None):
     """
     Fetches the mempool size over time from the Blockchain.com Charts API and returns it as a DataFrame.
 
     :param timespan: The duration of the chart (optional).
     :param start_date: The start date for the chart data (optional).
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged chart data.
+    :param session: An optional requests Session whose pooled connections are reused.
     :return: A DataFrame with the fetched mempool size data.
     """
-    return get_blockchain_data("mempool-size", timespan=timespan, start_date=start_date)
+    return get_blockchain_data(
+        "mempool-size",
+        timespan=timespan,
+        start_date=start_date,
+        cache=cache,
+        session=session,
+    )
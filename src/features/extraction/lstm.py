@@ -4,32 +4,125 @@ lstm.py
 This module provides functions for creating sequences from a DataFrame, building an LSTM model, training the model, and
 extracting features from the data using the trained model.
 
+Sequences are strided views of the feature matrix rather than copies, so they take O(N·F) memory instead of
+O(N·L·F) for N rows, F features and sequences of length L. Batches of sequences are only materialized as they are
+consumed, either from a generator or from a streaming tf.data pipeline.
+
 Functions:
 - create_sequences: Creates sequences from a DataFrame.
+- iter_sequence_batches: Yields batches of sequences, copying only one batch at a time.
+- make_sequence_dataset: Creates a streaming tf.data dataset of sequence batches for training an autoencoder.
+- predict_sequence_means: Predicts the mean model output of every sequence, one batch at a time.
 - build_lstm_model: Builds an LSTM model.
 - train_model: Trains the LSTM model.
 - extract_features: Extracts features from the data using the trained model.
+- build_encoder: Builds the encoder half of a trained LSTM autoencoder.
+- save_encoder: Saves an encoder to a file.
+- load_encoder: Loads an encoder from a file for inference.
+
+Constants:
+- BATCH_SIZE: The default number of sequences per batch.
+- INFERENCE_BATCH_SIZE: The number of sequences per batch when only running the encoder.
 """
 
 import numpy as np
-from keras.models import Sequential, Model
+import tensorflow as tf
+from keras.models import Sequential, Model, load_model
 from keras.layers import Dense, Dropout, LSTM, TimeDistributed
 
+BATCH_SIZE = 32
+INFERENCE_BATCH_SIZE = 1024
+
 
 def create_sequences(df, sequence_length):
     """
     Creates sequences from a DataFrame.
 
+    Sequence i holds rows i to i + sequence_length - 1, and the last full window is left out, so there are
+    len(df) - sequence_length sequences. The sequences are a read-only strided view of the feature matrix, so
+    no row is copied.
+
     :param df: A Pandas DataFrame with the processed data.
     :param sequence_length: The length of the sequences to be created from the data.
-    :return: A numpy array with the created sequences.
+    :return: A numpy array with the created sequences, shaped (len(df) - sequence_length, sequence_length, features).
+    """
+    features = np.asarray(df.values)
+    num_sequences = max(len(features) - sequence_length, 0)
+    if num_sequences == 0:
+        return np.empty((0, sequence_length, features.shape[1]), dtype=features.dtype)
+
+    # sliding_window_view puts the window axis last, so move it before the feature axis
+    windows = np.lib.stride_tricks.sliding_window_view(
+        features, sequence_length, axis=0
+    )
+    return np.moveaxis(windows[:num_sequences], -1, 1)
+
+
+def iter_sequence_batches(sequences, batch_size=BATCH_SIZE, shuffle=False, rng=None):
+    """
+    Yields batches of sequences, copying only one batch at a time out of the strided view.
+
+    :param sequences: The sequences, as returned by `create_sequences`.
+    :param batch_size: The number of sequences per batch.
+    :param shuffle: Whether to yield the sequences in a random order.
+    :param rng: An optional numpy random Generator used for shuffling.
+    :return: A generator of float32 arrays shaped (batch_size, sequence_length, features); the last batch may be
+             smaller.
+    """
+    order = np.arange(len(sequences))
+    if shuffle:
+        (rng or np.random.default_rng()).shuffle(order)
+
+    for start in range(0, len(order), batch_size):
+        indices = order[start : start + batch_size]
+        if not shuffle:
+            # A contiguous slice of the view avoids the fancy-indexing gather
+            indices = slice(indices[0], indices[-1] + 1)
+        yield np.asarray(sequences[indices], dtype=np.float32)
+
+
+def make_sequence_dataset(sequences, batch_size=BATCH_SIZE, shuffle=True, seed=None):
+    """
+    Creates a streaming tf.data dataset of sequence batches for training an autoencoder.
+
+    Each element is an (inputs, targets) pair of the same batch, so the dataset can be passed to `train_model`.
+    Batches are produced by `iter_sequence_batches` while the model trains, reshuffled every epoch, and
+    prefetched so batch creation overlaps with training.
+
+    :param sequences: The sequences, as returned by `create_sequences`.
+    :param batch_size: The number of sequences per batch.
+    :param shuffle: Whether to shuffle the sequences every epoch.
+    :param seed: An optional seed for shuffling.
+    :return: A tf.data.Dataset of (batch, batch) pairs.
+    """
+    rng = np.random.default_rng(seed)
+    _, sequence_length, num_features = sequences.shape
+    spec = tf.TensorSpec(shape=(None, sequence_length, num_features), dtype=tf.float32)
+
+    def generator():
+        for batch in iter_sequence_batches(sequences, batch_size, shuffle, rng):
+            yield batch, batch
+
+    dataset = tf.data.Dataset.from_generator(generator, output_signature=(spec, spec))
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def predict_sequence_means(model, sequences, batch_size=BATCH_SIZE):
     """
-    features = df.values
-    sequences = []
-    for i in range(len(features) - sequence_length):
-        seq = features[i : i + sequence_length]
-        sequences.append(seq)
-    return np.array(sequences)
+    Predicts the mean model output of every sequence, one batch at a time.
+
+    Only the means are kept, so the full (sequences, sequence_length, units) output is never held in memory.
+
+    :param model: The trained LSTM model.
+    :param sequences: The sequences, as returned by `create_sequences`.
+    :param batch_size: The number of sequences per batch.
+    :return: A numpy array with the mean output of each sequence.
+    """
+    means = [
+        np.asarray(model.predict_on_batch(batch)).mean(axis=(1, 2))
+        for batch in iter_sequence_batches(sequences, batch_size)
+    ]
+    return np.concatenate(means) if means else np.empty(0)
 
 
 def build_lstm_model(input_shape):
@@ -58,11 +151,15 @@ def train_model(model, X, epochs=10):
     Trains the LSTM model.
 
     :param model: The LSTM model to be trained.
-    :param X: Data.
+    :param X: Data, either an array of sequences or a tf.data dataset of (inputs, targets) batches as created by
+              `make_sequence_dataset`.
     :param epochs: Number of epochs to train for.
     :return: The trained LSTM model.
     """
-    model.fit(X, X, epochs=epochs, batch_size=32, verbose=1)
+    if isinstance(X, tf.data.Dataset):
+        model.fit(X, epochs=epochs, verbose=1)
+    else:
+        model.fit(X, X, epochs=epochs, batch_size=BATCH_SIZE, verbose=1)
     return model
 
 
@@ -74,5 +171,39 @@ def extract_features(model, sequences):
     :param sequences: The sequences from which to extract features.
     :return: A numpy array with the extracted features.
     """
-    feature_extractor = Model(inputs=model.inputs, outputs=model.layers[-2].output)
+    feature_extractor = build_encoder(model)
     return feature_extractor.predict(sequences)
+
+
+def build_encoder(model):
+    """
+    Builds the encoder half of a trained LSTM autoencoder: every layer up to the output of the last LSTM layer.
+
+    The encoder shares its weights with the autoencoder, so it needs no training of its own.
+
+    :param model: The trained LSTM model.
+    :return: A Keras Model mapping sequences to the encoded sequences.
+    """
+    return Model(inputs=model.inputs, outputs=model.layers[-2].output)
+
+
+def save_encoder(encoder, path):
+    """
+    Saves an encoder to a file.
+
+    :param encoder: The encoder, as built by `build_encoder`.
+    :param path: The path of the file, e.g. 'lstm_encoder.h5' in the model directory.
+    """
+    encoder.save(path)
+
+
+def load_encoder(path):
+    """
+    Loads an encoder from a file for inference.
+
+    The encoder is not compiled, since it is only used to predict.
+
+    :param path: The path of the file saved by `save_encoder`.
+    :return: The loaded encoder.
+    """
+    return load_model(path, compile=False)
@@ -2,15 +2,24 @@
 This module provides functions for adding blockchain data and technical indicators to a DataFrame.
 
 Functions:
-- add_blockchain_data: Fetches data from specified blockchain.com API endpoints and adds it to the DataFrame.
+- add_blockchain_data: Fetches data from specified blockchain.com API endpoints concurrently and adds it to the DataFrame.
+- merge_blockchain_data: Merges fetched blockchain chart data into the DataFrame by date.
 - add_all_technical_indicators: Adds technical indicators to the data.
+- add_indicator_sweep: Adds every variant of a grid of technical indicator parameters to the data.
+- extract_lstm_features: Trains an LSTM autoencoder on the data and adds the features extracted by its encoder.
+- train_lstm_encoder: Trains an LSTM autoencoder on the data and returns its encoder.
+- add_lstm_features: Adds the features extracted by a trained encoder, without training.
 
-This module uses pandas for data manipulation and several functions from the src.features.blockchain and src.features.ta modules 
-to fetch blockchain data and calculate technical indicators.
+This module uses pandas for data manipulation, functions from the src.features.blockchain module to fetch blockchain
+data and the src.features.indicator_graph module to calculate technical indicators.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
+from src.api.blockchain_com_api import BlockchainComClient
 from src.features.blockchain import (
     get_hash_rate_over_time,
     get_avg_block_size,
@@ -19,52 +28,104 @@ from src.features.blockchain import (
     get_mempool_size,
 )
 
-from src.features.ta import (
-    calculate_bollinger_bands,
-    calculate_stochastic_oscillator,
-    calculate_macd,
-    calculate_rsi,
-    calculate_sma,
-    calculate_ema,
-    calculate_atr,
-    calculate_macd_histogram,
-    calculate_obv,
-    calculate_cci,
-)
+from src.features.indicator_graph import compute_indicators, TECHNICAL_INDICATORS
+from src.features.indicator_sweep import sweep_indicators
 
 from src.features.extraction.lstm import (
+    INFERENCE_BATCH_SIZE,
     create_sequences,
+    make_sequence_dataset,
+    predict_sequence_means,
     build_lstm_model,
     train_model,
+    build_encoder,
+    save_encoder,
+    load_encoder,
 )
 
 from src.data.data_cleaning import clean_data
 
 
-def add_blockchain_data(data, timespan="1year", start=None):
+def add_blockchain_data(
+    data, timespan="1year", start=None, cache=None, session=None, max_workers=None
+):
     """
     Fetches data from specified blockchain.com API endpoints and adds it to the DataFrame.
 
+    The charts are fetched concurrently in a thread pool over one pooled client, so the fetch takes
+    about as long as the slowest chart rather than the sum of all of them.
+
     :param data: A Pandas DataFrame with the price data.
     :param timespan: The timespan for the blockchain data (e.g., '1year' for 1 year).
     :param start: The start date for the data in YYYY-MM-DD format.
+    :param cache: An optional HttpCache used to avoid re-downloading unchanged chart data.
+    :param session: An optional requests Session or BlockchainComClient shared by all chart requests.
+                    A BlockchainComClient, which retries transient failures, is created (and closed afterwards)
+                    if none is given.
+    :param max_workers: The maximum number of charts fetched at once. Defaults to one thread per chart.
     :return: The DataFrame with the added blockchain data.
     """
-    # Fetch the hash rate over time
-    hash_rate_data = get_hash_rate_over_time(timespan, start_date=start)
-
-    # Fetch the average block size over time
-    avg_block_size_data = get_avg_block_size(timespan, start_date=start)
-
-    # Fetch the network difficulty over time
-    network_difficulty_data = get_network_difficulty(timespan, start_date=start)
+    chart_getters = [
+        get_hash_rate_over_time,
+        get_avg_block_size,
+        get_network_difficulty,
+        get_miners_revenue,
+        get_mempool_size,
+    ]
+
+    owns_session = session is None
+    if owns_session:
+        session = BlockchainComClient()
+
+    # Fetch all charts concurrently, keeping their order
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or len(chart_getters)) as pool:
+            futures = [
+                pool.submit(
+                    getter, timespan, start_date=start, cache=cache, session=session
+                )
+                for getter in chart_getters
+            ]
+            (
+                hash_rate_data,
+                avg_block_size_data,
+                network_difficulty_data,
+                miners_revenue_data,
+                mempool_size_data,
+            ) = [future.result() for future in futures]
+    finally:
+        if owns_session:
+            session.close()
+
+    return merge_blockchain_data(
+        data,
+        hash_rate_data,
+        avg_block_size_data,
+        network_difficulty_data,
+        miners_revenue_data,
+        mempool_size_data,
+    )
 
-    # Fetch the miners revenue over time
-    miners_revenue_data = get_miners_revenue(timespan, start_date=start)
 
-    # Fetch the mempool size over time
-    mempool_size_data = get_mempool_size(timespan, start_date=start)
+def merge_blockchain_data(
+    data,
+    hash_rate_data,
+    avg_block_size_data,
+    network_difficulty_data,
+    miners_revenue_data,
+    mempool_size_data,
+):
+    """
+    Merges fetched blockchain chart data into the DataFrame by date.
 
+    :param data: A Pandas DataFrame with the price data.
+    :param hash_rate_data: A DataFrame with the hash rate over time.
+    :param avg_block_size_data: A DataFrame with the average block size over time.
+    :param network_difficulty_data: A DataFrame with the network difficulty over time.
+    :param miners_revenue_data: A DataFrame with the miners revenue over time.
+    :param mempool_size_data: A DataFrame with the mempool size over time, which is resampled to daily means.
+    :return: The DataFrame with the added blockchain data.
+    """
     # Convert the dates in the 'data' DataFrame to the same format as the dates in the 'hash_rate_df' DataFrame
     data.index = data.index.date
 
@@ -102,19 +163,10 @@ def add_all_technical_indicators(data):
     :return: The DataFrame with the added technical indicators. Rows containing NaN values
              due to the calculation of technical indicators are dropped.
     """
-    # add the indicators
-    data["upper_bb"], data["middle_bb"], data["lower_bb"] = calculate_bollinger_bands(
-        data["Close"]
-    )
-    data["slowk"], data["slowd"] = calculate_stochastic_oscillator(data)
-    data["macd"], data["macdsignal"], data["macdhist"] = calculate_macd(data["Close"])
-    data["rsi"] = calculate_rsi(data["Close"])
-    data["sma"] = calculate_sma(data["Close"])
-    data["ema"] = calculate_ema(data["Close"])
-    data["atr"] = calculate_atr(data)
-    data["macd_hist"] = calculate_macd_histogram(data["Close"])
-    data["obv"] = calculate_obv(data)
-    data["cci"] = calculate_cci(data)
+    # add the indicators, computing the intermediates they share (such as the MACD behind both histogram
+    # columns) once
+    for column, values in compute_indicators(data, TECHNICAL_INDICATORS).items():
+        data[column] = values
 
     # Reclean the data
     data = clean_data(data)
@@ -122,29 +174,79 @@ def add_all_technical_indicators(data):
     return data
 
 
-def extract_lstm_features(df, sequence_length):
+def add_indicator_sweep(data, grid):
+    """
+    Adds every variant of a grid of technical indicator parameters to the data, for feature selection.
+
+    All variants are computed in one vectorized pass by `sweep_indicators`. Unlike `add_all_technical_indicators`,
+    the data is not recleaned, so the caller decides how to handle the lookback rows of the longest periods.
+
+    :param data: A Pandas DataFrame with the price data.
+    :param grid: A mapping from indicator name to a list of parameters, e.g. {'sma': [10, 20, 50], 'rsi': [7, 14]}.
+    :return: The DataFrame with one added column per variant, named like 'sma_10' or 'macdhist_12_26_9'.
+    """
+    matrix, columns = sweep_indicators(data, grid)
+    variants = pd.DataFrame(matrix, index=data.index, columns=columns)
+    return pd.concat([data.drop(columns=columns, errors="ignore"), variants], axis=1)
+
+
+def extract_lstm_features(df, sequence_length, encoder_path=None):
     """
     Extracts features from the data using an LSTM model.
 
     :param df: A Pandas DataFrame with the processed data.
     :param sequence_length: The length of the sequences to be created from the data.
+    :param encoder_path: An optional path the trained encoder is saved to, so later runs can extract the same
+                         features with `add_lstm_features` without training.
     :return: A DataFrame with the extracted features.
     """
-    # Create sequences from the DataFrame
+    encoder = train_lstm_encoder(df, sequence_length)
+
+    if encoder_path is not None:
+        save_encoder(encoder, encoder_path)
+
+    return add_lstm_features(df, encoder)
+
+
+def train_lstm_encoder(df, sequence_length):
+    """
+    Trains an LSTM autoencoder on the data and returns its encoder.
+
+    :param df: A Pandas DataFrame with the processed data.
+    :param sequence_length: The length of the sequences to be created from the data.
+    :return: The trained encoder.
+    """
+    # Create sequences from the DataFrame, as a strided view that does not copy the data
     X = create_sequences(df, sequence_length)
 
     # Build an LSTM model
     model = build_lstm_model(input_shape=(sequence_length, df.shape[1]))
 
-    # Train the LSTM model as an autoencoder (reconstructing its input)
-    model = train_model(model, X, epochs=10)
+    # Train the LSTM model as an autoencoder (reconstructing its input), streaming the batches
+    model = train_model(model, make_sequence_dataset(X), epochs=10)
 
-    # Extract features from the LSTM model
-    # This could be the outputs of the LSTM layer, for example
-    features = model.predict(X)
+    return build_encoder(model)
+
+
+def add_lstm_features(df, encoder):
+    """
+    Adds the features extracted by a trained LSTM encoder to the data, without training.
+
+    Only the encoder is run, in large batches, and only the mean of its outputs for each sequence is kept.
+
+    :param df: A Pandas DataFrame with the processed data, normalized like the data the encoder was trained on.
+    :param encoder: The trained encoder, or the path of an encoder saved by `save_encoder`.
+    :return: A DataFrame with the extracted features.
+    """
+    if isinstance(encoder, (str, os.PathLike)):
+        encoder = load_encoder(encoder)
+    sequence_length = encoder.input_shape[1]
+
+    # Create sequences from the DataFrame, as a strided view that does not copy the data
+    X = create_sequences(df, sequence_length)
 
-    # Calculate the mean of the LSTM outputs for each sequence
-    features_mean = features.mean(axis=(1, 2))
+    # Extract features as the mean of the encoder outputs for each sequence, predicting one batch at a time
+    features_mean = predict_sequence_means(encoder, X, batch_size=INFERENCE_BATCH_SIZE)
 
     # Convert the extracted features to a DataFrame
     features_df = pd.DataFrame(features_mean, columns=["lstm_feature"])
@@ -0,0 +1,312 @@
+"""
+This module provides a planner that computes a set of technical indicators over a graph of shared intermediates.
+
+Many indicators are built from the same intermediates: the RSI and OBV both start from the close price changes, the
+SMA and the Bollinger Bands both use the cumulative sums of the close prices, and the MACD line, signal line and
+histogram all come from one pair of exponential averages. Computing each indicator on its own repeats this work.
+
+Instead, every indicator and intermediate is a node identified by a key, a tuple of its operation and parameters such
+as ("ema", "Close", 30) or ("macd", 12, 26, 9). Nodes with equal keys are the same node, so requesting a set of
+indicators builds a directed acyclic graph in which each intermediate appears once. The graph is evaluated in
+dependency order, and each intermediate is freed as soon as its last dependent has been computed, so adding
+indicators adds only the nodes they do not share and peak memory holds only the intermediates still needed.
+
+Indicators are requested as a mapping from output column to a (key, output) pair, where output selects one result of
+nodes with several results (such as the three Bollinger Bands) and is None otherwise. Requesting the same output under
+two column names computes it once.
+
+The nodes are computed with the building blocks of src.features.ta_numpy, so the results match TA-Lib.
+
+Example usage:
+
+    from src.features.indicator_graph import compute_indicators
+
+    indicators = compute_indicators(df, {
+        "macd": (("macd", 12, 26, 9), 0),
+        "macdhist": (("macd", 12, 26, 9), 2),
+        "ema": (("ema", "Close", 30), None),
+    })
+
+Functions:
+- plan_indicators: Returns the nodes needed to compute a set of indicators, each once and in dependency order.
+- compute_indicators: Computes a set of indicators, computing each shared intermediate once.
+- compute_indicator_arrays: Computes a set of indicators of one or many price series, such as the assets of a panel.
+
+Constants:
+- TECHNICAL_INDICATORS: The indicators added by `add_all_technical_indicators`, by output column.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.features import ta_numpy
+
+TECHNICAL_INDICATORS = {
+    "upper_bb": (("bbands", 20, 2.0, 2.0), 0),
+    "middle_bb": (("bbands", 20, 2.0, 2.0), 1),
+    "lower_bb": (("bbands", 20, 2.0, 2.0), 2),
+    "slowk": (("stoch", 14, 3, 3), 0),
+    "slowd": (("stoch", 14, 3, 3), 1),
+    "macd": (("macd", 12, 26, 9), 0),
+    "macdsignal": (("macd", 12, 26, 9), 1),
+    "macdhist": (("macd", 12, 26, 9), 2),
+    "rsi": (("rsi", 14), None),
+    "sma": (("rolling_mean", "Close", 30), None),
+    "ema": (("ema", "Close", 30), None),
+    "atr": (("atr", 14), None),
+    "macd_hist": (("macd", 12, 26, 9), 2),
+    "obv": (("obv",), None),
+    "cci": (("cci", 14), None),
+}
+
+
+def plan_indicators(indicators):
+    """
+    Returns the nodes needed to compute a set of indicators, each once and in dependency order.
+
+    :param indicators: A mapping from output column to a (key, output) pair.
+    :return: A list of node keys in which every node comes after the nodes it depends on.
+    """
+    order = []
+    visited = set()
+
+    def visit(key):
+        if key in visited:
+            return
+        visited.add(key)
+        for dependency in _dependencies(key):
+            visit(dependency)
+        order.append(key)
+
+    for key, _ in indicators.values():
+        visit(key)
+    return order
+
+
+def compute_indicators(data, indicators=None):
+    """
+    Computes a set of indicators, computing each shared intermediate once.
+
+    :param data: A Pandas DataFrame with the price columns the indicators need ('High', 'Low', 'Close', 'Volume').
+    :param indicators: A mapping from output column to a (key, output) pair. Defaults to `TECHNICAL_INDICATORS`.
+    :return: A DataFrame with one column per requested indicator, in the requested order, and the index of `data`.
+    """
+    return pd.DataFrame(compute_indicator_arrays(data, indicators), index=data.index)
+
+
+def compute_indicator_arrays(prices, indicators=None):
+    """
+    Computes a set of indicators of one or many price series, computing each shared intermediate once.
+
+    Every price may be a (time, series) array with one column per series, such as one column per asset of a panel,
+    in which case every indicator is computed for all series at once.
+
+    :param prices: A mapping from price column ('High', 'Low', 'Close', 'Volume') to a 1D or (time, series) array,
+                   such as a DataFrame.
+    :param indicators: A mapping from output column to a (key, output) pair. Defaults to `TECHNICAL_INDICATORS`.
+    :return: A dict from output column to a float64 array of the shape of the prices, in the requested order.
+    """
+    if indicators is None:
+        indicators = TECHNICAL_INDICATORS
+
+    order = plan_indicators(indicators)
+    # Count the dependents of every node, so it can be freed after the last of them is computed
+    remaining = Counter(
+        dependency for key in order for dependency in _dependencies(key)
+    )
+    columns_by_key = {}
+    for column, (key, output) in indicators.items():
+        columns_by_key.setdefault(key, []).append((column, output))
+
+    values = {}
+    results = {}
+    one_dimensional = True
+    for key in order:
+        operation, params = key[0], key[1:]
+        if operation == "column":
+            price = np.asarray(prices[params[0]], dtype=np.float64)
+            one_dimensional = one_dimensional and price.ndim == 1
+            values[key] = price.reshape(len(price), -1)
+        else:
+            dependencies, compute = _NODES[operation](*params)
+            values[key] = compute(*(values[dependency] for dependency in dependencies))
+            for dependency in dependencies:
+                remaining[dependency] -= 1
+                if remaining[dependency] == 0:
+                    del values[dependency]
+
+        for column, output in columns_by_key.get(key, ()):
+            results[column] = values[key] if output is None else values[key][output]
+        if remaining[key] == 0:
+            del values[key]
+
+    if one_dimensional:
+        return {column: results[column][:, 0] for column in indicators}
+    return {column: results[column] for column in indicators}
+
+
+def _dependencies(key):
+    """
+    Returns the keys of the nodes a node is computed from.
+    """
+    operation, params = key[0], key[1:]
+    if operation == "column":
+        return ()
+    if operation not in _NODES:
+        raise ValueError(f"Unknown indicator or intermediate: {operation}")
+    dependencies, _ = _NODES[operation](*params)
+    return dependencies
+
+
+def _column(name):
+    return ("column", name)
+
+
+_PRICES = (_column("High"), _column("Low"), _column("Close"))
+
+
+# Each node function takes the parameters of a key and returns the keys of the nodes it depends on, and a function
+# computing the node from their values
+
+
+def _change(column):
+    return [_column(column)], ta_numpy.price_change
+
+
+def _true_range():
+    return list(_PRICES), ta_numpy.true_range
+
+
+def _typical_price():
+    return list(_PRICES), ta_numpy.typical_price
+
+
+def _prefix_sums(column):
+    return [_column(column)], ta_numpy.prefix_sums
+
+
+def _rolling_mean(column, timeperiod):
+    def compute(x, prefix):
+        return ta_numpy.rolling_mean(x, timeperiod, prefix)
+
+    return [_column(column), ("prefix_sums", column)], compute
+
+
+def _rolling_variance(column, timeperiod):
+    def compute(x, prefix, mean):
+        return ta_numpy.rolling_variance(x, timeperiod, prefix, mean)
+
+    dependencies = [
+        _column(column),
+        ("prefix_sums", column),
+        ("rolling_mean", column, timeperiod),
+    ]
+    return dependencies, compute
+
+
+def _rolling_max(column, timeperiod):
+    def compute(x):
+        return ta_numpy.rolling_extreme(x, timeperiod, np.max)
+
+    return [_column(column)], compute
+
+
+def _rolling_min(column, timeperiod):
+    def compute(x):
+        return ta_numpy.rolling_extreme(x, timeperiod, np.min)
+
+    return [_column(column)], compute
+
+
+def _ema(column, timeperiod, start=None):
+    def compute(x):
+        return ta_numpy.ema(x, timeperiod, start)
+
+    return [_column(column)], compute
+
+
+def _bbands(timeperiod, nbdevup, nbdevdn):
+    def compute(middle, variance):
+        upper, lower = ta_numpy.bollinger_bands(middle, variance, nbdevup, nbdevdn)
+        return upper, middle, lower
+
+    dependencies = [
+        ("rolling_mean", "Close", timeperiod),
+        ("rolling_variance", "Close", timeperiod),
+    ]
+    return dependencies, compute
+
+
+def _stoch(fastk_period, slowk_period, slowd_period):
+    def compute(highest, lowest, close):
+        return ta_numpy.stochastic(highest, lowest, close, slowk_period, slowd_period)
+
+    dependencies = [
+        ("rolling_max", "High", fastk_period),
+        ("rolling_min", "Low", fastk_period),
+        _column("Close"),
+    ]
+    return dependencies, compute
+
+
+def _macd(fastperiod, slowperiod, signalperiod):
+    if slowperiod < fastperiod:
+        fastperiod, slowperiod = slowperiod, fastperiod
+    # As in TA-Lib, both averages are seeded where the slow average is first defined
+    start = slowperiod - 1
+
+    def compute(fast, slow):
+        return ta_numpy.macd_lines(fast, slow, start, signalperiod)
+
+    dependencies = [
+        ("ema", "Close", fastperiod, start),
+        ("ema", "Close", slowperiod, start),
+    ]
+    return dependencies, compute
+
+
+def _rsi(timeperiod):
+    def compute(change):
+        return ta_numpy.relative_strength(change, timeperiod)
+
+    return [("change", "Close")], compute
+
+
+def _atr(timeperiod):
+    def compute(tr):
+        return ta_numpy.average_true_range(tr, timeperiod)
+
+    return [("true_range",)], compute
+
+
+def _obv():
+    return [("change", "Close"), _column("Volume")], ta_numpy.on_balance_volume
+
+
+def _cci(timeperiod):
+    def compute(typical):
+        return ta_numpy.commodity_channel_index(typical, timeperiod)
+
+    return [("typical_price",)], compute
+
+
+_NODES = {
+    "change": _change,
+    "true_range": _true_range,
+    "typical_price": _typical_price,
+    "prefix_sums": _prefix_sums,
+    "rolling_mean": _rolling_mean,
+    "rolling_variance": _rolling_variance,
+    "rolling_max": _rolling_max,
+    "rolling_min": _rolling_min,
+    "ema": _ema,
+    "bbands": _bbands,
+    "stoch": _stoch,
+    "macd": _macd,
+    "rsi": _rsi,
+    "atr": _atr,
+    "obv": _obv,
+    "cci": _cci,
+}
@@ -0,0 +1,409 @@
+"""
+This module provides a sweep of technical indicator parameters that computes every variant in one vectorized pass.
+
+The indicator periods used by add_all_technical_indicators are fixed defaults (a 20-period Bollinger Band, a 14-period
+RSI, a 30-period SMA, a 12/26/9 MACD, ...). For feature selection, a sweep computes each indicator for a grid of
+periods, for example every SMA period from 5 to 200, and returns all variants as the columns of one matrix.
+
+Instead of calling an indicator function once per variant, the variants of an indicator are computed together, with
+one column per variant:
+- Rolling means (SMA, Bollinger Bands, the slow stochastic lines) of every period are gathered from one cumulative sum
+  of the prices.
+- Rolling extremes (the stochastic fast %K) of every period are read from one sparse table of the extremes over
+  power-of-two windows.
+- Recursive averages (EMA, MACD, and the Wilder averages of the RSI and ATR) of every variant are computed with the
+  linear filter `scipy.signal.lfilter`, one call for all the columns that share a smoothing factor and seed step.
+- The CCI needs the mean absolute deviation of every window, which is computed per period from a strided view of the
+  shared typical price.
+
+The results match the batch indicators of src.features.ta_numpy (and so TA-Lib).
+
+Example usage:
+
+    from src.features.indicator_sweep import sweep_indicators
+
+    matrix, columns = sweep_indicators(df, {
+        "sma": range(5, 205, 5),
+        "rsi": [7, 14, 21],
+        "macd": [(12, 26, 9), (5, 35, 5)],
+    })
+    # columns: ['sma_5', ..., 'rsi_7', ..., 'macd_12_26_9', 'macdsignal_12_26_9', 'macdhist_12_26_9', ...]
+
+Functions:
+- sweep_indicators: Computes every variant of a grid of indicator parameters as the columns of one matrix.
+- sweep_columns: Returns the column names of the variants of a grid, in the order of the sweep matrix.
+
+Constants:
+- SWEEP_OUTPUTS: The output columns of every indicator that can be swept, named like add_all_technical_indicators.
+"""
+import numpy as np
+from scipy.signal import lfilter
+
+from src.features import ta_numpy
+
+SWEEP_OUTPUTS = {
+    "sma": ("sma",),
+    "ema": ("ema",),
+    "bbands": ("upper_bb", "middle_bb", "lower_bb"),
+    "stoch": ("slowk", "slowd"),
+    "macd": ("macd", "macdsignal", "macdhist"),
+    "rsi": ("rsi",),
+    "atr": ("atr",),
+    "cci": ("cci",),
+}
+
+
+def sweep_columns(grid):
+    """
+    Returns the column names of the variants of a grid, in the order of the sweep matrix.
+
+    Every output of an indicator is named after the output and the parameters of the variant, e.g. 'rsi_14',
+    'upper_bb_20' or 'macdhist_12_26_9'.
+
+    :param grid: A mapping from indicator name to a list of parameters, as taken by `sweep_indicators`.
+    :return: A list of column names.
+    """
+    columns = []
+    for name, variants in grid.items():
+        for params in _normalize(name, variants):
+            suffix = "_".join(str(param) for param in params)
+            columns.extend(f"{output}_{suffix}" for output in SWEEP_OUTPUTS[name])
+    return columns
+
+
+def sweep_indicators(data, grid):
+    """
+    Computes every variant of a grid of indicator parameters as the columns of one matrix.
+
+    The grid maps an indicator name to the parameters of its variants:
+    - 'sma', 'ema', 'rsi', 'atr', 'cci', 'bbands': a list of periods.
+    - 'stoch': a list of fast %K periods, or of (fastk_period, slowk_period, slowd_period) tuples.
+    - 'macd': a list of (fastperiod, slowperiod, signalperiod) tuples.
+
+    :param data: A Pandas DataFrame with 'High', 'Low' and 'Close' prices.
+    :param grid: A mapping from indicator name to a list of parameters.
+    :return: A tuple of the (time, variants) float64 matrix and the list of its column names, as returned by
+             `sweep_columns`.
+    """
+    columns = sweep_columns(grid)
+    close = data["Close"].to_numpy(dtype=np.float64)
+    num_steps = len(close)
+    if num_steps == 0:
+        return np.empty((0, len(columns))), columns
+    grid = {name: _normalize(name, variants) for name, variants in grid.items()}
+    grid = {name: variants for name, variants in grid.items() if variants}
+
+    # Every recursive average is registered first, so averages with the same smoothing and seed step share a filter
+    averages = _RecursiveAverages()
+    ema_columns = [
+        averages.add(close, period, 2.0 / (period + 1), period - 1)
+        for (period,) in grid.get("ema", [])
+    ]
+
+    macd_columns = []
+    for fastperiod, slowperiod, signalperiod in grid.get("macd", []):
+        if slowperiod < fastperiod:
+            fastperiod, slowperiod = slowperiod, fastperiod
+        # As in TA-Lib, both averages are seeded where the slow average is first defined
+        start = slowperiod - 1
+        fast = averages.add(close, fastperiod, 2.0 / (fastperiod + 1), start)
+        slow = averages.add(close, slowperiod, 2.0 / (slowperiod + 1), start)
+        macd_columns.append((fast, slow, start, signalperiod))
+
+    rsi_columns = []
+    if "rsi" in grid:
+        change = ta_numpy.price_change(close[:, np.newaxis])[:, 0]
+        gains, losses = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+        for (period,) in grid["rsi"]:
+            rsi_columns.append(
+                (
+                    averages.add(gains, period, 1.0 / period, period),
+                    averages.add(losses, period, 1.0 / period, period),
+                )
+            )
+
+    prices = None
+    if {"atr", "cci", "stoch"} & grid.keys():
+        prices = (
+            data["High"].to_numpy(dtype=np.float64)[:, np.newaxis],
+            data["Low"].to_numpy(dtype=np.float64)[:, np.newaxis],
+            close[:, np.newaxis],
+        )
+
+    atr_columns = []
+    if "atr" in grid:
+        true_range = ta_numpy.true_range(*prices)[:, 0]
+        for (period,) in grid["atr"]:
+            # An ATR of one period is the true range itself
+            atr_columns.append(
+                None
+                if period <= 1
+                else averages.add(true_range, period, 1.0 / period, period)
+            )
+
+    smoothed = averages.run(num_steps)
+
+    results = []
+    for name, variants in grid.items():
+        if name == "sma":
+            periods = np.array([period for (period,) in variants])
+            results.append(_rolling_means(close, periods))
+        elif name == "ema":
+            results.append(smoothed[:, ema_columns])
+        elif name == "bbands":
+            results.append(_bollinger_bands(close, variants))
+        elif name == "stoch":
+            results.append(_stochastic(*prices, variants))
+        elif name == "macd":
+            results.append(_macd(smoothed, macd_columns, num_steps))
+        elif name == "rsi":
+            results.append(_relative_strength(smoothed, rsi_columns))
+        elif name == "atr":
+            results.append(
+                np.column_stack(
+                    [
+                        true_range if column is None else smoothed[:, column]
+                        for column in atr_columns
+                    ]
+                )
+            )
+        elif name == "cci":
+            typical = ta_numpy.typical_price(*prices)
+            results.append(
+                np.column_stack(
+                    [
+                        ta_numpy.commodity_channel_index(typical, period)
+                        for (period,) in variants
+                    ]
+                )
+            )
+
+    matrix = np.empty((num_steps, len(columns)))
+    offset = 0
+    for block in results:
+        matrix[:, offset : offset + block.shape[1]] = block
+        offset += block.shape[1]
+    return matrix, columns
+
+
+def _normalize(name, variants):
+    """
+    Returns the variants of an indicator as a list of parameter tuples, raising a ValueError for unknown indicators
+    and malformed parameters.
+    """
+    if name not in SWEEP_OUTPUTS:
+        raise ValueError(
+            f"Cannot sweep indicator: {name}. Sweepable indicators: {list(SWEEP_OUTPUTS)}"
+        )
+
+    normalized = []
+    for params in variants:
+        if name == "stoch" and np.ndim(params) == 0:
+            params = (params, 3, 3)
+        params = tuple(int(param) for param in np.atleast_1d(params))
+        expected = 3 if name in ("stoch", "macd") else 1
+        if len(params) != expected or min(params) < 1:
+            raise ValueError(f"Invalid parameters for {name}: {params}")
+        normalized.append(params)
+    return normalized
+
+
+class _RecursiveAverages:
+    """
+    Recursive averages y = k * x + (1 - k) * y of many series, each with its own smoothing factor and seed.
+
+    Each average is seeded at step `start` with the mean of the `period` values ending there, like `ta_numpy.ema` and
+    `ta_numpy.wilder`. The averages that share a smoothing factor and a seed step are advanced together by one call
+    of the linear filter `scipy.signal.lfilter`, as in `ta_numpy.ema`.
+    """
+
+    def __init__(self):
+        self.inputs = []
+        self.periods = []
+        self.factors = []
+        self.starts = []
+
+    def add(self, x, period, k, start):
+        """
+        Registers an average and returns its column in the result of `run`.
+        """
+        self.inputs.append(x)
+        self.periods.append(period)
+        self.factors.append(k)
+        self.starts.append(start)
+        return len(self.inputs) - 1
+
+    def run(self, num_steps):
+        """
+        Returns a (time, averages) matrix with every registered average.
+        """
+        averages = np.full((num_steps, len(self.inputs)), np.nan)
+        if not self.inputs:
+            return averages
+
+        x = np.column_stack(self.inputs)
+        seeds = _window_means(x, np.array(self.periods), np.array(self.starts))
+
+        groups = {}
+        for column, (k, start) in enumerate(zip(self.factors, self.starts)):
+            if start < num_steps:
+                groups.setdefault((k, start), []).append(column)
+
+        # Averages are NaN until their seed
+        for (k, start), columns in groups.items():
+            averages[start, columns] = seeds[columns]
+            if start + 1 < num_steps:
+                averages[start + 1 :, columns], _ = lfilter(
+                    [k],
+                    [1.0, k - 1.0],
+                    x[start + 1 :, columns],
+                    axis=0,
+                    zi=[(1.0 - k) * seeds[columns]],
+                )
+        return averages
+
+
+def _window_means(x, periods, ends):
+    """
+    Returns, for every column j of `x`, the mean of the `periods[j]` values ending at step `ends[j]` (NaN if the
+    window does not fit in `x`).
+    """
+    columns = np.arange(x.shape[1])
+    ends = np.minimum(ends, len(x) - 1)
+    starts = ends - periods + 1
+    fits = starts >= 0
+    starts = np.where(fits, starts, 0)
+
+    # The first value of each window is subtracted before summing to limit rounding errors
+    shift = x[starts, columns]
+    cumulative = np.zeros((len(x) + 1, x.shape[1]))
+    np.cumsum(np.nan_to_num(x - shift), axis=0, out=cumulative[1:])
+    sums = cumulative[ends + 1, columns] - cumulative[starts, columns]
+    return np.where(fits, sums / periods + shift, np.nan)
+
+
+def _rolling_means(x, periods):
+    """
+    Returns a (time, periods) matrix with the rolling mean of each period, gathered from one cumulative sum.
+
+    `x` is a series shared by every period, or a (time, periods) matrix with one series per period. Leading NaN values
+    of a series are skipped, as in `ta_numpy.rolling_mean`, and windows that are not full are NaN.
+    """
+    matrix = x[:, np.newaxis] if x.ndim == 1 else x
+    num_steps = len(matrix)
+    valid = ~np.isnan(matrix)
+    first = np.where(valid.any(axis=0), np.argmax(valid, axis=0), num_steps)
+    columns = np.arange(matrix.shape[1])
+
+    shift = np.nan_to_num(matrix[np.minimum(first, num_steps - 1), columns])
+    cumulative = np.zeros((num_steps + 1, matrix.shape[1]))
+    np.cumsum(np.nan_to_num(matrix - shift), axis=0, out=cumulative[1:])
+    if x.ndim == 1:
+        columns = np.zeros(len(periods), dtype=int)
+        first, shift = first[columns], shift[columns]
+
+    ends = np.arange(1, num_steps + 1)[:, np.newaxis]
+    starts = ends - periods
+    full = starts >= first
+    sums = cumulative[ends, columns] - cumulative[np.maximum(starts, 0), columns]
+    return np.where(full, sums / periods + shift, np.nan)
+
+
+def _rolling_extremes(x, periods, reduce):
+    """
+    Returns a (time, periods) matrix with the rolling maximum or minimum of each period.
+
+    Level i of a sparse table holds the extreme of the 2 ** i values starting at each step, so the extreme of any
+    window is the extreme of two overlapping power-of-two windows.
+
+    :param reduce: `np.maximum` or `np.minimum`.
+    """
+    num_steps = len(x)
+    levels = [x]
+    span = 1
+    while span * 2 <= max(periods):
+        level = np.full(num_steps, np.nan)
+        if span < num_steps:
+            level[: num_steps - span] = reduce(
+                levels[-1][: num_steps - span], levels[-1][span:]
+            )
+        levels.append(level)
+        span *= 2
+    table = np.stack(levels)
+
+    depth = np.array([int(period).bit_length() - 1 for period in periods])
+    ends = np.arange(num_steps)[:, np.newaxis]
+    starts = ends - periods + 1
+    full = starts >= 0
+    first = table[depth, np.maximum(starts, 0)]
+    second = table[depth, np.maximum(ends - 2**depth + 1, 0)]
+    return np.where(full, reduce(first, second), np.nan)
+
+
+def _bollinger_bands(close, variants):
+    """
+    Returns the upper, middle and lower bands of every period, three columns per period.
+    """
+    periods = np.array([period for (period,) in variants])
+    middle = _rolling_means(close, periods)
+    shift = close[0]
+    variance = _rolling_means((close - shift) ** 2, periods) - (middle - shift) ** 2
+    upper, lower = ta_numpy.bollinger_bands(middle, variance, 2.0, 2.0)
+    return np.stack([upper, middle, lower], axis=2).reshape(len(close), -1)
+
+
+def _stochastic(high, low, close, variants):
+    """
+    Returns the slow %K and slow %D of every variant, two columns per variant.
+    """
+    fastk_periods, slowk_periods, slowd_periods = (
+        np.array(periods) for periods in zip(*variants)
+    )
+    highest = _rolling_extremes(high[:, 0], fastk_periods, np.maximum)
+    lowest = _rolling_extremes(low[:, 0], fastk_periods, np.minimum)
+
+    diff = (highest - lowest) / 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fastk = np.where(diff != 0.0, (close - lowest) / diff, 0.0)
+    fastk[np.isnan(highest)] = np.nan
+
+    slowk = _rolling_means(fastk, slowk_periods)
+    slowd = _rolling_means(slowk, slowd_periods)
+    slowk[np.isnan(slowd)] = np.nan
+    return np.stack([slowk, slowd], axis=2).reshape(len(close), -1)
+
+
+def _macd(smoothed, macd_columns, num_steps):
+    """
+    Returns the MACD line, signal line and histogram of every variant, three columns per variant.
+
+    The signal lines are the recursive averages of the MACD lines, so they are computed together in a second pass.
+    """
+    signals = _RecursiveAverages()
+    lines = []
+    for fast, slow, start, signalperiod in macd_columns:
+        line = smoothed[:, fast] - smoothed[:, slow]
+        lines.append(line)
+        signals.add(
+            line, signalperiod, 2.0 / (signalperiod + 1), start + signalperiod - 1
+        )
+
+    macd = np.column_stack(lines)
+    signal = signals.run(num_steps)
+    macd[np.isnan(signal)] = np.nan
+    return np.stack([macd, signal, macd - signal], axis=2).reshape(num_steps, -1)
+
+
+def _relative_strength(smoothed, rsi_columns):
+    """
+    Returns the RSI of every period from its smoothed gains and losses.
+    """
+    gain = smoothed[:, [gains for gains, _ in rsi_columns]]
+    loss = smoothed[:, [losses for _, losses in rsi_columns]]
+    total = gain + loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(
+            np.abs(total) > ta_numpy.ZERO_TOLERANCE, 100.0 * (gain / total), 0.0
+        )
+    rsi[np.isnan(total)] = np.nan
+    return rsi
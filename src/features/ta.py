@@ -1,6 +1,9 @@
 """
 This module provides functions for calculating various technical indicators using the TA-Lib library.
 
+If TA-Lib is not installed, the NumPy implementations of the same TA-Lib functions in src.features.ta_numpy are used
+instead, which give the same results without the native build dependency.
+
 Functions:
 - calculate_bollinger_bands: Calculates Bollinger Bands.
 - calculate_stochastic_oscillator: Calculates the Stochastic Oscillator.
@@ -13,12 +16,15 @@ Functions:
 - calculate_obv: Calculates On Balance Volume (OBV).
 - calculate_cci: Calculates the Commodity Channel Index (CCI).
 
-Each function takes a Pandas DataFrame or Series with price data as input and returns the calculated indicator. 
-The DataFrame or Series should contain 'Close' prices, and for some indicators, 'High', 'Low', and 'Volume' data 
+Each function takes a Pandas DataFrame or Series with price data as input and returns the calculated indicator.
+The DataFrame or Series should contain 'Close' prices, and for some indicators, 'High', 'Low', and 'Volume' data
 are also required. The time period for the calculation can be specified for each indicator.
 """
 
-import talib
+try:
+    import talib
+except ImportError:
+    from src.features import ta_numpy as talib
 
 
 def calculate_bollinger_bands(data, window=20):
@@ -0,0 +1,550 @@
+"""
+This module provides pure NumPy implementations of the TA-Lib functions used by the src.features.ta module.
+
+The functions have the same names, parameters and default values as their TA-Lib counterparts and reproduce TA-Lib's
+results, including its lookback periods (leading values are NaN), the seeding of its recursive averages and its
+handling of flat price ranges. They can therefore be used in place of TA-Lib where it is not installed.
+
+Unlike TA-Lib, every function also accepts 2D arrays (or DataFrames) with time along the first axis and one column per
+series, so many assets or parameter sets are computed in a single call. Windowed sums are computed from cumulative
+sums, windowed extremes from strided window views, and the exponential and Wilder averages with a recursive filter
+(`scipy.signal.lfilter`), so no function loops over time in Python.
+
+Inputs may be float32 or float64. Calculations are carried out in float64 and the result has the dtype of the input
+(float64 for integer input). A Series input returns a Series and a DataFrame input returns a DataFrame, with the index
+(and columns) of the input; array inputs return arrays of the same shape.
+
+Functions:
+- BBANDS: Calculates Bollinger Bands.
+- STOCH: Calculates the Stochastic Oscillator.
+- MACD: Calculates the Moving Average Convergence Divergence (MACD).
+- RSI: Calculates the Relative Strength Index (RSI).
+- SMA: Calculates the Simple Moving Average (SMA).
+- EMA: Calculates the Exponential Moving Average (EMA).
+- ATR: Calculates the Average True Range (ATR).
+- OBV: Calculates On Balance Volume (OBV).
+- CCI: Calculates the Commodity Channel Index (CCI).
+
+The TA-Lib-named functions are built from the building blocks below, which work on 2D float64 arrays. Indicators that
+share an intermediate (such as a true range or an exponential average) can be computed from the same building block
+result, as src.features.indicator_graph does.
+
+Building blocks:
+- price_change, true_range, typical_price: Per-step price transforms.
+- prefix_sums, rolling_mean, rolling_variance, rolling_extreme: Windowed statistics.
+- ema, wilder: Seeded recursive averages.
+- bollinger_bands, stochastic, macd_lines, relative_strength, average_true_range, on_balance_volume,
+  commodity_channel_index: Indicators computed from the intermediates above.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# TA-Lib treats values closer to zero than this as zero
+ZERO_TOLERANCE = 1e-14
+
+
+def BBANDS(real, timeperiod=20, nbdevup=2.0, nbdevdn=2.0, matype=0):
+    """
+    Calculate Bollinger Bands: a simple moving average with bands a number of standard deviations above and below it.
+
+    :param real: A Series, DataFrame or array with the price data.
+    :param timeperiod: The number of periods to use for the calculation.
+    :param nbdevup: The number of standard deviations of the upper band above the average.
+    :param nbdevdn: The number of standard deviations of the lower band below the average.
+    :param matype: The moving average type. Only 0 (simple moving average) is supported.
+    :return: The upper band, middle band and lower band.
+    """
+    _check_matype(matype)
+    x, like = _prepare(real)
+
+    prefix = prefix_sums(x)
+    middle = rolling_mean(x, timeperiod, prefix)
+    variance = rolling_variance(x, timeperiod, prefix, middle)
+    upper, lower = bollinger_bands(middle, variance, nbdevup, nbdevdn)
+    return _restore(upper, like), _restore(middle, like), _restore(lower, like)
+
+
+def STOCH(
+    high,
+    low,
+    close,
+    fastk_period=5,
+    slowk_period=3,
+    slowk_matype=0,
+    slowd_period=3,
+    slowd_matype=0,
+):
+    """
+    Calculate the Stochastic Oscillator.
+
+    :param high: A Series, DataFrame or array with the high prices.
+    :param low: A Series, DataFrame or array with the low prices.
+    :param close: A Series, DataFrame or array with the close prices.
+    :param fastk_period: The time period for the fast %K.
+    :param slowk_period: The time period for the slow %K.
+    :param slowk_matype: The moving average type of the slow %K. Only 0 (simple moving average) is supported.
+    :param slowd_period: The time period for the slow %D.
+    :param slowd_matype: The moving average type of the slow %D. Only 0 (simple moving average) is supported.
+    :return: The slow %K and slow %D.
+    """
+    _check_matype(slowk_matype)
+    _check_matype(slowd_matype)
+    h, like = _prepare(high)
+    l, _ = _prepare(low)
+    c, _ = _prepare(close)
+
+    highest = rolling_extreme(h, fastk_period, np.max)
+    lowest = rolling_extreme(l, fastk_period, np.min)
+    slowk, slowd = stochastic(highest, lowest, c, slowk_period, slowd_period)
+    return _restore(slowk, like), _restore(slowd, like)
+
+
+def MACD(real, fastperiod=12, slowperiod=26, signalperiod=9):
+    """
+    Calculate the Moving Average Convergence Divergence (MACD).
+
+    As in TA-Lib, the fast average is seeded at the same step as the slow average, with the mean of the `fastperiod`
+    values ending there, and all three outputs start where the signal line is first defined.
+
+    :param real: A Series, DataFrame or array with the price data.
+    :param fastperiod: The short-term EMA period.
+    :param slowperiod: The long-term EMA period.
+    :param signalperiod: The signal line EMA period.
+    :return: The MACD line, the signal line, and the MACD histogram.
+    """
+    x, like = _prepare(real)
+    if slowperiod < fastperiod:
+        fastperiod, slowperiod = slowperiod, fastperiod
+
+    start = slowperiod - 1
+    slow = ema(x, slowperiod, start)
+    fast = ema(x, fastperiod, start)
+    macd, signal, hist = macd_lines(fast, slow, start, signalperiod)
+    return _restore(macd, like), _restore(signal, like), _restore(hist, like)
+
+
+def RSI(real, timeperiod=14):
+    """
+    Calculate the Relative Strength Index (RSI) with Wilder's smoothing of the average gains and losses.
+
+    :param real: A Series, DataFrame or array with the price data.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The RSI.
+    """
+    x, like = _prepare(real)
+    return _restore(relative_strength(price_change(x), timeperiod), like)
+
+
+def SMA(real, timeperiod=30):
+    """
+    Calculate the Simple Moving Average (SMA).
+
+    :param real: A Series, DataFrame or array with the price data.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The SMA.
+    """
+    x, like = _prepare(real)
+    return _restore(rolling_mean(x, timeperiod), like)
+
+
+def EMA(real, timeperiod=30):
+    """
+    Calculate the Exponential Moving Average (EMA), seeded with the simple average of the first `timeperiod` values.
+
+    :param real: A Series, DataFrame or array with the price data.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The EMA.
+    """
+    x, like = _prepare(real)
+    return _restore(ema(x, timeperiod), like)
+
+
+def ATR(high, low, close, timeperiod=14):
+    """
+    Calculate the Average True Range (ATR) with Wilder's smoothing, seeded with the simple average of the first
+    `timeperiod` true ranges.
+
+    :param high: A Series, DataFrame or array with the high prices.
+    :param low: A Series, DataFrame or array with the low prices.
+    :param close: A Series, DataFrame or array with the close prices.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The ATR.
+    """
+    h, like = _prepare(high)
+    l, _ = _prepare(low)
+    c, _ = _prepare(close)
+    return _restore(average_true_range(true_range(h, l, c), timeperiod), like)
+
+
+def OBV(real, volume):
+    """
+    Calculate On Balance Volume (OBV), starting from the first volume.
+
+    :param real: A Series, DataFrame or array with the close prices.
+    :param volume: A Series, DataFrame or array with the volume data.
+    :return: The OBV.
+    """
+    x, like = _prepare(real)
+    v, _ = _prepare(volume)
+    return _restore(on_balance_volume(price_change(x), v), like)
+
+
+def CCI(high, low, close, timeperiod=14):
+    """
+    Calculate the Commodity Channel Index (CCI) from the typical price and its mean absolute deviation.
+
+    :param high: A Series, DataFrame or array with the high prices.
+    :param low: A Series, DataFrame or array with the low prices.
+    :param close: A Series, DataFrame or array with the close prices.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The CCI.
+    """
+    h, like = _prepare(high)
+    l, _ = _prepare(low)
+    c, _ = _prepare(close)
+    return _restore(commodity_channel_index(typical_price(h, l, c), timeperiod), like)
+
+
+def price_change(x):
+    """
+    Returns the change of each value from the previous step; the first step is NaN.
+
+    :param x: A 2D float64 array with time along the first axis.
+    :return: The changes, shaped like `x`.
+    """
+    change = np.full_like(x, np.nan)
+    change[1:] = np.diff(x, axis=0)
+    return change
+
+
+def true_range(high, low, close):
+    """
+    Returns the true range: the largest of the high-low range and the distances of the high and low from the previous
+    close. The first step is NaN.
+
+    :param high: A 2D float64 array with the high prices.
+    :param low: A 2D float64 array with the low prices.
+    :param close: A 2D float64 array with the close prices.
+    :return: The true range, shaped like the prices.
+    """
+    tr = np.full_like(high, np.nan)
+    previous_close = close[:-1]
+    tr[1:] = np.maximum(
+        high[1:] - low[1:],
+        np.maximum(np.abs(previous_close - high[1:]), np.abs(previous_close - low[1:])),
+    )
+    return tr
+
+
+def typical_price(high, low, close):
+    """
+    Returns the typical price, the mean of the high, low and close prices.
+
+    :param high: A 2D float64 array with the high prices.
+    :param low: A 2D float64 array with the low prices.
+    :param close: A 2D float64 array with the close prices.
+    :return: The typical price, shaped like the prices.
+    """
+    return (high + low + close) / 3
+
+
+def prefix_sums(x):
+    """
+    Returns the cumulative sums of `x` from which the rolling mean of any period is the difference of two entries.
+
+    Leading NaN steps (the lookback of an upstream indicator) are skipped, and the first valid values are subtracted
+    before summing to limit rounding errors.
+
+    :param x: A 2D float64 array with time along the first axis.
+    :return: A (first, shift, cumulative) tuple: the first NaN-free step, the subtracted values and the cumulative
+             sums, which have one more row than there are valid steps.
+    """
+    first = _first_valid(x)
+    valid = x[first:]
+    shift = valid[0] if len(valid) else np.zeros(x.shape[1])
+    cumulative = np.zeros((len(valid) + 1, x.shape[1]))
+    np.cumsum(valid - shift, axis=0, out=cumulative[1:])
+    return first, shift, cumulative
+
+
+def rolling_mean(x, timeperiod, prefix=None):
+    """
+    Returns the mean of each window of `timeperiod` values, from the difference of two cumulative sums.
+
+    Leading NaN steps are skipped, and windows that are not full are NaN.
+
+    :param x: A 2D float64 array with time along the first axis.
+    :param timeperiod: The number of values in each window.
+    :param prefix: The `prefix_sums` of `x`, if already computed.
+    :return: The rolling means, shaped like `x`.
+    """
+    first, shift, cumulative = prefix_sums(x) if prefix is None else prefix
+    mean = np.full_like(x, np.nan)
+    if len(cumulative) - 1 < timeperiod:
+        return mean
+
+    window_sum = cumulative[timeperiod:] - cumulative[:-timeperiod]
+    mean[first + timeperiod - 1 :] = window_sum / timeperiod + shift
+    return mean
+
+
+def rolling_variance(x, timeperiod, prefix=None, mean=None):
+    """
+    Returns the population variance of each window of `timeperiod` values.
+
+    The variance is computed from the data minus the shift of its prefix sums, to limit cancellation.
+
+    :param x: A 2D float64 array with time along the first axis.
+    :param timeperiod: The number of values in each window.
+    :param prefix: The `prefix_sums` of `x`, if already computed.
+    :param mean: The `rolling_mean` of `x` over the same period, if already computed.
+    :return: The rolling variances, shaped like `x`.
+    """
+    if prefix is None:
+        prefix = prefix_sums(x)
+    if mean is None:
+        mean = rolling_mean(x, timeperiod, prefix)
+    shift = prefix[1]
+    return rolling_mean((x - shift) ** 2, timeperiod) - (mean - shift) ** 2
+
+
+def rolling_extreme(x, timeperiod, reduce):
+    """
+    Returns the maximum or minimum of each window of `timeperiod` values, from a strided view of the windows.
+
+    :param x: A 2D float64 array with time along the first axis.
+    :param timeperiod: The number of values in each window.
+    :param reduce: `np.max` or `np.min`.
+    :return: The rolling extremes, shaped like `x`.
+    """
+    extreme = np.full_like(x, np.nan)
+    if len(x) >= timeperiod:
+        windows = np.lib.stride_tricks.sliding_window_view(x, timeperiod, axis=0)
+        extreme[timeperiod - 1 :] = reduce(windows, axis=-1)
+    return extreme
+
+
+def ema(x, timeperiod, start=None):
+    """
+    Returns the exponential average of `x` with smoothing factor 2 / (timeperiod + 1), seeded at step `start` with the
+    mean of the `timeperiod` values ending there.
+
+    :param x: A 2D float64 array with time along the first axis.
+    :param timeperiod: The period of the average.
+    :param start: The step of the seed; by default `timeperiod - 1` steps after the first NaN-free step.
+    :return: The exponential average, shaped like `x`.
+    """
+    if start is None:
+        start = _first_valid(x) + timeperiod - 1
+    average = np.full_like(x, np.nan)
+    if len(x) <= start:
+        return average
+
+    seed = x[start - timeperiod + 1 : start + 1].mean(axis=0)
+    return _continue_average(x, average, start, seed, 2.0 / (timeperiod + 1))
+
+
+def wilder(x, timeperiod, offset):
+    """
+    Returns Wilder's average of `x` (an exponential average with smoothing factor 1 / timeperiod), seeded at step
+    `offset + timeperiod - 1` with the mean of the first `timeperiod` values from `offset`.
+
+    :param x: A 2D float64 array with time along the first axis.
+    :param timeperiod: The period of the average.
+    :param offset: The first step averaged.
+    :return: Wilder's average, shaped like `x`.
+    """
+    start = offset + timeperiod - 1
+    average = np.full_like(x, np.nan)
+    if len(x) <= start:
+        return average
+
+    seed = x[offset : start + 1].mean(axis=0)
+    return _continue_average(x, average, start, seed, 1.0 / timeperiod)
+
+
+def bollinger_bands(middle, variance, nbdevup, nbdevdn):
+    """
+    Returns the upper and lower Bollinger Bands around a rolling mean.
+
+    :param middle: The rolling mean.
+    :param variance: The rolling variance over the same period.
+    :param nbdevup: The number of standard deviations of the upper band above the average.
+    :param nbdevdn: The number of standard deviations of the lower band below the average.
+    :return: The upper and lower bands.
+    """
+    stddev = np.where(variance >= ZERO_TOLERANCE, np.sqrt(np.maximum(variance, 0)), 0.0)
+    stddev[np.isnan(middle)] = np.nan
+    return middle + nbdevup * stddev, middle - nbdevdn * stddev
+
+
+def stochastic(highest, lowest, close, slowk_period, slowd_period):
+    """
+    Returns the slow %K and slow %D of the Stochastic Oscillator from the rolling extremes of the prices.
+
+    :param highest: The rolling maximum of the high prices over the fast %K period.
+    :param lowest: The rolling minimum of the low prices over the fast %K period.
+    :param close: The close prices.
+    :param slowk_period: The time period for the slow %K.
+    :param slowd_period: The time period for the slow %D.
+    :return: The slow %K and slow %D.
+    """
+    diff = (highest - lowest) / 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fastk = np.where(diff != 0.0, (close - lowest) / diff, 0.0)
+    fastk[np.isnan(highest)] = np.nan
+
+    slowk = rolling_mean(fastk, slowk_period)
+    slowd = rolling_mean(slowk, slowd_period)
+
+    # TA-Lib starts both outputs where the slow %D is first defined
+    slowk[np.isnan(slowd)] = np.nan
+    return slowk, slowd
+
+
+def macd_lines(fast, slow, start, signalperiod):
+    """
+    Returns the MACD line, signal line and histogram from the fast and slow exponential averages.
+
+    :param fast: The fast exponential average, seeded at step `start`.
+    :param slow: The slow exponential average, seeded at step `start`.
+    :param start: The step at which both averages are seeded.
+    :param signalperiod: The signal line EMA period.
+    :return: The MACD line, the signal line, and the MACD histogram.
+    """
+    macd = fast - slow
+    signal = np.full_like(macd, np.nan)
+    signal[start:] = ema(macd[start:], signalperiod)
+    macd[np.isnan(signal)] = np.nan
+    return macd, signal, macd - signal
+
+
+def relative_strength(change, timeperiod):
+    """
+    Returns the RSI from the price changes, with Wilder's smoothing of the average gains and losses.
+
+    :param change: The price changes, as returned by `price_change`.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The RSI.
+    """
+    gain = wilder(np.maximum(change, 0.0), timeperiod, 1)
+    loss = wilder(np.maximum(-change, 0.0), timeperiod, 1)
+    total = gain + loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(np.abs(total) > ZERO_TOLERANCE, 100.0 * (gain / total), 0.0)
+    rsi[np.isnan(total)] = np.nan
+    return rsi
+
+
+def average_true_range(tr, timeperiod):
+    """
+    Returns the ATR from the true range, with Wilder's smoothing.
+
+    :param tr: The true range, as returned by `true_range`.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The ATR.
+    """
+    if timeperiod <= 1:
+        return tr.copy()
+    return wilder(tr, timeperiod, 1)
+
+
+def on_balance_volume(change, volume):
+    """
+    Returns the OBV from the price changes, starting from the first volume.
+
+    :param change: The price changes, as returned by `price_change`.
+    :param volume: The volume data.
+    :return: The OBV.
+    """
+    signed_volume = np.zeros_like(volume)
+    signed_volume[0] = volume[0]
+    signed_volume[1:] = np.sign(change[1:]) * volume[1:]
+    return np.cumsum(signed_volume, axis=0)
+
+
+def commodity_channel_index(typical, timeperiod):
+    """
+    Returns the CCI from the typical price and its mean absolute deviation.
+
+    :param typical: The typical price, as returned by `typical_price`.
+    :param timeperiod: The number of periods to use for the calculation.
+    :return: The CCI.
+    """
+    cci = np.full_like(typical, np.nan)
+    if len(typical) < timeperiod:
+        return cci
+
+    windows = np.lib.stride_tricks.sliding_window_view(typical, timeperiod, axis=0)
+    average = windows.sum(axis=-1) / timeperiod
+    deviation = np.abs(windows - average[..., np.newaxis]).sum(axis=-1)
+    distance = typical[timeperiod - 1 :] - average
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cci[timeperiod - 1 :] = np.where(
+            (distance != 0.0) & (deviation != 0.0),
+            distance / (0.015 * (deviation / timeperiod)),
+            0.0,
+        )
+    return cci
+
+
+def _prepare(data):
+    """
+    Converts the input of an indicator to a 2D float64 array with time along the first axis.
+
+    :return: The array and a (input, dtype, ndim) tuple used by `_restore` to shape the result like the input.
+    """
+    values = np.asarray(data)
+    dtype = values.dtype if values.dtype in (np.float32, np.float64) else np.float64
+    x = values.astype(np.float64)
+    if x.ndim == 1:
+        x = x[:, np.newaxis]
+    return x, (data, dtype, values.ndim)
+
+
+def _restore(result, like):
+    """
+    Shapes the result of an indicator like its input: a Series, DataFrame or array of the input's dtype.
+    """
+    data, dtype, ndim = like
+    result = result.astype(dtype, copy=False)
+    if ndim == 1:
+        result = result[:, 0]
+    if isinstance(data, pd.Series):
+        return pd.Series(result, index=data.index)
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.index, columns=data.columns)
+    return result
+
+
+def _check_matype(matype):
+    """
+    Raises a ValueError for moving average types other than the simple moving average.
+    """
+    if matype != 0:
+        raise ValueError(
+            f"Unsupported moving average type: {matype}. Only 0 (SMA) is supported."
+        )
+
+
+def _first_valid(x):
+    """
+    Returns the first step at which no column is NaN, i.e. where the lookback of an upstream indicator ends.
+    """
+    valid = ~np.isnan(x).any(axis=1)
+    return int(np.argmax(valid)) if valid.any() else len(x)
+
+
+def _continue_average(x, average, start, seed, k):
+    """
+    Fills `average` from step `start` on with the recursive filter y[i] = k * x[i] + (1 - k) * y[i - 1], starting
+    from `seed`.
+    """
+    average[start] = seed
+    if start + 1 < len(x):
+        average[start + 1 :], _ = lfilter(
+            [k], [1.0, k - 1.0], x[start + 1 :], axis=0, zi=[(1.0 - k) * seed]
+        )
+    return average
@@ -0,0 +1,485 @@
+"""
+This module provides incremental versions of the technical indicators in the src.features.ta module, for live use.
+
+Each indicator is a small state object that is updated one bar at a time with `update(bar)`, or with every bar of an
+array or DataFrame with `update_batch(data)`. The state has a fixed size that does not grow with the history: running
+exponential and Wilder averages for the EMA, MACD, RSI and ATR, ring buffers of cumulative sums for the rolling means,
+monotonic queues for the rolling extremes of the Stochastic Oscillator and a running total for the OBV. Every update
+therefore takes constant time, except the CCI, which needs the mean absolute deviation of its whole window and so
+takes time proportional to its period (but still not to the length of the history).
+
+The updates repeat the arithmetic of src.features.ta_numpy step by step, in the same order and with the same
+operations (squares, for example, are products as in NumPy, not calls to `pow`), so the outputs match the batch
+functions (and so TA-Lib), including the leading NaN values of their lookback periods.
+
+Single-series indicators (SMA, EMA, RSI, MACD, MACDHistogram, BollingerBands) are updated with a price. The other
+indicators are updated with a bar, a mapping such as a dict or a DataFrame row with the 'High', 'Low', 'Close' and,
+for the OBV, 'Volume' prices. Their `update_batch` takes a DataFrame with those columns.
+
+Example usage:
+
+    from src.features.ta_streaming import RSI, TechnicalIndicatorStream
+
+    rsi = RSI(period=14)
+    rsi.update_batch(df["Close"])  # warm up on the history
+    latest = rsi.update(new_close)
+
+    stream = TechnicalIndicatorStream()
+    stream.update_batch(df)
+    features = stream.update({"High": ..., "Low": ..., "Close": ..., "Volume": ...})
+
+Classes:
+- BollingerBands: Incrementally calculates Bollinger Bands.
+- StochasticOscillator: Incrementally calculates the Stochastic Oscillator.
+- MACD: Incrementally calculates the Moving Average Convergence Divergence (MACD).
+- RSI: Incrementally calculates the Relative Strength Index (RSI).
+- SMA: Incrementally calculates the Simple Moving Average (SMA).
+- EMA: Incrementally calculates the Exponential Moving Average (EMA).
+- ATR: Incrementally calculates the Average True Range (ATR).
+- MACDHistogram: Incrementally calculates the MACD Histogram.
+- OBV: Incrementally calculates On Balance Volume (OBV).
+- CCI: Incrementally calculates the Commodity Channel Index (CCI).
+- TechnicalIndicatorStream: Incrementally calculates every indicator added by `add_all_technical_indicators`.
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.features.indicator_graph import TECHNICAL_INDICATORS
+from src.features.ta_numpy import ZERO_TOLERANCE
+
+NAN = float("nan")
+
+
+class _StreamingIndicator:
+    """
+    The shared `update` and `update_batch` methods of the indicators.
+
+    Subclasses implement `_update`, taking one float per input, and set `inputs` to the bar keys they read (or None
+    for a single price) and `num_outputs` to the number of values `_update` returns.
+    """
+
+    __slots__ = ()
+    inputs = None
+    num_outputs = 1
+
+    def update(self, bar):
+        """
+        Updates the indicator with the next bar.
+
+        :param bar: The next price, or a mapping with the prices listed in `inputs`.
+        :return: The indicator value after the bar (NaN during the lookback period), or a tuple of values for
+                 indicators with several outputs.
+        """
+        if self.inputs is None:
+            return self._update(float(bar))
+        return self._update(*(float(bar[name]) for name in self.inputs))
+
+    def update_batch(self, data):
+        """
+        Updates the indicator with a sequence of bars, in order.
+
+        :param data: A Series or array of prices, or a DataFrame with the columns listed in `inputs`.
+        :return: An array with the indicator value after each bar, or a tuple of arrays for indicators with several
+                 outputs.
+        """
+        if self.inputs is None:
+            columns = [np.asarray(data, dtype=np.float64).tolist()]
+        else:
+            columns = [
+                np.asarray(data[name], dtype=np.float64).tolist()
+                for name in self.inputs
+            ]
+        results = np.array(
+            [self._update(*values) for values in zip(*columns)], dtype=np.float64
+        )
+        if self.num_outputs == 1:
+            return results
+        results = results.reshape(-1, self.num_outputs)
+        return tuple(results[:, i] for i in range(self.num_outputs))
+
+
+class _RollingMean:
+    """
+    A rolling mean from a ring buffer of cumulative sums, skipping leading NaN values like `ta_numpy.rolling_mean`.
+    """
+
+    __slots__ = ("period", "shift", "total", "totals")
+
+    def __init__(self, period):
+        self.period = period
+        self.shift = None
+        self.total = 0.0
+        self.totals = deque([0.0], maxlen=period + 1)
+
+    def update(self, x):
+        if self.shift is None:
+            if math.isnan(x):
+                return NAN
+            # The first value is subtracted before summing to limit rounding errors
+            self.shift = x
+        self.total += x - self.shift
+        self.totals.append(self.total)
+        if len(self.totals) <= self.period:
+            return NAN
+        return (self.totals[-1] - self.totals[0]) / self.period + self.shift
+
+
+class _RollingExtreme:
+    """
+    A rolling maximum or minimum from a monotonic queue of (step, value) pairs, in amortized constant time.
+    """
+
+    __slots__ = ("period", "maximum", "step", "queue")
+
+    def __init__(self, period, maximum):
+        self.period = period
+        self.maximum = maximum
+        self.step = 0
+        self.queue = deque()
+
+    def update(self, x):
+        queue = self.queue
+        # Values that can no longer be the extreme of any window are dropped
+        while queue and (queue[-1][1] <= x if self.maximum else queue[-1][1] >= x):
+            queue.pop()
+        queue.append((self.step, x))
+        if queue[0][0] <= self.step - self.period:
+            queue.popleft()
+        self.step += 1
+        return queue[0][1] if self.step >= self.period else NAN
+
+
+class _Average:
+    """
+    A recursive average y = k * x + (1 - k) * y that is seeded, `start` steps after the first NaN-free value, with the
+    mean of the last `period` values, like `ta_numpy.ema` and `ta_numpy.wilder`.
+    """
+
+    __slots__ = ("period", "k", "start", "steps", "window", "value")
+
+    def __init__(self, period, k, start=None):
+        self.period = period
+        self.k = k
+        self.start = period - 1 if start is None else start
+        self.steps = 0
+        self.window = deque(maxlen=period)
+        self.value = NAN
+
+    def update(self, x):
+        if self.steps > self.start:
+            self.value = self.k * x + (1.0 - self.k) * self.value
+            return self.value
+        if self.steps == 0 and math.isnan(x):
+            return NAN
+
+        self.window.append(x)
+        if self.steps == self.start:
+            self.value = float(np.mean(self.window))
+            # Only the seed needs the window
+            self.window = None
+        self.steps += 1
+        return self.value
+
+
+class BollingerBands(_StreamingIndicator):
+    __slots__ = ("nbdevup", "nbdevdn", "mean", "squares")
+    num_outputs = 3
+
+    def __init__(self, window=20, nbdevup=2.0, nbdevdn=2.0):
+        """
+        Initializes the indicator.
+
+        :param window: The number of periods to use for the calculation.
+        :param nbdevup: The number of standard deviations of the upper band above the average.
+        :param nbdevdn: The number of standard deviations of the lower band below the average.
+        """
+        self.nbdevup = nbdevup
+        self.nbdevdn = nbdevdn
+        self.mean = _RollingMean(window)
+        self.squares = _RollingMean(window)
+
+    def _update(self, x):
+        middle = self.mean.update(x)
+        shift = self.mean.shift
+        if shift is None:
+            return NAN, NAN, NAN
+
+        # The variance is computed from the shifted prices to limit cancellation
+        deviation, mean_deviation = x - shift, middle - shift
+        variance = (
+            self.squares.update(deviation * deviation) - mean_deviation * mean_deviation
+        )
+        if math.isnan(middle):
+            return NAN, NAN, NAN
+
+        stddev = math.sqrt(max(variance, 0.0)) if variance >= ZERO_TOLERANCE else 0.0
+        return (
+            middle + self.nbdevup * stddev,
+            middle,
+            middle - self.nbdevdn * stddev,
+        )
+
+
+class StochasticOscillator(_StreamingIndicator):
+    __slots__ = ("highest", "lowest", "slowk", "slowd")
+    inputs = ("High", "Low", "Close")
+    num_outputs = 2
+
+    def __init__(self, fastk_period=14, slowk_period=3, slowd_period=3):
+        """
+        Initializes the indicator.
+
+        :param fastk_period: The time period for the fast %K.
+        :param slowk_period: The time period for the slow %K.
+        :param slowd_period: The time period for the slow %D.
+        """
+        self.highest = _RollingExtreme(fastk_period, maximum=True)
+        self.lowest = _RollingExtreme(fastk_period, maximum=False)
+        self.slowk = _RollingMean(slowk_period)
+        self.slowd = _RollingMean(slowd_period)
+
+    def _update(self, high, low, close):
+        highest = self.highest.update(high)
+        lowest = self.lowest.update(low)
+        if math.isnan(highest):
+            fastk = NAN
+        else:
+            diff = (highest - lowest) / 100.0
+            fastk = (close - lowest) / diff if diff != 0.0 else 0.0
+
+        slowk = self.slowk.update(fastk)
+        slowd = self.slowd.update(slowk)
+        # Both outputs start where the slow %D is first defined
+        if math.isnan(slowd):
+            return NAN, NAN
+        return slowk, slowd
+
+
+class MACD(_StreamingIndicator):
+    __slots__ = ("fast", "slow", "signal")
+    num_outputs = 3
+
+    def __init__(self, fastperiod=12, slowperiod=26, signalperiod=9):
+        """
+        Initializes the indicator.
+
+        :param fastperiod: The short-term EMA period.
+        :param slowperiod: The long-term EMA period.
+        :param signalperiod: The signal line EMA period.
+        """
+        if slowperiod < fastperiod:
+            fastperiod, slowperiod = slowperiod, fastperiod
+        # As in TA-Lib, both averages are seeded where the slow average is first defined
+        self.fast = _Average(fastperiod, 2.0 / (fastperiod + 1), start=slowperiod - 1)
+        self.slow = _Average(slowperiod, 2.0 / (slowperiod + 1))
+        self.signal = _Average(signalperiod, 2.0 / (signalperiod + 1))
+
+    def _update(self, x):
+        macd = self.fast.update(x) - self.slow.update(x)
+        signal = self.signal.update(macd)
+        if math.isnan(signal):
+            return NAN, NAN, NAN
+        return macd, signal, macd - signal
+
+
+class MACDHistogram(MACD):
+    __slots__ = ()
+    num_outputs = 1
+
+    def _update(self, x):
+        return super()._update(x)[2]
+
+
+class RSI(_StreamingIndicator):
+    __slots__ = ("previous", "gain", "loss")
+
+    def __init__(self, period=14):
+        """
+        Initializes the indicator.
+
+        :param period: The number of periods to use for the calculation.
+        """
+        self.previous = None
+        self.gain = _Average(period, 1.0 / period)
+        self.loss = _Average(period, 1.0 / period)
+
+    def _update(self, x):
+        previous, self.previous = self.previous, x
+        if previous is None:
+            return NAN
+
+        change = x - previous
+        gain = self.gain.update(max(change, 0.0))
+        loss = self.loss.update(max(-change, 0.0))
+        total = gain + loss
+        if math.isnan(total):
+            return NAN
+        return 100.0 * (gain / total) if abs(total) > ZERO_TOLERANCE else 0.0
+
+
+class SMA(_StreamingIndicator):
+    __slots__ = ("mean",)
+
+    def __init__(self, period=30):
+        """
+        Initializes the indicator.
+
+        :param period: The number of periods to use for the calculation.
+        """
+        self.mean = _RollingMean(period)
+
+    def _update(self, x):
+        return self.mean.update(x)
+
+
+class EMA(_StreamingIndicator):
+    __slots__ = ("average",)
+
+    def __init__(self, period=30):
+        """
+        Initializes the indicator.
+
+        :param period: The number of periods to use for the calculation.
+        """
+        self.average = _Average(period, 2.0 / (period + 1))
+
+    def _update(self, x):
+        return self.average.update(x)
+
+
+class ATR(_StreamingIndicator):
+    __slots__ = ("previous_close", "average")
+    inputs = ("High", "Low", "Close")
+
+    def __init__(self, period=14):
+        """
+        Initializes the indicator.
+
+        :param period: The number of periods to use for the calculation.
+        """
+        self.previous_close = None
+        self.average = _Average(period, 1.0 / period) if period > 1 else None
+
+    def _update(self, high, low, close):
+        previous_close, self.previous_close = self.previous_close, close
+        if previous_close is None:
+            return NAN
+
+        true_range = max(
+            high - low, max(abs(previous_close - high), abs(previous_close - low))
+        )
+        if self.average is None:
+            return true_range
+        return self.average.update(true_range)
+
+
+class OBV(_StreamingIndicator):
+    __slots__ = ("previous", "total")
+    inputs = ("Close", "Volume")
+
+    def __init__(self):
+        """
+        Initializes the indicator.
+        """
+        self.previous = None
+        self.total = 0.0
+
+    def _update(self, close, volume):
+        if self.previous is None:
+            self.total = volume
+        elif close > self.previous:
+            self.total += volume
+        elif close < self.previous:
+            self.total -= volume
+        self.previous = close
+        return self.total
+
+
+class CCI(_StreamingIndicator):
+    __slots__ = ("period", "window")
+    inputs = ("High", "Low", "Close")
+
+    def __init__(self, period=14):
+        """
+        Initializes the indicator.
+
+        :param period: The number of periods to use for the calculation.
+        """
+        self.period = period
+        self.window = deque(maxlen=period)
+
+    def _update(self, high, low, close):
+        typical = (high + low + close) / 3
+        self.window.append(typical)
+        if len(self.window) < self.period:
+            return NAN
+
+        window = np.array(self.window)
+        average = window.sum() / self.period
+        deviation = np.abs(window - average).sum()
+        distance = typical - average
+        if distance == 0.0 or deviation == 0.0:
+            return 0.0
+        return float(distance / (0.015 * (deviation / self.period)))
+
+
+class TechnicalIndicatorStream:
+    __slots__ = ("indicators",)
+
+    def __init__(self):
+        """
+        Initializes one incremental indicator per indicator added by `add_all_technical_indicators`, with the same
+        parameters.
+        """
+        self.indicators = {
+            ("upper_bb", "middle_bb", "lower_bb"): BollingerBands(),
+            ("slowk", "slowd"): StochasticOscillator(),
+            ("macd", "macdsignal", "macdhist"): MACD(),
+            ("rsi",): RSI(),
+            ("sma",): SMA(),
+            ("ema",): EMA(),
+            ("atr",): ATR(),
+            ("obv",): OBV(),
+            ("cci",): CCI(),
+        }
+
+    def update(self, bar):
+        """
+        Updates every indicator with the next bar.
+
+        :param bar: A mapping with the 'High', 'Low', 'Close' and 'Volume' prices of the bar.
+        :return: A dict with the value of every indicator column after the bar, in the column order of
+                 `add_all_technical_indicators`.
+        """
+        values = {}
+        for columns, indicator in self.indicators.items():
+            price = bar if indicator.inputs is not None else bar["Close"]
+            result = indicator.update(price)
+            values.update(zip(columns, result if len(columns) > 1 else (result,)))
+        return self._order(values)
+
+    def update_batch(self, data):
+        """
+        Updates every indicator with a sequence of bars, in order.
+
+        :param data: A DataFrame with the 'High', 'Low', 'Close' and 'Volume' prices.
+        :return: A DataFrame with the indicator columns after each bar, with the index of `data`.
+        """
+        values = {}
+        for columns, indicator in self.indicators.items():
+            prices = data if indicator.inputs is not None else data["Close"]
+            result = indicator.update_batch(prices)
+            values.update(zip(columns, result if len(columns) > 1 else (result,)))
+        return pd.DataFrame(self._order(values), index=data.index)
+
+    @staticmethod
+    def _order(values):
+        """
+        Orders the indicator columns like `add_all_technical_indicators`, which repeats the MACD histogram as
+        'macd_hist'.
+        """
+        values["macd_hist"] = values["macdhist"]
+        return {column: values[column] for column in TECHNICAL_INDICATORS}
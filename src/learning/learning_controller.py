@@ -11,26 +11,43 @@ loads a DQN model, and runs a simulation to train the model.
 `train_model` takes in market data, initializes a trading environment with this data, 
 loads a DQN model, and runs a simulation to train the model. 
 
+`train_model_vectorized` trains a DQN model like `train_model`, but collects experience from several environments
+stepped in lockstep, choosing all of their actions with one batched forward pass.
+
+`train_model_parallel` trains a DQN model as a central learner fed by a pool of actor processes, each collecting
+experience on its own slice of the data and periodically receiving the learner's latest weights.
+
 `load_trained_model` loads a DQN model from a file.
 
 Functions:
     prep_data_and_train_model(start_date: str, end_date: str, base_model_dir: str) -> Tuple[keras.Model, pandas.DataFrame, sklearn.preprocessing.StandardScaler]: Fetches and prepares the data, trains a DQN model using the provided data, saves the trained model, and returns the model, data, and scaler.
     load_model_and_data(model_dir: str, existing_model_folder_name: str) -> Tuple[keras.Model, pandas.DataFrame, sklearn.preprocessing.StandardScaler]: Loads a DQN model, data, and scaler from the specified directory and returns them.
-    train_model(data: pandas.DataFrame, model_dir: str) -> dqn.DQN: Trains a DQN model using the provided data, saves the trained model, and returns the model.
+    train_model(data: pandas.DataFrame, model_dir: str, num_episodes: int, max_steps: int, batch_size: int, dqn_params: dict) -> dqn.DQN: Trains a DQN model using the provided data, saves the trained model, and returns the model.
+    train_model_vectorized(data: pandas.DataFrame, model_dir: str, num_envs: int, num_episodes: int, max_steps: int, batch_size: int, dqn_params: dict) -> dqn.DQN: Trains a DQN model on several environments stepped together, saves the trained model, and returns the model.
+    train_model_parallel(data: pandas.DataFrame, model_dir: str, num_actors: int, num_updates: int, sync_interval: int, batch_size: int, dqn_params: dict) -> dqn.DQN: Trains a DQN model from experience collected by parallel actor processes, saves the trained model, and returns the model.
     load_trained_model(model_path: str) -> keras.Model: Loads a DQN model from a file and returns the model.
 
 Constants:
     NUM_EPISODES (int): The number of episodes to run in the simulation.
     MAX_STEPS (int): The maximum number of steps to run in each episode.
     BATCH_SIZE (int): The size of the batch used when updating the model.
+    NUM_ENVS (int): The number of environments stepped together by `train_model_vectorized`.
+    NUM_ACTORS (int): The number of actor processes used by `train_model_parallel`.
+    NUM_UPDATES (int): The number of learner updates performed by `train_model_parallel`.
+    WEIGHT_SYNC_INTERVAL (int): The number of learner updates between weight broadcasts to the actors.
+    QUEUE_TIMEOUT (float): The number of seconds the learner waits for experience before checking that actors are alive.
 """
 
 import os
+import queue
+import multiprocessing
+import numpy as np
 from keras.models import load_model
 
-from src.learning.rl.environment import TradingEnvironment
+from src.learning.rl.environment import TradingEnvironment, VecTradingEnvironment
+from src.learning.rl.actors import run_actor, broadcast_weights
 from src.learning.rl.models import dqn
-from src.data import data_controller
+from src.data import data_controller, feature_matrix
 from src.utils import folder_manager
 from src.data.data_cleaning import normalize_data
 
@@ -38,9 +55,21 @@ from src.data.data_cleaning import normalize_data
 NUM_EPISODES = 5
 MAX_STEPS = 5
 BATCH_SIZE = 64
-
-
-def prep_data_and_train_model(start_date, end_date, base_model_dir="src/models/"):
+NUM_ENVS = 8
+NUM_ACTORS = os.cpu_count() or 1
+NUM_UPDATES = NUM_EPISODES * MAX_STEPS
+WEIGHT_SYNC_INTERVAL = 10
+QUEUE_TIMEOUT = 1.0
+
+
+def prep_data_and_train_model(
+    start_date,
+    end_date,
+    base_model_dir="src/models/",
+    cache=None,
+    data_format=data_controller.DEFAULT_DATA_FORMAT,
+    stage_cache=None,
+):
     """
     Fetches and prepares the data, trains a DQN model using the provided data, saves the trained model, and returns the model, data, and scaler.
 
@@ -48,6 +77,10 @@ def prep_data_and_train_model(start_date, end_date, base_model_dir="src/models/"
         start_date (str): The start date for the data.
         end_date (str): The end date for the data.
         base_model_dir (str): The base directory where the new model directory should be created.
+        cache (HttpCache): An optional cache used to avoid re-downloading unchanged blockchain data.
+        data_format (str): The format the prepared data is stored in: 'parquet', 'feather' or 'csv'.
+        stage_cache (StageCache): An optional cache of the data pipeline stages, so unchanged stages such as the
+            LSTM feature extraction are not rerun.
 
     Returns:
         model (keras.Model): The trained DQN model.
@@ -58,7 +91,14 @@ def prep_data_and_train_model(start_date, end_date, base_model_dir="src/models/"
     model_dir = folder_manager.create_model_directory(base_model_dir)
 
     # Fetch and prep the data
-    data = data_controller.main(start_date, end_date, model_dir)
+    data = data_controller.main(
+        start_date,
+        end_date,
+        model_dir,
+        cache=cache,
+        data_format=data_format,
+        stage_cache=stage_cache,
+    )
 
     # Train and store model
     model, scaler = train_model(data, model_dir)
@@ -82,7 +122,7 @@ def load_model_and_data(existing_model_folder_name, base_model_dir="src/models/"
     model_dir = os.path.join(base_model_dir, existing_model_folder_name)
 
     # load the data
-    data = data_controller.load_data(os.path.join(model_dir, "data.csv"))
+    data = data_controller.load_data(data_controller.find_data_path(model_dir))
 
     # load the scaler
     scaler = data_controller.load_scaler(os.path.join(model_dir, "scaler.pkl"))
@@ -93,7 +133,14 @@ def load_model_and_data(existing_model_folder_name, base_model_dir="src/models/"
     return model, data, scaler
 
 
-def train_model(data, model_dir):
+def train_model(
+    data,
+    model_dir,
+    num_episodes=NUM_EPISODES,
+    max_steps=MAX_STEPS,
+    batch_size=BATCH_SIZE,
+    dqn_params=None,
+):
     """
     Trains a DQN model using the provided data and saves the trained model.
 
@@ -105,29 +152,22 @@ def train_model(data, model_dir):
 
     Args:
         data (pandas.DataFrame): The data to use for training. This should be in a format that the TradingEnvironment can use.
+        model_dir (str): The directory where the scaler and trained model are saved.
+        num_episodes (int): The number of episodes to run.
+        max_steps (int): The maximum number of steps to run in each episode.
+        batch_size (int): The size of the batch used when updating the model.
+        dqn_params (dict): Optional keyword arguments for the DQN, such as gamma, epsilon_decay or learning_rate.
 
     Returns:
         model (dqn.DQN): The trained DQN model.
     """
 
-    # Drop the target variable for RL
-    training_data = data.drop(columns=["target"])
-
-    # Separate the log_returns
-    log_returns = training_data["log_return"]
-    training_data = training_data.drop(columns=["log_return"])
-
-    # Normalize the data
-    training_data, scaler = normalize_data(
-        training_data, path=os.path.join(model_dir, "scaler.pkl")
-    )
-
-    # Add the log_return back in
-    training_data["log_return"] = log_returns
+    training_data, scaler = _prepare_training_data(data, model_dir)
 
     # Initialize the trading environment
     print("setting up RL learning environment...")
-    env = TradingEnvironment(training_data)
+    features, log_returns, _, _ = feature_matrix.load_feature_matrix(model_dir)
+    env = TradingEnvironment.from_feature_matrix(features, log_returns)
 
     # Define the state size and action size
     state_size = len(env._get_state())
@@ -135,16 +175,16 @@ def train_model(data, model_dir):
 
     # Load the DQN model
     print("loading DQN model...")
-    model = dqn.DQN(state_size, action_size)
+    model = dqn.DQN(state_size, action_size, **(dqn_params or {}))
 
     # Run the simulation
     print("running simulation...")
-    for episode in range(NUM_EPISODES):
-        # print(f"Starting episode {episode+1} of {NUM_EPISODES}")
+    for episode in range(num_episodes):
+        # print(f"Starting episode {episode+1} of {num_episodes}")
         state = env.reset()
 
-        for step in range(MAX_STEPS):
-            # print(f"\tStep {step+1} of {MAX_STEPS}")
+        for step in range(max_steps):
+            # print(f"\tStep {step+1} of {max_steps}")
             action = model.act(state)
             next_state, reward, done = env.step(action)
 
@@ -152,14 +192,247 @@ def train_model(data, model_dir):
             model.remember(state, action, reward, next_state, done)
 
             # Update the model
-            if len(model.memory) > BATCH_SIZE:
-                model.replay(BATCH_SIZE)
+            if len(model.memory) > batch_size:
+                model.replay(batch_size)
 
             state = next_state
 
             if done:
                 break
 
+    _save_trained_model(model, model_dir)
+
+    # return the trained model only
+    return model.model, scaler
+
+
+def train_model_vectorized(
+    data,
+    model_dir,
+    num_envs=NUM_ENVS,
+    num_episodes=NUM_EPISODES,
+    max_steps=MAX_STEPS,
+    batch_size=BATCH_SIZE,
+    dqn_params=None,
+):
+    """
+    Trains a DQN model on several trading environments stepped together and saves the trained model.
+
+    The environments share the provided data but start at evenly spaced offsets, so each episode collects
+    `num_envs` experiences per step from different parts of the history. All actions for a step are chosen
+    with a single batched forward pass, and all experiences are written to memory in one call.
+
+    Args:
+        data (pandas.DataFrame): The data to use for training. This should be in a format that the TradingEnvironment can use.
+        model_dir (str): The directory where the scaler and trained model are saved.
+        num_envs (int): The number of environments to step together.
+        num_episodes (int): The number of episodes to run.
+        max_steps (int): The maximum number of steps to run in each episode.
+        batch_size (int): The size of the batch used when updating the model.
+        dqn_params (dict): Optional keyword arguments for the DQN, such as gamma, epsilon_decay or learning_rate.
+
+    Returns:
+        model (keras.Model): The trained DQN model.
+        scaler (sklearn.preprocessing.MinMaxScaler): The scaler used for data normalization.
+    """
+    training_data, scaler = _prepare_training_data(data, model_dir)
+
+    # Spread the start of each environment over the data, leaving room for a full episode
+    max_offset = max(len(training_data) - 1 - max_steps, 0)
+    start_offsets = np.linspace(0, max_offset, num_envs).astype(int)
+
+    print("setting up vectorized RL learning environment...")
+    env = VecTradingEnvironment(training_data, start_offsets=start_offsets)
+
+    state_size = env.features.shape[1]
+    action_size = 3  # actions are "buy", "sell", and "hold"
+
+    print("loading DQN model...")
+    model = dqn.DQN(state_size, action_size, **(dqn_params or {}))
+
+    print("running simulation...")
+    for episode in range(num_episodes):
+        states = env.reset()
+
+        for step in range(max_steps):
+            actions = model.act_batch(states)
+            next_states, rewards, dones = env.step(actions)
+
+            # Store the experiences of all environments in memory
+            model.remember_batch(states, actions, rewards, next_states, dones)
+
+            # Update the model
+            if len(model.memory) > batch_size:
+                model.replay(batch_size)
+
+            states = next_states
+
+            if dones.all():
+                break
+
+    _save_trained_model(model, model_dir)
+
+    return model.model, scaler
+
+
+def train_model_parallel(
+    data,
+    model_dir,
+    num_actors=NUM_ACTORS,
+    num_updates=NUM_UPDATES,
+    sync_interval=WEIGHT_SYNC_INTERVAL,
+    batch_size=BATCH_SIZE,
+    dqn_params=None,
+):
+    """
+    Trains a DQN model as a central learner fed by parallel actor processes and saves the trained model.
+
+    The prepared data is split into `num_actors` contiguous slices, and each actor process steps its own
+    TradingEnvironment over one slice of the memory-mapped feature matrix stored in the model directory, pushing
+    experience chunks to the learner through a queue. The learner stores the chunks in replay memory, trains on
+    minibatches, and broadcasts its weights and exploration rate to the actors every `sync_interval` updates.
+    Actors evaluate the Q-network with NumPy, so they do not load TensorFlow, and share one page-cached copy of
+    the data instead of each receiving a pickled slice. If every actor exits before `num_updates` updates, for
+    example because they crashed, the learner stops waiting for experience and raises an error.
+
+    Args:
+        data (pandas.DataFrame): The data to use for training. This should be in a format that the TradingEnvironment can use.
+        model_dir (str): The directory where the scaler and trained model are saved.
+        num_actors (int): The number of actor processes.
+        num_updates (int): The number of learner updates to perform.
+        sync_interval (int): The number of learner updates between weight broadcasts.
+        batch_size (int): The size of the batch used when updating the model.
+        dqn_params (dict): Optional keyword arguments for the DQN, such as gamma, epsilon_decay or learning_rate.
+
+    Returns:
+        model (keras.Model): The trained DQN model.
+        scaler (sklearn.preprocessing.MinMaxScaler): The scaler used for data normalization.
+
+    Raises:
+        RuntimeError: If every actor process exits before the learner has performed `num_updates` updates.
+    """
+    training_data, scaler = _prepare_training_data(data, model_dir)
+
+    state_size = training_data.shape[1]
+    action_size = 3  # actions are "buy", "sell", and "hold"
+
+    print("loading DQN model...")
+    model = dqn.DQN(state_size, action_size, **(dqn_params or {}))
+
+    # Spawn rather than fork so the actors do not inherit the learner's TensorFlow state
+    context = multiprocessing.get_context("spawn")
+    transition_queue = context.Queue(maxsize=4 * num_actors)
+    weights_queues = [context.Queue(maxsize=1) for _ in range(num_actors)]
+    stop_event = context.Event()
+
+    print(f"starting {num_actors} actor processes...")
+    bounds = np.linspace(0, len(training_data), num_actors + 1).astype(int)
+    actors = [
+        context.Process(
+            target=run_actor,
+            args=(
+                os.fspath(model_dir),
+                transition_queue,
+                weights_queues[i],
+                stop_event,
+            ),
+            kwargs={"seed": i, "start": bounds[i], "stop": bounds[i + 1]},
+            daemon=True,
+        )
+        for i in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    broadcast_weights(weights_queues, model.model.get_weights(), model.epsilon)
+
+    print("running learner...")
+    updates = 0
+    try:
+        while updates < num_updates:
+            # Actors that exited before the wait began have already flushed everything they sent
+            actors_alive = any(actor.is_alive() for actor in actors)
+            try:
+                chunk = transition_queue.get(timeout=QUEUE_TIMEOUT)
+            except queue.Empty:
+                if actors_alive:
+                    continue
+                exitcodes = [actor.exitcode for actor in actors]
+                raise RuntimeError(
+                    f"All actor processes exited after {updates} of {num_updates} learner updates "
+                    f"(exit codes: {exitcodes})"
+                )
+            model.remember_batch(*chunk)
+
+            if len(model.memory) > batch_size:
+                model.replay(batch_size)
+                updates += 1
+
+                if updates % sync_interval == 0:
+                    broadcast_weights(
+                        weights_queues, model.model.get_weights(), model.epsilon
+                    )
+    finally:
+        stop_event.set()
+
+        # Drain the queue so actors blocked on a full queue can exit
+        for actor in actors:
+            while actor.is_alive():
+                try:
+                    transition_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            actor.join()
+
+    _save_trained_model(model, model_dir)
+
+    return model.model, scaler
+
+
+def _prepare_training_data(data, model_dir):
+    """
+    Prepares the data for reinforcement learning.
+
+    The target column is dropped, the features are normalized (saving the scaler to the model directory),
+    and the raw log returns are appended back so the environment can calculate rewards. The prepared data is
+    also stored as a feature matrix in the model directory, so environments can memory-map it.
+
+    Args:
+        data (pandas.DataFrame): The data to prepare.
+        model_dir (str): The directory where the scaler is saved.
+
+    Returns:
+        training_data (pandas.DataFrame): The prepared data.
+        scaler (sklearn.preprocessing.MinMaxScaler): The scaler used for data normalization.
+    """
+    # Drop the target variable for RL
+    training_data = data.drop(columns=["target"])
+
+    # Separate the log_returns
+    log_returns = training_data["log_return"]
+    training_data = training_data.drop(columns=["log_return"])
+
+    # Normalize the data
+    training_data, scaler = normalize_data(
+        training_data, path=os.path.join(model_dir, "scaler.pkl")
+    )
+
+    # Add the log_return back in
+    training_data["log_return"] = log_returns
+
+    feature_matrix.save_feature_matrix(training_data, model_dir)
+
+    return training_data, scaler
+
+
+def _save_trained_model(model, model_dir):
+    """
+    Saves a trained DQN model to the model directory.
+
+    Args:
+        model (dqn.DQN): The trained DQN model.
+        model_dir (str): The directory where the model is saved.
+    """
     # Define the filename with .h5 extension
     filename = "dqn_model.h5"
 
@@ -170,9 +443,6 @@ def train_model(data, model_dir):
     model.save_model(path)
     print("model trained and saved")
 
-    # return the trained model only
-    return model.model, scaler
-
 
 def load_trained_model(model_path):
     """
@@ -0,0 +1,139 @@
+"""
+This module contains the actor side of the parallel actor/learner training mode.
+
+Each actor runs in its own process, owns a `TradingEnvironment` over a slice of the market data, and chooses actions
+epsilon-greedily with a NumPy copy of the learner's Q-network. Experiences are pushed to the learner in chunks of
+arrays through a multiprocessing queue, and the learner periodically broadcasts fresh weights and the current
+exploration rate through a per-actor queue.
+
+Actors given a model directory instead of a DataFrame open the directory's stored feature matrix as a read-only
+memory map, so all actors share one page-cached copy of the data rather than each receiving a pickled slice.
+
+Functions:
+    run_actor(data: pandas.DataFrame or str, transition_queue: Queue, weights_queue: Queue, stop_event: Event, ...) -> None: Collects experience until stopped.
+    broadcast_weights(weights_queues: list, weights: list, epsilon: float) -> None: Sends the latest weights to every actor.
+"""
+
+import os
+import queue
+
+import numpy as np
+
+from src.data import feature_matrix
+from src.learning.rl.environment import TradingEnvironment
+from src.learning.rl.models.numpy_policy import dense_forward
+
+
+def run_actor(
+    data,
+    transition_queue,
+    weights_queue,
+    stop_event,
+    chunk_size=64,
+    max_transitions=None,
+    seed=None,
+    start=0,
+    stop=None,
+):
+    """
+    Collects experience in a trading environment and pushes it to the learner.
+
+    The actor waits for the first set of weights before acting. It then steps its environment until
+    `stop_event` is set (or `max_transitions` experiences have been sent), resetting whenever an episode ends,
+    and sends experiences as (states, actions, rewards, next_states, dones) array chunks of `chunk_size`.
+
+    Args:
+        data (pandas.DataFrame or str): The slice of prepared market data this actor trades on, or a model
+            directory holding a stored feature matrix to trade on.
+        transition_queue (Queue): The queue experience chunks are pushed to.
+        weights_queue (Queue): The queue the learner broadcasts (weights, epsilon) messages on.
+        stop_event (Event): Set by the learner when collection should stop.
+        chunk_size (int): The number of experiences sent per message.
+        max_transitions (int): An optional limit on the number of experiences to send.
+        seed (int): An optional seed for the actor's random number generator.
+        start (int): The first step of the stored feature matrix to trade on, when `data` is a model directory.
+        stop (int): The step of the stored feature matrix to stop before, when `data` is a model directory.
+    """
+    rng = np.random.default_rng(seed)
+    if isinstance(data, (str, os.PathLike)):
+        features, log_returns, _, _ = feature_matrix.load_feature_matrix(
+            data, start=start, stop=stop
+        )
+        env = TradingEnvironment.from_feature_matrix(features, log_returns)
+    else:
+        env = TradingEnvironment(data)
+    state_size = env.features.shape[1]
+
+    weights, epsilon = weights_queue.get()
+    action_size = weights[-1].shape[0]
+
+    states = np.zeros((chunk_size, state_size), dtype=np.float32)
+    actions = np.zeros(chunk_size, dtype=np.int8)
+    rewards = np.zeros(chunk_size, dtype=np.float32)
+    next_states = np.zeros((chunk_size, state_size), dtype=np.float32)
+    dones = np.zeros(chunk_size, dtype=np.int8)
+
+    sent = 0
+    filled = 0
+    state = env.reset()
+    while not stop_event.is_set():
+        # Pick up the most recent weights, if any were broadcast since the last step
+        try:
+            while True:
+                weights, epsilon = weights_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        if rng.random() <= epsilon:
+            action = int(rng.integers(action_size))
+        else:
+            action = int(np.argmax(dense_forward(weights, state[np.newaxis])[0]))
+
+        next_state, reward, done = env.step(action)
+
+        states[filled] = state
+        actions[filled] = action
+        rewards[filled] = reward
+        next_states[filled] = next_state
+        dones[filled] = done
+        filled += 1
+
+        state = env.reset() if done else next_state
+
+        if filled == chunk_size:
+            chunk = (
+                states.copy(),
+                actions.copy(),
+                rewards.copy(),
+                next_states.copy(),
+                dones.copy(),
+            )
+            # Block on a full queue, but give up as soon as the learner asks to stop
+            while not stop_event.is_set():
+                try:
+                    transition_queue.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            filled = 0
+            sent += chunk_size
+
+            if max_transitions is not None and sent >= max_transitions:
+                break
+
+
+def broadcast_weights(weights_queues, weights, epsilon):
+    """
+    Sends the latest weights and exploration rate to every actor, replacing any message not yet picked up.
+
+    Args:
+        weights_queues (list of Queue): One weights queue per actor.
+        weights (list of numpy.array): The learner's current model weights.
+        epsilon (float): The learner's current exploration rate.
+    """
+    for weights_queue in weights_queues:
+        try:
+            weights_queue.get_nowait()
+        except queue.Empty:
+            pass
+        weights_queue.put((weights, epsilon))
@@ -3,22 +3,94 @@ This module contains the implementation of a trading environment for reinforceme
 
 The trading environment is a custom environment that simulates a financial market, where an agent can take actions to buy, sell, or hold stocks. The state of the environment is defined by the market data, and the reward is calculated based on the change in price resulting from the agent's actions.
 
+The market data is converted once at construction into a contiguous float32 feature matrix and a log-return vector, so each step returns a row view of the matrix and a scalar return instead of indexing the DataFrame. An environment can also be created directly over a stored feature matrix, such as a read-only memory map shared between processes.
+
+A vectorized counterpart steps many independent episodes in lockstep, holding the balances, positions and volumes of
+all of them in NumPy arrays so a batch of actions can be applied with a handful of array operations.
+
 Classes:
     TradingEnvironment: Represents the trading environment.
+    VecTradingEnvironment: Represents several independent trading environments stepped together.
+
+Constants:
+    FEE_TIERS (list of tuple): The Kraken fee tiers as (minimum total volume, fee rate) pairs, highest volume first.
 """
+
 import numpy as np
 
 
+FEE_TIERS = [
+    (500000000, 0.0004),
+    (250000000, 0.0006),
+    (100000000, 0.0008),
+    (10000000, 0.0010),
+    (5000001, 0.0012),
+    (2500001, 0.0014),
+    (1000001, 0.0016),
+    (500001, 0.0018),
+    (250001, 0.0020),
+    (100001, 0.0022),
+    (50001, 0.0024),
+    (-np.inf, 0.0026),
+]
+
+
 class TradingEnvironment:
-    def __init__(self, data, initial_balance=10000):
+    def __init__(self, data, initial_balance=10000, verbose=False, log_interval=100):
         """
         Initializes the trading environment.
 
         Args:
             data (pandas.DataFrame): The market data.
             initial_balance (float): The initial balance of the agent.
+            verbose (bool): Whether to print the state of the environment while stepping.
+            log_interval (int): The number of steps between printed states when verbose.
         """
         self.data = data
+        self.features = np.ascontiguousarray(data.to_numpy(dtype=np.float32))
+        # Log returns are kept in double precision so the balance compounds without float32 rounding
+        self.log_returns = data["log_return"].to_numpy(dtype=np.float64)
+        self._init_state(initial_balance, verbose, log_interval)
+
+    @classmethod
+    def from_feature_matrix(
+        cls,
+        features,
+        log_returns,
+        initial_balance=10000,
+        verbose=False,
+        log_interval=100,
+    ):
+        """
+        Creates a trading environment directly over a feature matrix and log-return vector.
+
+        The arrays are used as they are, without copying, so a read-only memory map opened with
+        `feature_matrix.load_feature_matrix` is shared with every other process that opens it.
+
+        Args:
+            features (numpy.array): The float32 feature matrix, shaped (steps, state_size).
+            log_returns (numpy.array): The float64 log return of each step.
+            initial_balance (float): The initial balance of the agent.
+            verbose (bool): Whether to print the state of the environment while stepping.
+            log_interval (int): The number of steps between printed states when verbose.
+
+        Returns:
+            env (TradingEnvironment): The environment, with `data` set to None.
+        """
+        env = cls.__new__(cls)
+        env.data = None
+        env.features = np.asarray(features, dtype=np.float32)
+        env.log_returns = np.asarray(log_returns, dtype=np.float64)
+        env._init_state(initial_balance, verbose, log_interval)
+        return env
+
+    def _init_state(self, initial_balance, verbose, log_interval):
+        """
+        Sets the settings and the initial trading state of a new environment.
+        """
+        self.num_steps = len(self.features)
+        self.verbose = verbose
+        self.log_interval = log_interval
         self.initial_balance = initial_balance
         self.balance = initial_balance
         self.reward = 0
@@ -78,15 +150,16 @@ class TradingEnvironment:
 
         # Update current step
         self.current_step += 1
-        self.current_step = min(self.current_step, len(self.data) - 1)
+        self.current_step = min(self.current_step, self.num_steps - 1)
 
         # Check if the episode is done
-        self.done = self.current_step >= len(self.data) - 1
+        self.done = self.current_step >= self.num_steps - 1
 
-        # print the current state
-        print(
-            f"Action: {action}, Position: {self.position}, Balance: {self.balance}, Reward: {self.reward}, Done: {self.done}, Step Return: {np.exp(self.data.iloc[self.current_step, :]['log_return'])}"
-        )
+        # print the current state every log_interval steps
+        if self.verbose and self.current_step % self.log_interval == 0:
+            print(
+                f"Step: {self.current_step}, Action: {action}, Position: {self.position}, Balance: {self.balance}, Reward: {self.reward}, Done: {self.done}, Step Return: {np.exp(self.log_returns[self.current_step])}"
+            )
 
         return self._get_state(), self.reward, self.done
 
@@ -97,16 +170,16 @@ class TradingEnvironment:
         Returns:
             reward (float): The calculated reward.
         """
-        return self.data.iloc[self.current_step, :]["log_return"]
+        return self.log_returns[self.current_step]
 
     def _get_state(self):
         """
         Returns the current state.
 
         Returns:
-            state: The current state.
+            state (numpy.array): A view of the current row of the feature matrix.
         """
-        return self.data.iloc[self.current_step, :]
+        return self.features[self.current_step]
 
     def render(self):
         """
@@ -124,23 +197,159 @@ class TradingEnvironment:
         Returns:
             fee (float): The trading fee.
         """
-        # Define the fee tiers
-        fee_tiers = [
-            (500000000, 0.0004),
-            (250000000, 0.0006),
-            (100000000, 0.0008),
-            (10000000, 0.0010),
-            (5000001, 0.0012),
-            (2500001, 0.0014),
-            (1000001, 0.0016),
-            (500001, 0.0018),
-            (250001, 0.0020),
-            (100001, 0.0022),
-            (50001, 0.0024),
-            (-np.inf, 0.0026),
-        ]
-
         # Find the correct fee tier
-        for volume, fee in fee_tiers:
+        for volume, fee in FEE_TIERS:
             if self.total_volume >= volume:  # Use total_volume instead of trade_size
                 return trade_size * fee
+
+
+class VecTradingEnvironment:
+    def __init__(
+        self,
+        data,
+        num_envs=None,
+        start_offsets=None,
+        initial_balances=10000,
+        fee_tiers=None,
+    ):
+        """
+        Initializes the vectorized trading environment.
+
+        Each environment runs over the same market data but may start at a different offset, begin with a
+        different balance and pay fees from a different tier table.
+
+        Args:
+            data (pandas.DataFrame): The market data.
+            num_envs (int): The number of environments. Inferred from `start_offsets` when not given.
+            start_offsets (array-like of int): The step each environment starts at. Defaults to 0 for all.
+            initial_balances (float or array-like of float): The initial balance, shared or per environment.
+            fee_tiers (list of tuple or list of list of tuple): A fee tier table shared by all environments,
+                or one table per environment. Defaults to FEE_TIERS.
+        """
+        if start_offsets is None:
+            start_offsets = np.zeros(num_envs or 1, dtype=np.int64)
+        self.start_offsets = np.asarray(start_offsets, dtype=np.int64)
+        self.num_envs = len(self.start_offsets)
+
+        self.data = data
+        self.features = np.ascontiguousarray(data.to_numpy(dtype=np.float32))
+        self.log_returns = data["log_return"].to_numpy(dtype=np.float64)
+        self.num_steps = len(self.features)
+
+        self.initial_balances = np.broadcast_to(
+            np.asarray(initial_balances, dtype=np.float64), (self.num_envs,)
+        ).copy()
+        self.fee_thresholds, self.fee_rates = self._build_fee_tables(fee_tiers)
+
+        self.balances = self.initial_balances.copy()
+        self.rewards = np.zeros(self.num_envs)
+        self.dones = np.zeros(self.num_envs, dtype=bool)
+        self.current_steps = self.start_offsets.copy()
+        self.positions = np.zeros(self.num_envs, dtype=np.int8)
+        self.total_volumes = np.zeros(self.num_envs)
+
+    def _build_fee_tables(self, fee_tiers):
+        """
+        Pads the fee tier tables into (num_envs, num_tiers) arrays of volume thresholds and fee rates.
+
+        Padding thresholds are +inf so they are never selected. Padding rates repeat the last tier of the table, which
+        `calculate_fees` falls back to when no threshold is reached.
+
+        Args:
+            fee_tiers (list of tuple or list of list of tuple): The shared or per environment fee tier tables.
+
+        Returns:
+            thresholds, rates (tuple of numpy.array): The padded threshold and rate tables.
+        """
+        if fee_tiers is None:
+            fee_tiers = FEE_TIERS
+        if isinstance(fee_tiers[0], tuple):
+            fee_tiers = [fee_tiers] * self.num_envs
+
+        num_tiers = max(len(tiers) for tiers in fee_tiers)
+        thresholds = np.full((self.num_envs, num_tiers), np.inf)
+        rates = np.zeros((self.num_envs, num_tiers))
+        for i, tiers in enumerate(fee_tiers):
+            thresholds[i, : len(tiers)] = [volume for volume, _ in tiers]
+            rates[i, : len(tiers)] = [fee for _, fee in tiers]
+            rates[i, len(tiers) :] = tiers[-1][1]
+        return thresholds, rates
+
+    def reset(self):
+        """
+        Resets all environments to their initial states.
+
+        Returns:
+            states (numpy.array): The initial states, shaped (num_envs, state_size).
+        """
+        self.balances = self.initial_balances.copy()
+        self.rewards = np.zeros(self.num_envs)
+        self.dones = np.zeros(self.num_envs, dtype=bool)
+        self.current_steps = self.start_offsets.copy()
+        self.positions = np.zeros(self.num_envs, dtype=np.int8)
+        return self._get_states()
+
+    def step(self, actions):
+        """
+        Takes one action in every environment.
+
+        Args:
+            actions (array-like of int): The action for each environment (0 hold, 1 buy, 2 sell).
+
+        Returns:
+            next_states (numpy.array): The next states, shaped (num_envs, state_size).
+            rewards (numpy.array): The reward for each environment.
+            dones (numpy.array): Whether each environment's episode is done.
+        """
+        actions = np.asarray(actions)
+
+        # Calculate reward before position change and update balances where a position is held
+        holding = self.positions == 1
+        self.rewards = np.where(
+            holding, np.exp(self.log_returns[self.current_steps]), 0.0
+        )
+        self.balances = np.where(holding, self.balances * self.rewards, self.balances)
+
+        # Apply a trade fee wherever an action other than hold is taken
+        buying = actions == 1
+        selling = actions == 2
+        trading = buying | selling
+        self.total_volumes += np.where(trading, self.balances, 0.0)
+        self.balances -= np.where(trading, self.calculate_fees(self.balances), 0.0)
+
+        # Update positions based on the actions
+        self.positions[buying & (self.positions == 0)] = 1
+        self.positions[selling & (self.positions == 1)] = 0
+
+        # Update current steps and check which episodes are done
+        self.current_steps = np.minimum(self.current_steps + 1, self.num_steps - 1)
+        self.dones = self.current_steps >= self.num_steps - 1
+
+        return self._get_states(), self.rewards, self.dones
+
+    def _get_states(self):
+        """
+        Returns the current states.
+
+        Returns:
+            states (numpy.array): The current rows of the feature matrix, shaped (num_envs, state_size).
+        """
+        return self.features[self.current_steps]
+
+    def calculate_fees(self, trade_sizes):
+        """
+        Calculates the trading fee for each environment based on its total volume and fee tier table.
+
+        An environment whose total volume is below every threshold of its table pays the rate of the last tier.
+
+        Args:
+            trade_sizes (numpy.array): The size of the trade in each environment.
+
+        Returns:
+            fees (numpy.array): The trading fee for each environment.
+        """
+        reached = self.total_volumes[:, np.newaxis] >= self.fee_thresholds
+        tier = np.where(
+            reached.any(axis=1), np.argmax(reached, axis=1), self.fee_rates.shape[1] - 1
+        )
+        return trade_sizes * self.fee_rates[np.arange(self.num_envs), tier]
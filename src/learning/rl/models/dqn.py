@@ -8,37 +8,75 @@ to stabilize the learning process.
 The main class in this module is `DQN`, which provides methods for building the model, predicting actions based on the current state, 
 updating the model based on the results of taking an action, and storing experiences in memory.
 
+Bootstrapped Q-value targets are computed with the target network, which is synchronized with the online network
+either by a hard copy every `target_sync_steps` training steps or by a Polyak soft update after every step.
+
+Inference and training run through graph-compiled functions with fixed input signatures that call the Keras model
+directly, avoiding the per-call overhead of `Model.predict` and `Model.fit`.
+
 Classes:
     DQN: Represents a DQN model.
 
 """
 import numpy as np
 import tensorflow as tf
-from collections import deque
 import random
 from keras.models import load_model
 
+from src.learning.rl.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+
 
 class DQN:
-    def __init__(self, state_size, action_size):
+    def __init__(
+        self,
+        state_size,
+        action_size,
+        memory_size=2000,
+        prioritized=False,
+        target_sync_steps=100,
+        tau=None,
+        gamma=0.95,
+        epsilon=0.9,
+        epsilon_min=0.01,
+        epsilon_decay=0.995,
+        learning_rate=0.001,
+    ):
         """
         Initializes the DQN model.
 
         Args:
             state_size (int): The size of the state space.
             action_size (int): The size of the action space.
+            memory_size (int): The capacity of the replay memory.
+            prioritized (bool): Whether to replay experiences in proportion to their TD error instead of uniformly.
+            target_sync_steps (int): The number of training steps between hard target network updates.
+            tau (float): If given, blend this fraction of the online weights into the target network after every
+                training step instead of copying them every `target_sync_steps` steps.
+            gamma (float): The discount rate.
+            epsilon (float): The initial exploration rate.
+            epsilon_min (float): The lowest exploration rate epsilon decays to.
+            epsilon_decay (float): The factor epsilon is multiplied by after each replay.
+            learning_rate (float): The learning rate of the Adam optimizer.
         """
         self.state_size = state_size
         self.action_size = action_size
-        self.memory = deque(maxlen=2000)
-        self.gamma = 0.95  # discount rate
-        self.epsilon = 0.9  # exploration rate
-        self.epsilon_min = 0.01
-        self.epsilon_decay = 0.995
-        self.learning_rate = 0.001
+        self.prioritized = prioritized
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(memory_size, state_size)
+        else:
+            self.memory = ReplayBuffer(memory_size, state_size)
+        self.gamma = gamma  # discount rate
+        self.epsilon = epsilon  # exploration rate
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+        self.learning_rate = learning_rate
+        self.target_sync_steps = target_sync_steps
+        self.tau = tau
+        self.train_steps = 0
         self.model = self.build_model()
         self.target_model = self.build_model()
         self.update_target_model()
+        self._build_graph_functions()
 
     def build_model(self):
         """
@@ -60,17 +98,131 @@ class DQN:
         )
         return model
 
+    def _build_graph_functions(self):
+        """
+        Compiles the inference and training functions for the current model.
+
+        The functions are traced once for the fixed input signatures below, so they must be rebuilt
+        whenever `self.model` is replaced.
+        """
+        state_spec = tf.TensorSpec(shape=(None, self.state_size), dtype=tf.float32)
+        index_spec = tf.TensorSpec(shape=(None,), dtype=tf.int32)
+        value_spec = tf.TensorSpec(shape=(None,), dtype=tf.float32)
+
+        self._q_values = tf.function(self._q_values_step, input_signature=[state_spec])
+        self._target_q_values = tf.function(
+            self._target_q_values_step, input_signature=[state_spec]
+        )
+        self._soft_update = tf.function(
+            self._blend_target_weights,
+            input_signature=[tf.TensorSpec(shape=(), dtype=tf.float32)],
+        )
+        self._train_step = tf.function(
+            self._gradient_step,
+            input_signature=[state_spec, index_spec, value_spec, value_spec],
+        )
+
+        # Preallocated single-state input used by act
+        self._act_input = np.zeros((1, self.state_size), dtype=np.float32)
+
+        # Create the optimizer variables eagerly so they are not created while tracing
+        self.model.optimizer.build(self.model.trainable_variables)
+
+    def _q_values_step(self, states):
+        """
+        Computes the Q-values of a batch of states by calling the model directly.
+
+        Args:
+            states (tf.Tensor): The states, shaped (batch_size, state_size).
+
+        Returns:
+            q_values (tf.Tensor): The Q-values, shaped (batch_size, action_size).
+        """
+        return self.model(states, training=False)
+
+    def _target_q_values_step(self, states):
+        """
+        Computes the target network Q-values of a batch of states by calling the target model directly.
+
+        Args:
+            states (tf.Tensor): The states, shaped (batch_size, state_size).
+
+        Returns:
+            q_values (tf.Tensor): The target Q-values, shaped (batch_size, action_size).
+        """
+        return self.target_model(states, training=False)
+
+    def _blend_target_weights(self, tau):
+        """
+        Moves every target network weight a fraction tau of the way towards the matching online weight.
+
+        Args:
+            tau (tf.Tensor): The blending fraction.
+        """
+        for target_weight, weight in zip(self.target_model.weights, self.model.weights):
+            target_weight.assign(tau * weight + (1.0 - tau) * target_weight)
+
+    def _gradient_step(self, states, actions, targets, weights):
+        """
+        Performs one gradient update on the weighted squared error between the targets and the Q-values of the taken actions.
+
+        Args:
+            states (tf.Tensor): The states, shaped (batch_size, state_size).
+            actions (tf.Tensor): The actions taken.
+            targets (tf.Tensor): The bootstrapped Q-value targets.
+            weights (tf.Tensor): The per-sample loss weights.
+
+        Returns:
+            td_errors (tf.Tensor): The temporal-difference errors before the update.
+        """
+        with tf.GradientTape() as tape:
+            q_values = self.model(states, training=True)
+            q_taken = tf.gather(q_values, actions, axis=1, batch_dims=1)
+            td_errors = targets - q_taken
+            loss = tf.reduce_mean(weights * tf.square(td_errors))
+
+        gradients = tape.gradient(loss, self.model.trainable_variables)
+        self.model.optimizer.apply_gradients(
+            zip(gradients, self.model.trainable_variables)
+        )
+        return td_errors
+
     def update_target_model(self):
         """
         Updates the target model weights with the current model weights.
         """
         self.target_model.set_weights(self.model.get_weights())
 
+    def soft_update_target_model(self, tau):
+        """
+        Blends the current model weights into the target model weights (Polyak averaging).
+
+        Args:
+            tau (float): The fraction of the current model weights to blend in.
+        """
+        self._soft_update(tf.constant(tau, dtype=tf.float32))
+
+    def _sync_target_model(self):
+        """
+        Synchronizes the target model after a training step, using soft updates if tau is set and
+        hard updates every `target_sync_steps` steps otherwise.
+        """
+        if self.tau is not None:
+            self.soft_update_target_model(self.tau)
+        elif self.train_steps % self.target_sync_steps == 0:
+            self.update_target_model()
+
     def remember(self, state, action, reward, next_state, done):
         """
         Stores the experience in memory.
         """
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(state, action, reward, next_state, done)
+
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Stores a batch of experiences, one per environment, in memory.
+        """
+        self.memory.add_batch(states, actions, rewards, next_states, dones)
 
     def act(self, state):
         """
@@ -84,9 +236,28 @@ class DQN:
         """
         if np.random.rand() <= self.epsilon:
             return random.randrange(self.action_size)
-        state = np.expand_dims(state, axis=0)  # Add an extra dimension for batch size
-        act_values = self.model.predict(state)
-        return np.argmax(act_values[0])  # returns action
+        self._act_input[0] = state  # Copy into the preallocated batch of one
+        act_values = self._q_values(self._act_input).numpy()
+        return int(np.argmax(act_values[0]))  # returns action
+
+    def act_batch(self, states):
+        """
+        Returns the actions to take for a batch of states, using a single forward pass.
+
+        Each state independently explores with probability epsilon.
+
+        Args:
+            states (numpy.array): The current states, shaped (num_envs, state_size).
+
+        Returns:
+            actions (numpy.array): The action to take for each state.
+        """
+        num_states = len(states)
+        states = np.asarray(states, dtype=np.float32)
+        actions = np.argmax(self._q_values(states), axis=1)
+        explore = np.random.rand(num_states) <= self.epsilon
+        actions[explore] = np.random.randint(self.action_size, size=explore.sum())
+        return actions
 
     def replay(self, batch_size):
         """
@@ -95,26 +266,34 @@ class DQN:
         Args:
             batch_size (int): The size of the batch of experiences to use for training.
         """
-        minibatch = random.sample(self.memory, batch_size)
+        indices = self.memory.sample_indices(batch_size)
+        states, actions, rewards, next_states, dones = self.memory.get(indices)
+        dones = dones.astype(bool)
+
+        # Importance-sampling weights correct the bias of prioritized sampling
+        if self.prioritized:
+            weights = self.memory.importance_weights(indices)
+        else:
+            weights = np.ones(batch_size, dtype=np.float32)
 
         # Decay epsilon after each replay
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                # Reshape the next_state
-                next_state = np.reshape(next_state, [1, self.state_size])
-                target = reward + self.gamma * np.amax(
-                    self.model.predict(next_state)[0]
-                )
-            # Reshape the state
-            state = np.reshape(state, [1, self.state_size])
-            target_f = self.model.predict(state, verbose=0)
-            target_f[0][action] = target
-
-            self.model.fit(state, target_f, epochs=1, verbose=0)
+        # One target network forward pass for the bootstrapped values
+        next_q_values = self._target_q_values(next_states).numpy()
+        targets = rewards + self.gamma * np.amax(next_q_values, axis=1) * (~dones)
+
+        # Single compiled gradient update for the whole minibatch
+        td_errors = self._train_step(
+            states, actions.astype(np.int32), targets.astype(np.float32), weights
+        ).numpy()
+
+        if self.prioritized:
+            self.memory.update_priorities(indices, td_errors)
+
+        self.train_steps += 1
+        self._sync_target_model()
 
     def save_model(self, model_path):
         """
@@ -135,3 +314,5 @@ class DQN:
         """
         print("loading model")
         self.model = load_model(model_path)
+        self._build_graph_functions()
+        self.update_target_model()
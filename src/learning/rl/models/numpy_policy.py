@@ -0,0 +1,93 @@
+"""
+This module contains a NumPy implementation of the forward pass of the dense DQN architecture.
+
+It lets processes that only need to choose actions, such as actor processes collecting experience, evaluate the
+Q-network from a list of weight arrays without importing TensorFlow.
+
+Several models with the same architecture can also be evaluated together, by stacking their weights and computing
+every model's Q-values in one batched matrix product per layer.
+
+Functions:
+    dense_forward(weights: list, states: numpy.array) -> numpy.array: Computes Q-values for a batch of states.
+    stacked_dense_forward(weight_sets: list, states: numpy.array) -> numpy.array: Computes the Q-values of several models at once.
+    dense_weights(model: keras.Model) -> list: Returns the weights of a model if `dense_forward` can evaluate it.
+"""
+import numpy as np
+
+
+def dense_forward(weights, states):
+    """
+    Computes the Q-values of a batch of states with a stack of dense layers.
+
+    The weights are in the order returned by `keras.Model.get_weights` for a Sequential model of Dense layers,
+    i.e. kernel and bias alternating. Hidden layers use ReLU activations and the output layer is linear,
+    matching `DQN.build_model`.
+
+    Args:
+        weights (list of numpy.array): The kernels and biases of the dense layers.
+        states (numpy.array): The states, shaped (batch_size, state_size).
+
+    Returns:
+        q_values (numpy.array): The Q-values, shaped (batch_size, action_size).
+    """
+    outputs = np.asarray(states, dtype=np.float32)
+    num_layers = len(weights) // 2
+    for layer in range(num_layers):
+        kernel, bias = weights[2 * layer], weights[2 * layer + 1]
+        outputs = outputs @ kernel + bias
+        if layer < num_layers - 1:
+            np.maximum(outputs, 0, out=outputs)
+    return outputs
+
+
+def stacked_dense_forward(weight_sets, states):
+    """
+    Computes the Q-values of several models with the same dense architecture for a shared batch of states.
+
+    The kernels and biases of each layer are stacked along a leading model axis, so every layer is a single
+    batched matrix product over all models.
+
+    Args:
+        weight_sets (list of list of numpy.array): The weights of each model, as accepted by `dense_forward`.
+        states (numpy.array): The states, shaped (batch_size, state_size).
+
+    Returns:
+        q_values (numpy.array): The Q-values, shaped (num_models, batch_size, action_size).
+    """
+    outputs = np.asarray(states, dtype=np.float32)[np.newaxis]
+    num_layers = len(weight_sets[0]) // 2
+    for layer in range(num_layers):
+        kernels = np.stack([weights[2 * layer] for weights in weight_sets])
+        biases = np.stack([weights[2 * layer + 1] for weights in weight_sets])
+        outputs = outputs @ kernels + biases[:, np.newaxis, :]
+        if layer < num_layers - 1:
+            np.maximum(outputs, 0, out=outputs)
+    return outputs
+
+
+def dense_weights(model):
+    """
+    Returns the weights of a model if it is a stack of dense layers that `dense_forward` can evaluate.
+
+    The layers are inspected by name, so TensorFlow does not need to be imported.
+
+    Args:
+        model (keras.Model): The model to inspect.
+
+    Returns:
+        weights (list of numpy.array): The model's kernels and biases, or None if the model has any other
+            architecture (layer types, activations or biases).
+    """
+    layers = getattr(model, "layers", None)
+    if not isinstance(layers, list) or not layers:
+        return None
+
+    for i, layer in enumerate(layers):
+        activation = getattr(getattr(layer, "activation", None), "__name__", None)
+        expected = "linear" if i == len(layers) - 1 else "relu"
+        if type(layer).__name__ != "Dense" or activation != expected:
+            return None
+        if not getattr(layer, "use_bias", False):
+            return None
+
+    return model.get_weights()
@@ -0,0 +1,315 @@
+"""
+This module contains the implementation of an array-backed experience replay buffer for reinforcement learning.
+
+The replay buffer preallocates contiguous NumPy arrays for the states, actions, rewards, next states and done flags,
+and writes new experiences into them through a cursor that wraps around once the buffer is full. This keeps memory use
+fixed at construction time and allows a minibatch to be sampled with a single vectorized index operation.
+
+A prioritized variant samples experiences in proportion to their temporal-difference error instead of uniformly. The
+priorities are kept in a sum-tree stored in a flat NumPy array, so sampling and priority updates cost O(log N) per item
+and are performed for a whole minibatch at once.
+
+Classes:
+    ReplayBuffer: Represents a fixed-capacity ring buffer of experiences.
+    SumTree: Represents a binary sum-tree over a fixed number of non-negative priorities.
+    PrioritizedReplayBuffer: Represents a ring buffer of experiences with proportional prioritized sampling.
+"""
+import numpy as np
+
+
+class ReplayBuffer:
+    def __init__(self, capacity, state_size, seed=None):
+        """
+        Initializes the replay buffer.
+
+        Args:
+            capacity (int): The maximum number of experiences to store.
+            state_size (int): The size of the state space.
+            seed (int): An optional seed for the random number generator used for sampling.
+        """
+        self.capacity = capacity
+        self.state_size = state_size
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.int8)
+        self.position = 0  # write cursor
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        """
+        Returns the number of experiences currently stored.
+        """
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Stores a single experience at the write cursor, overwriting the oldest experience once the buffer is full.
+
+        Args:
+            state (numpy.array): The state the action was taken in.
+            action (int): The action taken.
+            reward (float): The reward received.
+            next_state (numpy.array): The resulting state.
+            done (bool): Whether the episode ended.
+
+        Returns:
+            index (int): The index the experience was written to.
+        """
+        index = self.position
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.dones[index] = done
+
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Stores a batch of experiences at consecutive positions from the write cursor, wrapping around as needed.
+
+        Args:
+            states (numpy.array): The states the actions were taken in, shaped (n, state_size).
+            actions (numpy.array): The actions taken.
+            rewards (numpy.array): The rewards received.
+            next_states (numpy.array): The resulting states, shaped (n, state_size).
+            dones (numpy.array): Whether each episode ended.
+
+        Returns:
+            indices (numpy.array): The indices the experiences were written to.
+        """
+        count = len(actions)
+        indices = (self.position + np.arange(count)) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones
+
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+        return indices
+
+    def sample_indices(self, batch_size):
+        """
+        Draws random indices of stored experiences, uniformly and with replacement.
+
+        Args:
+            batch_size (int): The number of indices to draw.
+
+        Returns:
+            indices (numpy.array): The drawn indices.
+        """
+        return self.rng.integers(0, self.size, size=batch_size)
+
+    def get(self, indices):
+        """
+        Gathers the experiences stored at the given indices.
+
+        Args:
+            indices (numpy.array): The indices of the experiences to gather.
+
+        Returns:
+            states, actions, rewards, next_states, dones (tuple of numpy.array): The gathered experiences.
+        """
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            self.next_states[indices],
+            self.dones[indices],
+        )
+
+    def sample(self, batch_size):
+        """
+        Samples a random minibatch of experiences.
+
+        Args:
+            batch_size (int): The number of experiences to sample.
+
+        Returns:
+            states, actions, rewards, next_states, dones (tuple of numpy.array): The sampled experiences.
+        """
+        return self.get(self.sample_indices(batch_size))
+
+
+class SumTree:
+    def __init__(self, capacity):
+        """
+        Initializes the sum-tree.
+
+        The tree is stored in a flat array where node i has children 2i and 2i + 1, the root is at index 1 and the
+        leaves start at `leaf_count`, the capacity rounded up to a power of two.
+
+        Args:
+            capacity (int): The number of priorities to hold.
+        """
+        self.capacity = capacity
+        self.leaf_count = 1
+        while self.leaf_count < capacity:
+            self.leaf_count *= 2
+        self.depth = self.leaf_count.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaf_count, dtype=np.float64)
+
+    def total(self):
+        """
+        Returns the sum of all priorities.
+        """
+        return self.tree[1]
+
+    def get(self, indices):
+        """
+        Returns the priorities stored at the given leaf indices.
+
+        Args:
+            indices (numpy.array): The leaf indices.
+
+        Returns:
+            priorities (numpy.array): The stored priorities.
+        """
+        return self.tree[self.leaf_count + np.asarray(indices)]
+
+    def update(self, indices, priorities):
+        """
+        Sets the priorities at the given leaf indices and refreshes their ancestors level by level.
+
+        Args:
+            indices (numpy.array): The leaf indices to update.
+            priorities (numpy.array): The new priorities.
+        """
+        nodes = self.leaf_count + np.asarray(indices)
+        self.tree[nodes] = priorities
+
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        """
+        Finds, for each value, the leaf whose cumulative priority range contains it.
+
+        All values descend the tree together, one level per iteration.
+
+        Args:
+            values (numpy.array): Values in the range [0, total).
+
+        Returns:
+            indices (numpy.array): The leaf indices found.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sums = self.tree[left]
+            go_right = values > left_sums
+            values -= left_sums * go_right
+            nodes = left + go_right
+        return np.minimum(nodes - self.leaf_count, self.capacity - 1)
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    def __init__(
+        self,
+        capacity,
+        state_size,
+        alpha=0.6,
+        beta=0.4,
+        beta_increment=0.001,
+        epsilon=1e-6,
+        seed=None,
+    ):
+        """
+        Initializes the prioritized replay buffer.
+
+        Args:
+            capacity (int): The maximum number of experiences to store.
+            state_size (int): The size of the state space.
+            alpha (float): How strongly priorities shape the sampling distribution (0 is uniform).
+            beta (float): The initial importance-sampling correction exponent, annealed towards 1.
+            beta_increment (float): The amount beta grows by on every sample.
+            epsilon (float): A small constant added to errors so no experience has zero priority.
+            seed (int): An optional seed for the random number generator used for sampling.
+        """
+        super().__init__(capacity, state_size, seed=seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Stores a single experience with the highest priority seen so far, so it is replayed at least once soon.
+
+        Returns:
+            index (int): The index the experience was written to.
+        """
+        index = super().add(state, action, reward, next_state, done)
+        self.tree.update([index], [self.max_priority**self.alpha])
+        return index
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Stores a batch of experiences, each with the highest priority seen so far.
+
+        Returns:
+            indices (numpy.array): The indices the experiences were written to.
+        """
+        indices = super().add_batch(states, actions, rewards, next_states, dones)
+        priorities = np.full(len(indices), self.max_priority**self.alpha)
+        self.tree.update(indices, priorities)
+        return indices
+
+    def sample_indices(self, batch_size):
+        """
+        Draws indices of stored experiences in proportion to their priorities.
+
+        The total priority is split into `batch_size` equal segments and one value is drawn from each,
+        which spreads the minibatch over the whole distribution.
+
+        Args:
+            batch_size (int): The number of indices to draw.
+
+        Returns:
+            indices (numpy.array): The drawn indices.
+        """
+        segment = self.tree.total() / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        # Guard against rounding carrying a value past the last filled slot
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return indices
+
+    def importance_weights(self, indices):
+        """
+        Calculates the importance-sampling weights that correct for the non-uniform sampling of the given indices.
+
+        Args:
+            indices (numpy.array): The sampled indices.
+
+        Returns:
+            weights (numpy.array): The weights, normalized so the largest is 1.
+        """
+        probabilities = self.tree.get(indices) / self.tree.total()
+        weights = (self.size * probabilities) ** -self.beta
+        return (weights / weights.max()).astype(np.float32)
+
+    def update_priorities(self, indices, td_errors):
+        """
+        Updates the priorities of replayed experiences from their temporal-difference errors.
+
+        Args:
+            indices (numpy.array): The indices of the replayed experiences.
+            td_errors (numpy.array): The temporal-difference errors of the replayed experiences.
+        """
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.tree.update(indices, priorities**self.alpha)
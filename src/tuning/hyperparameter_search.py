@@ -0,0 +1,302 @@
+"""
+This module provides search strategies for tuning hyperparameters in parallel.
+
+Trials are evaluated in a pool of worker processes, each pinned to its own CPU where the platform supports it, and
+every evaluation is written to a `ResultsStore`. Weak trials are terminated early by successive halving: all trials
+are evaluated on a small budget, and only the best fraction is re-evaluated on a larger budget.
+
+Functions:
+- grid_configs: Expands a grid of parameter values into every combination.
+- sample_configs: Draws random configurations from parameter distributions.
+- log_uniform: Creates a log-uniform distribution for use with `sample_configs`.
+- run_trials: Evaluates configurations on a budget in a pool of pinned worker processes.
+- grid_search: Evaluates every combination of a parameter grid.
+- random_search: Evaluates randomly sampled configurations.
+- successive_halving: Repeatedly evaluates configurations on growing budgets, keeping the best fraction each round.
+- hyperband: Runs successive halving over several brackets that trade off the number of trials against their budget.
+
+An objective is a picklable function `objective(config, budget)` that returns a score to maximize.
+"""
+import itertools
+import math
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def grid_configs(param_grid):
+    """
+    Expands a grid of parameter values into every combination.
+
+    :param param_grid: A dictionary mapping each parameter name to a list of values.
+    :return: A list of configuration dictionaries.
+    """
+    names = list(param_grid)
+    return [
+        _to_builtin(dict(zip(names, values)))
+        for values in itertools.product(*(param_grid[name] for name in names))
+    ]
+
+
+def sample_configs(param_distributions, num_configs, seed=None):
+    """
+    Draws random configurations from parameter distributions.
+
+    :param param_distributions: A dictionary mapping each parameter name to either a list of values, sampled
+                                uniformly, or a callable taking a numpy random Generator and returning a value.
+    :param num_configs: The number of configurations to draw.
+    :param seed: An optional seed for the random number generator.
+    :return: A list of configuration dictionaries.
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(num_configs):
+        config = {}
+        for name, distribution in param_distributions.items():
+            if callable(distribution):
+                config[name] = distribution(rng)
+            else:
+                config[name] = distribution[rng.integers(len(distribution))]
+        configs.append(_to_builtin(config))
+    return configs
+
+
+def log_uniform(low, high):
+    """
+    Creates a log-uniform distribution for use with `sample_configs`, e.g. for learning rates.
+
+    :param low: The lower bound.
+    :param high: The upper bound.
+    :return: A callable drawing a value from the distribution with a numpy random Generator.
+    """
+
+    def draw(rng):
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+
+    return draw
+
+
+def run_trials(objective, configs, budget, max_workers=None):
+    """
+    Evaluates configurations on a budget in a pool of worker processes.
+
+    Each worker pins itself to one CPU (on platforms that support `os.sched_setaffinity`), so concurrent trials
+    do not compete for the same cores.
+
+    :param objective: A picklable function `objective(config, budget)` returning a score to maximize.
+    :param configs: The configuration dictionaries to evaluate.
+    :param budget: The budget (e.g. number of training episodes) given to every trial.
+    :param max_workers: The number of worker processes. Defaults to the number of available CPUs.
+    :return: A list of scores in the same order as `configs`.
+    """
+    # A pool needs at least one worker, and there is nothing to evaluate
+    if not configs:
+        return []
+
+    cpus = _available_cpus()
+    max_workers = min(max_workers or len(cpus), len(configs))
+
+    context = multiprocessing.get_context("spawn")
+    cpu_queue = context.Queue()
+    for i in range(max_workers):
+        cpu_queue.put(cpus[i % len(cpus)])
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_pin_worker,
+        initargs=(cpu_queue,),
+    ) as executor:
+        return list(executor.map(objective, configs, [budget] * len(configs)))
+
+
+def grid_search(objective, param_grid, budget, store, max_workers=None):
+    """
+    Evaluates every combination of a parameter grid.
+
+    :param objective: A picklable function `objective(config, budget)` returning a score to maximize.
+    :param param_grid: A dictionary mapping each parameter name to a list of values.
+    :param budget: The budget given to every trial.
+    :param store: The ResultsStore the evaluations are recorded in.
+    :param max_workers: The number of worker processes.
+    :return: A list of (config, score) tuples, best first.
+    """
+    configs = grid_configs(param_grid)
+    return _evaluate(objective, configs, budget, store, max_workers, search="grid")
+
+
+def random_search(
+    objective,
+    param_distributions,
+    num_trials,
+    budget,
+    store,
+    max_workers=None,
+    seed=None,
+):
+    """
+    Evaluates randomly sampled configurations.
+
+    :param objective: A picklable function `objective(config, budget)` returning a score to maximize.
+    :param param_distributions: The parameter distributions, as accepted by `sample_configs`.
+    :param num_trials: The number of configurations to evaluate.
+    :param budget: The budget given to every trial.
+    :param store: The ResultsStore the evaluations are recorded in.
+    :param max_workers: The number of worker processes.
+    :param seed: An optional seed for sampling.
+    :return: A list of (config, score) tuples, best first.
+    """
+    configs = sample_configs(param_distributions, num_trials, seed=seed)
+    return _evaluate(objective, configs, budget, store, max_workers, search="random")
+
+
+def successive_halving(
+    objective,
+    configs,
+    min_budget,
+    max_budget,
+    store,
+    eta=3,
+    max_workers=None,
+    bracket=0,
+):
+    """
+    Evaluates configurations on growing budgets, keeping only the best 1/eta of them after each round.
+
+    Trials are restarted from scratch on each larger budget, so weak trials stop consuming compute
+    after the first rung they fall behind on.
+
+    :param objective: A picklable function `objective(config, budget)` returning a score to maximize.
+    :param configs: The configuration dictionaries to start with.
+    :param min_budget: The budget of the first round.
+    :param max_budget: The largest budget any trial is given.
+    :param store: The ResultsStore the evaluations are recorded in.
+    :param eta: The factor by which the number of trials shrinks and the budget grows each round.
+    :param max_workers: The number of worker processes.
+    :param bracket: The Hyperband bracket this run belongs to, recorded with the results.
+    :return: A list of (config, score) tuples from the final round, best first.
+    """
+    budget = min_budget
+    rung = 0
+    while True:
+        ranked = _evaluate(
+            objective,
+            configs,
+            budget,
+            store,
+            max_workers,
+            search="successive_halving",
+            bracket=bracket,
+            rung=rung,
+        )
+        if len(ranked) <= 1 or budget >= max_budget:
+            return ranked
+
+        configs = [config for config, _ in ranked[: max(1, len(ranked) // eta)]]
+        budget = min(budget * eta, max_budget)
+        rung += 1
+
+
+def hyperband(
+    objective,
+    param_distributions,
+    min_budget,
+    max_budget,
+    store,
+    eta=3,
+    max_workers=None,
+    seed=None,
+):
+    """
+    Runs successive halving over several brackets of randomly sampled configurations.
+
+    Brackets range from many trials starting on `min_budget` to a few trials given `max_budget` straight away,
+    which hedges against weak early results being misleading.
+
+    :param objective: A picklable function `objective(config, budget)` returning a score to maximize.
+    :param param_distributions: The parameter distributions, as accepted by `sample_configs`.
+    :param min_budget: The smallest budget any trial is given.
+    :param max_budget: The largest budget any trial is given.
+    :param store: The ResultsStore the evaluations are recorded in.
+    :param eta: The factor by which the number of trials shrinks and the budget grows each round.
+    :param max_workers: The number of worker processes.
+    :param seed: An optional seed for sampling.
+    :return: A list of (config, score) tuples from the final round of every bracket, best first.
+    """
+    rng = np.random.default_rng(seed)
+    s_max = int(math.floor(math.log(max_budget / min_budget, eta) + 1e-9))
+
+    results = []
+    for s in range(s_max, -1, -1):
+        num_configs = int(math.ceil((s_max + 1) / (s + 1) * eta**s))
+        budget = max(min_budget, int(round(max_budget * eta**-s)))
+        configs = sample_configs(
+            param_distributions, num_configs, seed=int(rng.integers(2**31))
+        )
+        results += successive_halving(
+            objective,
+            configs,
+            budget,
+            max_budget,
+            store,
+            eta=eta,
+            max_workers=max_workers,
+            bracket=s,
+        )
+    return sorted(results, key=lambda result: result[1], reverse=True)
+
+
+def _evaluate(objective, configs, budget, store, max_workers, **metadata):
+    """
+    Evaluates configurations in parallel, records every evaluation, and ranks the results.
+
+    :return: A list of (config, score) tuples, best first.
+    """
+    scores = run_trials(objective, configs, budget, max_workers=max_workers)
+    for config, score in zip(configs, scores):
+        store.append(
+            dict(
+                metadata,
+                trial_id=uuid.uuid4().hex[:8],
+                config=config,
+                budget=budget,
+                score=float(score),
+            )
+        )
+    ranked = sorted(zip(configs, scores), key=lambda result: result[1], reverse=True)
+    return [(config, float(score)) for config, score in ranked]
+
+
+def _available_cpus():
+    """
+    Returns the CPUs this process may run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _pin_worker(cpu_queue):
+    """
+    Pins the calling worker process to the next CPU from the queue.
+
+    Also limits the common native thread pools to one thread, so a trial does not oversubscribe its core.
+    """
+    cpu = cpu_queue.get()
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = "1"
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+
+def _to_builtin(config):
+    """
+    Converts numpy scalars in a configuration to Python builtins so it can be stored as JSON.
+    """
+    return {
+        name: value.item() if isinstance(value, np.generic) else value
+        for name, value in config.items()
+    }
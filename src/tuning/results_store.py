@@ -0,0 +1,60 @@
+"""
+This module provides a local store for hyperparameter search results.
+
+Each evaluated trial is appended as one JSON line to a results file, so results from interrupted or repeated searches
+are kept and can be loaded back as a DataFrame for comparison.
+
+Classes:
+    ResultsStore: Represents an append-only JSON lines file of trial results.
+"""
+import json
+import os
+import datetime
+
+import pandas as pd
+
+
+class ResultsStore:
+    def __init__(self, results_dir, filename="results.jsonl"):
+        """
+        Initializes the results store, creating the results directory if needed.
+
+        :param results_dir: The directory where the results file is stored.
+        :param filename: The name of the results file.
+        """
+        os.makedirs(results_dir, exist_ok=True)
+        self.path = os.path.join(results_dir, filename)
+
+    def append(self, record):
+        """
+        Appends a trial result to the store, stamped with the time it was recorded.
+
+        :param record: A JSON-serializable dictionary describing the trial, e.g. its config, budget and score.
+        """
+        record = dict(record, recorded_at=datetime.datetime.now().isoformat())
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def load(self):
+        """
+        Loads all stored trial results.
+
+        :return: A DataFrame with one row per recorded trial evaluation.
+        """
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return pd.DataFrame(records)
+
+    def best(self, n=1):
+        """
+        Returns the highest scoring trial evaluations.
+
+        :param n: The number of evaluations to return.
+        :return: A DataFrame with the top `n` evaluations, best first.
+        """
+        results = self.load()
+        if results.empty:
+            return results
+        return results.sort_values("score", ascending=False).head(n)
@@ -0,0 +1,145 @@
+"""
+This module provides functions to tune the DQN and training hyperparameters.
+
+Functions:
+- tune_hyperparameters: Searches the hyperparameter space with grid search, random search or Hyperband.
+- evaluate_trial: Trains a DQN model with a trial configuration and scores it.
+- score_policy: Scores a trained model by trading greedily over the data.
+
+Trials are evaluated in parallel worker processes by the src.tuning.hyperparameter_search module, and every evaluation
+is recorded in a ResultsStore in the results directory. The budget of a trial is its number of training episodes.
+
+Constants:
+- DEFAULT_SEARCH_SPACE: The parameter distributions searched when none are given.
+- TRAINING_PARAMS: The configuration keys passed to the training loop rather than to the DQN.
+"""
+import functools
+import tempfile
+
+import numpy as np
+
+from src.learning import learning_controller
+from src.learning.rl.environment import TradingEnvironment
+from src.learning.rl.models.numpy_policy import dense_forward
+from src.tuning import hyperparameter_search
+from src.tuning.results_store import ResultsStore
+
+DEFAULT_SEARCH_SPACE = {
+    "gamma": [0.9, 0.95, 0.99],
+    "epsilon_decay": [0.99, 0.995, 0.999],
+    "learning_rate": hyperparameter_search.log_uniform(1e-4, 1e-2),
+    "max_steps": [5, 50, 500],
+    "batch_size": [32, 64, 128],
+}
+TRAINING_PARAMS = ("max_steps", "batch_size")
+
+
+def tune_hyperparameters(
+    data,
+    results_dir="src/tuning/results",
+    method="hyperband",
+    search_space=None,
+    min_budget=1,
+    max_budget=27,
+    num_trials=20,
+    max_workers=None,
+    seed=None,
+):
+    """
+    Searches the hyperparameter space for the configuration that trades best over the data.
+
+    :param data: The data to train and score on, as returned by data_controller.main.
+    :param results_dir: The directory where the results are stored.
+    :param method: The search method, one of 'grid', 'random' or 'hyperband'.
+    :param search_space: The parameter distributions (or, for grid search, lists of values) to search.
+                         Defaults to DEFAULT_SEARCH_SPACE.
+    :param min_budget: The smallest number of training episodes a trial is given.
+    :param max_budget: The largest number of training episodes a trial is given.
+    :param num_trials: The number of trials for random search.
+    :param max_workers: The number of worker processes.
+    :param seed: An optional seed for sampling.
+    :return: A list of (config, score) tuples, best first.
+    """
+    search_space = search_space or DEFAULT_SEARCH_SPACE
+    store = ResultsStore(results_dir)
+    objective = functools.partial(evaluate_trial, data=data)
+
+    if method == "grid":
+        return hyperparameter_search.grid_search(
+            objective, search_space, max_budget, store, max_workers=max_workers
+        )
+    if method == "random":
+        return hyperparameter_search.random_search(
+            objective,
+            search_space,
+            num_trials,
+            max_budget,
+            store,
+            max_workers=max_workers,
+            seed=seed,
+        )
+    if method == "hyperband":
+        return hyperparameter_search.hyperband(
+            objective,
+            search_space,
+            min_budget,
+            max_budget,
+            store,
+            max_workers=max_workers,
+            seed=seed,
+        )
+    raise ValueError(f"Unknown search method: {method}")
+
+
+def evaluate_trial(config, budget, data):
+    """
+    Trains a DQN model with a trial configuration and scores it.
+
+    Keys listed in TRAINING_PARAMS configure the training loop and all other keys are passed to the DQN.
+    The model and scaler are written to a temporary directory that is removed afterwards.
+
+    :param config: The trial configuration.
+    :param budget: The number of training episodes.
+    :param data: The data to train and score on.
+    :return: The score of the trained model.
+    """
+    training_params = {k: v for k, v in config.items() if k in TRAINING_PARAMS}
+    dqn_params = {k: v for k, v in config.items() if k not in TRAINING_PARAMS}
+
+    with tempfile.TemporaryDirectory() as trial_dir:
+        model, scaler = learning_controller.train_model(
+            data,
+            trial_dir,
+            num_episodes=budget,
+            dqn_params=dqn_params,
+            **training_params,
+        )
+
+    return score_policy(model, data, scaler)
+
+
+def score_policy(model, data, scaler):
+    """
+    Scores a trained model by trading greedily over the data.
+
+    The greedy actions for every step are computed with one batched forward pass, then replayed through a
+    TradingEnvironment so fees and compounding are accounted for.
+
+    :param model: The trained Keras model.
+    :param data: The data to trade over, including the 'target' and 'log_return' columns.
+    :param scaler: The scaler fitted during training.
+    :return: The final balance relative to the initial balance.
+    """
+    features = data.drop(columns=["target", "log_return"])
+    states = np.column_stack(
+        [scaler.transform(features), data["log_return"].to_numpy()]
+    ).astype(np.float32)
+
+    actions = np.argmax(dense_forward(model.get_weights(), states), axis=1)
+
+    env = TradingEnvironment(data.drop(columns=["target"]))
+    env.reset()
+    for action in actions[:-1]:
+        env.step(action)
+
+    return env.balance / env.initial_balance
@@ -0,0 +1,198 @@
+"""
+This module provides a content-addressed on-disk cache for the stages of the data pipeline.
+
+A stage is a function call such as `add_all_technical_indicators(df)` or `extract_lstm_features(df, sequence_length=30)`.
+Its result is stored under a key that hashes the stage's inputs, its parameters and the source code of the stage
+function's module and of every module of the same package it depends on, directly or through other modules (e.g.
+src.features.indicator_graph and src.features.ta_numpy behind `add_all_technical_indicators`). A stage is therefore
+only run again when its input data, its parameters or any code it may call changed. Because the inputs are hashed by
+content, a stage whose upstream stage was rerun but produced identical data is still skipped.
+
+Stored results that cannot be loaded, for example because the file is corrupt or a class it refers to was renamed,
+are treated as missing and recomputed.
+
+Results are stored with joblib, one file per key. The cache is bounded in size: when it grows past `max_bytes`, the
+least recently used results are evicted first.
+
+Example usage:
+
+    from src.utils.stage_cache import StageCache
+    from src.features.feature_engineering import extract_lstm_features
+
+    stage_cache = StageCache('.cache/stages')
+    df = stage_cache.run(extract_lstm_features, df, sequence_length=30)
+
+Classes:
+- StageCache: A size-bounded, least recently used on-disk cache of pipeline stage results.
+
+Constants:
+- DEFAULT_CACHE_DIR: The default directory the cache is stored in.
+- DEFAULT_MAX_BYTES: The default maximum total size of the cache in bytes.
+- CACHE_FORMAT_VERSION: A version mixed into every key, bumped to invalidate all stored results at once.
+"""
+import hashlib
+import inspect
+import os
+import sys
+
+import joblib
+
+DEFAULT_CACHE_DIR = ".cache/stages"
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+CACHE_FORMAT_VERSION = 1
+
+
+class StageCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initializes the cache, creating the cache directory if needed.
+
+        :param cache_dir: The directory the stage results are stored in.
+        :param max_bytes: The maximum total size of the stored results in bytes.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def run(self, func, *args, ignore=(), **kwargs):
+        """
+        Returns the stored result of a stage, running and storing it first if it is not cached.
+
+        :param func: The stage function.
+        :param args: The positional arguments of the stage, hashed by content.
+        :param ignore: The names of keyword arguments left out of the key, such as HTTP caches or sessions that do
+                       not change the result.
+        :param kwargs: The keyword arguments of the stage, hashed by content unless listed in `ignore`.
+        :return: The result of `func(*args, **kwargs)`.
+        """
+        key_kwargs = {
+            name: value for name, value in kwargs.items() if name not in ignore
+        }
+        path = self._path(self.key(func, *args, **key_kwargs))
+
+        try:
+            result = joblib.load(path)
+        except Exception:
+            # A missing, corrupt or unpicklable result is a miss, and is overwritten below
+            pass
+        else:
+            # The modification time records the last use, for least recently used eviction
+            os.utime(path)
+            return result
+
+        result = func(*args, **kwargs)
+
+        # Write to a temporary file first so readers never see a partial result
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(result, temp_path)
+        os.replace(temp_path, path)
+
+        self._evict()
+        return result
+
+    def key(self, func, *args, **kwargs):
+        """
+        Builds the key of a stage from its code, inputs and parameters.
+
+        :param func: The stage function.
+        :param args: The positional arguments of the stage.
+        :param kwargs: The keyword arguments of the stage.
+        :return: A hexadecimal key.
+        """
+        digest = hashlib.sha256()
+        digest.update(str(CACHE_FORMAT_VERSION).encode("utf-8"))
+        digest.update(_code_version(func).encode("utf-8"))
+        digest.update(joblib.hash(args).encode("utf-8"))
+        digest.update(joblib.hash(sorted(kwargs.items())).encode("utf-8"))
+        return digest.hexdigest()
+
+    def clear(self):
+        """
+        Removes every stored result.
+        """
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".joblib"):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def _path(self, key):
+        """
+        Returns the file path of the result stored under a key.
+        """
+        return os.path.join(self.cache_dir, f"{key}.joblib")
+
+    def _evict(self):
+        """
+        Removes the least recently used results until the cache fits in `max_bytes`.
+        """
+        # Other processes may evict the same results concurrently, so missing files are skipped
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".joblib"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def _code_version(func):
+    """
+    Returns a string identifying the code of a stage function: its qualified name and the source of its module and of
+    the modules of the same package it depends on.
+
+    Callables that are not functions or classes, or without retrievable source (such as builtins), are identified by
+    their name only.
+    """
+    name = (
+        f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    )
+    module = inspect.getmodule(func)
+    if module is None or not (inspect.isroutine(func) or inspect.isclass(func)):
+        return name
+
+    digest = hashlib.sha256()
+    for dependency in sorted(_module_dependencies(module), key=lambda m: m.__name__):
+        try:
+            source = inspect.getsource(dependency)
+        except (OSError, TypeError):
+            source = ""
+        digest.update(dependency.__name__.encode("utf-8"))
+        digest.update(source.encode("utf-8"))
+    return name + digest.hexdigest()
+
+
+def _module_dependencies(module):
+    """
+    Returns a module and every module of the same top-level package it depends on, directly or through other modules.
+
+    A module depends on the modules it imports and on the modules that define the functions and classes it imports.
+    """
+    package = module.__name__.split(".")[0]
+    found = {module.__name__: module}
+    pending = [module]
+    while pending:
+        for value in list(vars(pending.pop()).values()):
+            if inspect.ismodule(value):
+                dependency = value
+            elif inspect.isroutine(value) or inspect.isclass(value):
+                dependency = sys.modules.get(getattr(value, "__module__", None))
+            else:
+                continue
+            if (
+                dependency is not None
+                and dependency.__name__.split(".")[0] == package
+                and dependency.__name__ not in found
+            ):
+                found[dependency.__name__] = dependency
+                pending.append(dependency)
+    return found.values()
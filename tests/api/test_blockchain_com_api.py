@@ -4,10 +4,19 @@ This module contains tests for the fetch_blockchain_chart_data function in the b
 Tests cover successful requests, failed requests, and different parameter combinations.
 """
 
-import pytest
-from src.api.blockchain_com_api import fetch_blockchain_chart_data
-from requests.exceptions import HTTPError
+import threading
+import time
 
+import pytest
+from src.api import blockchain_com_api
+from src.api.blockchain_com_api import (
+    BlockchainComClient,
+    create_session,
+    fetch_blockchain_chart_data,
+    is_closed_range,
+)
+from src.api.http_cache import HttpCache
+from requests.exceptions import ConnectionError, HTTPError
 
 @pytest.fixture(autouse=True)
 def mock_requests_get(mocker):
@@ -18,7 +27,8 @@ def mock_requests_get(mocker):
     mock = mocker.patch("requests.get")
     mock.return_value.status_code = 200
     mock.return_value.json.return_value = {"values": []}  # Mock response content
-    yield
+    mock.return_value.headers = {"ETag": '"v1"'}
+    yield mock
 
 
 def test_fetch_blockchain_chart_data_success():
@@ -51,3 +61,234 @@ def test_fetch_blockchain_chart_data_failure(mocker):
     chart_name = "unknown-chart"
     with pytest.raises(HTTPError):
         data = fetch_blockchain_chart_data(chart_name)
+
+
+def test_fetch_blockchain_chart_data_cache_hit(mock_requests_get, tmpdir):
+    """
+    Test that a fresh cached response is returned without a request.
+    """
+    cache = HttpCache(str(tmpdir))
+    first = fetch_blockchain_chart_data("hash-rate", cache=cache)
+    second = fetch_blockchain_chart_data("hash-rate", cache=cache)
+
+    assert first == second == {"values": []}
+    assert mock_requests_get.call_count == 1
+
+
+def test_fetch_blockchain_chart_data_cache_revalidation(mock_requests_get, tmpdir):
+    """
+    Test that a stale cached response is revalidated with its ETag and reused on a 304 response.
+    """
+    cache = HttpCache(str(tmpdir), ttl=0)
+    fetch_blockchain_chart_data("hash-rate", cache=cache)
+
+    mock_requests_get.return_value.status_code = 304
+    mock_requests_get.return_value.json.side_effect = AssertionError
+    data = fetch_blockchain_chart_data("hash-rate", cache=cache)
+
+    assert data == {"values": []}
+    assert mock_requests_get.call_args[1]["headers"] == {"If-None-Match": '"v1"'}
+
+
+def test_fetch_blockchain_chart_data_not_modified_without_entry(
+    mocker, mock_requests_get, tmpdir
+):
+    """
+    Test that a 304 response with no cached entry to reuse is followed by a full request.
+    """
+    not_modified = mocker.Mock(status_code=304)
+    mock_requests_get.side_effect = [not_modified, mock_requests_get.return_value]
+
+    data = fetch_blockchain_chart_data("hash-rate", cache=HttpCache(str(tmpdir)))
+
+    assert data == {"values": []}
+    assert mock_requests_get.call_count == 2
+    assert "If-None-Match" not in mock_requests_get.call_args[1]["headers"]
+
+
+def test_fetch_blockchain_chart_data_closed_range_never_expires(
+    mock_requests_get, tmpdir
+):
+    """
+    Test that a closed historical range is served from the cache even after the time-to-live.
+    """
+    cache = HttpCache(str(tmpdir), ttl=0)
+    fetch_blockchain_chart_data(
+        "hash-rate", timespan="1year", start="2020-01-01", cache=cache
+    )
+    fetch_blockchain_chart_data(
+        "hash-rate", timespan="1year", start="2020-01-01", cache=cache
+    )
+
+    assert mock_requests_get.call_count == 1
+
+
+def test_is_closed_range():
+    """
+    Test that only ranges with a start and timespan ending before today are closed.
+    """
+    assert is_closed_range("2020-01-01", "5weeks")
+    assert is_closed_range("1577836800", "1year")
+    assert not is_closed_range("2020-01-01", "100years")
+    assert not is_closed_range(None, "1year")
+    assert not is_closed_range("2020-01-01", None)
+    assert not is_closed_range("2020-01-01", "all")
+
+
+def test_fetch_blockchain_chart_data_session(mocker, mock_requests_get):
+    """
+    Test that a given session is used instead of requests.get.
+    """
+    session = mocker.Mock()
+    session.get.return_value.status_code = 200
+    session.get.return_value.json.return_value = {"values": [1]}
+
+    data = fetch_blockchain_chart_data("hash-rate", session=session)
+
+    assert data == {"values": [1]}
+    session.get.assert_called_once()
+    mock_requests_get.assert_not_called()
+
+
+def test_create_session():
+    """
+    Test that create_session mounts a connection pool of the requested size.
+    """
+    session = create_session(pool_size=8)
+    adapter = session.get_adapter("https://api.blockchain.info/")
+    assert adapter._pool_maxsize == 8
+    session.close()
+
+
+def test_per_host_concurrency_limit(mocker):
+    """
+    Test that no more than MAX_CONNECTIONS_PER_HOST requests to one host are in flight at once.
+    """
+    mocker.patch.object(blockchain_com_api, "MAX_CONNECTIONS_PER_HOST", 2)
+    mocker.patch.object(blockchain_com_api, "_host_semaphores", {})
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def get(url, headers=None):
+        with lock:
+            in_flight.append(url)
+            peak.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.remove(url)
+
+    session = mocker.Mock()
+    session.get.side_effect = get
+    threads = [
+        threading.Thread(
+            target=blockchain_com_api._get,
+            args=(f"https://example.com/{i}",),
+            kwargs={"session": session},
+        )
+        for i in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert session.get.call_count == 6
+    assert max(peak) == 2
+
+
+def make_response(mocker, status_code, headers=None):
+    """
+    Creates a mock response with the given status code and headers.
+    """
+    response = mocker.Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def mock_sleep(mocker):
+    """
+    A pytest fixture that stops the client from actually sleeping between retries.
+    """
+    return mocker.patch("src.api.blockchain_com_api.time.sleep")
+
+
+def test_client_retries_server_errors(mocker, mock_sleep):
+    """
+    Test that the client retries a 503 response with backoff and returns the first successful response.
+    """
+    client = BlockchainComClient(timeout=5, backoff_factor=1, seed=0)
+    ok = make_response(mocker, 200)
+    client.session.get = mocker.Mock(side_effect=[make_response(mocker, 503), ok])
+
+    assert client.get("https://api.blockchain.info/charts/hash-rate") is ok
+    assert client.session.get.call_count == 2
+    assert client.session.get.call_args[1]["timeout"] == 5
+    assert 0 <= mock_sleep.call_args[0][0] <= 1
+
+
+def test_client_honors_retry_after(mocker, mock_sleep):
+    """
+    Test that the client waits for the delay requested by a Retry-After header.
+    """
+    client = BlockchainComClient()
+    client.session.get = mocker.Mock(
+        side_effect=[
+            make_response(mocker, 429, {"Retry-After": "7"}),
+            make_response(mocker, 200),
+        ]
+    )
+
+    client.get("https://api.blockchain.info/charts/hash-rate")
+
+    mock_sleep.assert_called_once_with(7.0)
+
+
+def test_client_retries_connection_errors(mocker, mock_sleep):
+    """
+    Test that the client retries dropped connections and re-raises once the retries are exhausted.
+    """
+    client = BlockchainComClient(max_retries=2)
+    client.session.get = mocker.Mock(side_effect=ConnectionError)
+
+    with pytest.raises(ConnectionError):
+        client.get("https://api.blockchain.info/charts/hash-rate")
+    assert client.session.get.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_client_gives_up_after_max_retries(mocker, mock_sleep):
+    """
+    Test that the client returns the last failed response once the retries are exhausted.
+    """
+    client = BlockchainComClient(max_retries=3)
+    client.session.get = mocker.Mock(return_value=make_response(mocker, 503))
+
+    response = client.get("https://api.blockchain.info/charts/hash-rate")
+
+    assert response.status_code == 503
+    assert client.session.get.call_count == 4
+
+
+def test_client_does_not_retry_client_errors(mocker, mock_sleep):
+    """
+    Test that the client returns non-retryable errors immediately.
+    """
+    client = BlockchainComClient()
+    client.session.get = mocker.Mock(return_value=make_response(mocker, 404))
+
+    assert client.get("https://api.blockchain.info/charts/unknown").status_code == 404
+    assert client.session.get.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+def test_parse_retry_after():
+    """
+    Test that Retry-After headers are parsed as seconds or HTTP dates.
+    """
+    assert blockchain_com_api._parse_retry_after("3") == 3.0
+    assert blockchain_com_api._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert blockchain_com_api._parse_retry_after("soon") is None
+    assert blockchain_com_api._parse_retry_after(None) is None
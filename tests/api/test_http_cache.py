@@ -0,0 +1,139 @@
+"""
+This module contains tests for the HttpCache class in the http_cache module.
+
+Tests cover storing and loading entries, freshness, revalidation headers, least recently used eviction, and
+concurrent use.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+from src.api.http_cache import HttpCache
+
+
+@pytest.fixture
+def cache(tmpdir):
+    """
+    A pytest fixture that creates an HttpCache in a temporary directory.
+    """
+    return HttpCache(str(tmpdir), ttl=60)
+
+
+def test_put_and_get(cache):
+    """
+    Test that a stored response is returned with its validators.
+    """
+    url = "https://api.blockchain.info/charts/hash-rate?format=json"
+    cache.put(url, {"values": [1, 2]}, {"ETag": '"abc"'})
+
+    entry = cache.get(url)
+    assert entry["body"] == {"values": [1, 2]}
+    assert entry["etag"] == '"abc"'
+    assert cache.get(url + "&timespan=1year") is None
+
+
+def test_is_fresh(cache):
+    """
+    Test that entries expire after the time-to-live unless they are permanent.
+    """
+    cache.put("a", {}, permanent=False)
+    cache.put("b", {}, permanent=True)
+    assert cache.is_fresh(cache.get("a"))
+
+    cache.ttl = 0
+    assert not cache.is_fresh(cache.get("a"))
+    assert cache.is_fresh(cache.get("b"))
+
+
+def test_revalidation_headers(cache):
+    """
+    Test that stale entries are revalidated with the validators the server sent.
+    """
+    cache.put("a", {}, {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024"})
+    cache.put("b", {})
+
+    assert cache.revalidation_headers(cache.get("a")) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024",
+    }
+    assert cache.revalidation_headers(cache.get("b")) == {}
+
+
+def test_refresh(cache):
+    """
+    Test that refreshing an entry resets its age and keeps its body.
+    """
+    cache.put("a", {"values": [1]})
+    entry = cache.get("a")
+    entry_time = entry["fetched_at"]
+
+    time.sleep(0.01)
+    cache.refresh("a", entry)
+
+    refreshed = cache.get("a")
+    assert refreshed["fetched_at"] > entry_time
+    assert refreshed["body"] == {"values": [1]}
+
+
+def test_evicts_least_recently_used(tmpdir):
+    """
+    Test that the least recently used entries are evicted once the cache exceeds its size limit.
+    """
+    cache = HttpCache(str(tmpdir), max_bytes=1000)
+    body = {"values": "x" * 200}
+    for url in ["a", "b", "c"]:
+        cache.put(url, body)
+        # Spread the entries' last use times apart
+        os.utime(cache._path(url), (time.time() - 10, time.time() - 10))
+    cache.get("a")
+
+    cache.put("d", body)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("d") is not None
+
+
+def test_clear(cache):
+    """
+    Test that clear removes every entry.
+    """
+    cache.put("a", {})
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_concurrent_puts_of_one_url(cache):
+    """
+    Test that threads storing the same URL at once do not overwrite each other's temporary file.
+    """
+    errors = []
+
+    def put(i):
+        try:
+            for _ in range(20):
+                cache.put("a", {"values": [i]})
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.get("a")["body"]["values"][0] in range(8)
+    assert not [name for name in os.listdir(cache.cache_dir) if name.endswith(".tmp")]
+
+
+def test_get_entry_evicted_after_read(mocker, cache):
+    """
+    Test that an entry evicted between reading it and marking it as used is a miss.
+    """
+    cache.put("a", {})
+    mocker.patch("os.utime", side_effect=FileNotFoundError)
+
+    assert cache.get("a") is None
@@ -1,17 +1,17 @@
 """
 This module contains tests for the yfinance API functions in the src.api.yfinance module.
 
-The tests cover the fetching of Bitcoin data from Yahoo Finance.
+The tests cover the fetching of Bitcoin data and of the prices of several tickers from Yahoo Finance.
 
 Functions:
 - test_fetch_bitcoin_data: Tests the fetch_bitcoin_data function from the src.api.yfinance module.
+- test_fetch_price_data: Tests that fetch_price_data downloads every ticker in one request.
+- test_fetch_price_data_single_ticker: Tests that fetch_price_data returns (field, ticker) columns for one ticker.
 """
 
-
 import pandas as pd
 import pytest
-from src.api.yfinance import fetch_bitcoin_data
-
+from src.api.yfinance import PRICE_FIELDS, fetch_bitcoin_data, fetch_price_data
 
 @pytest.fixture
 def mock_yfinance(mocker):
@@ -41,3 +41,40 @@ def test_fetch_bitcoin_data(mock_yfinance):
     assert not df.empty
     assert "Dividends" not in df.columns
     assert "Stock Splits" not in df.columns
+
+
+def test_fetch_price_data(mocker):
+    """
+    Test that fetch_price_data downloads every ticker in one request and orders the columns by field and ticker.
+    """
+    columns = pd.MultiIndex.from_product(
+        [["Close", "High", "Low", "Open", "Volume"], ["ETH-USD", "BTC-USD"]]
+    )
+    download = mocker.patch(
+        "yfinance.download",
+        return_value=pd.DataFrame([range(10), range(10)], columns=columns),
+    )
+
+    df = fetch_price_data(["BTC-USD", "ETH-USD"], "2022-01-01", "2022-01-31")
+
+    download.assert_called_once()
+    assert download.call_args.args[0] == ["BTC-USD", "ETH-USD"]
+    assert list(df.columns) == [
+        (field, ticker) for field in PRICE_FIELDS for ticker in ["BTC-USD", "ETH-USD"]
+    ]
+    assert df[("Close", "BTC-USD")].tolist() == [1, 1]
+
+
+def test_fetch_price_data_single_ticker(mocker):
+    """
+    Test that fetch_price_data returns (field, ticker) columns for one ticker when yfinance returns one column level.
+    """
+    mocker.patch(
+        "yfinance.download",
+        return_value=pd.DataFrame([range(5), range(5)], columns=PRICE_FIELDS),
+    )
+
+    df = fetch_price_data(["BTC-USD"], "2022-01-01", "2022-01-31")
+
+    assert list(df.columns) == [(field, "BTC-USD") for field in PRICE_FIELDS]
+    assert df[("Close", "BTC-USD")].tolist() == [3, 3]
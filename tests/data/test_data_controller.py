@@ -5,16 +5,25 @@ The tests cover the main function which controls the data fetching, cleaning, an
 
 Functions:
 - test_main: Tests the main function from the data_controller module.
+- test_build_panel: Tests that build_panel builds the features of every asset from one bulk download.
 """
 
+import numpy as np
 import pandas as pd
 import pytest
 from sklearn.preprocessing import MinMaxScaler
 import joblib
 
 
-from src.data.data_controller import main, load_data, load_scaler
-
+from src.utils.stage_cache import StageCache
+from src.data.data_controller import (
+    main,
+    build_panel,
+    load_data,
+    load_scaler,
+    save_data,
+    find_data_path,
+)
 
 @pytest.fixture
 def mock_functions(mocker):
@@ -33,7 +42,9 @@ def mock_functions(mocker):
         "src.data.data_controller.add_blockchain_data",
         return_value=df,
     )
-    mocker.patch("src.data.data_controller.extract_lstm_features", return_value=df)
+    mocker.patch("src.data.data_controller.train_lstm_encoder")
+    mocker.patch("src.data.data_controller.save_encoder")
+    mocker.patch("src.data.data_controller.add_lstm_features", return_value=df)
 
 
 def test_main(mock_functions, tmpdir):
@@ -50,10 +61,124 @@ def test_main(mock_functions, tmpdir):
     assert isinstance(scaler, MinMaxScaler)
 
     # Check that the DataFrame and scaler are saved to the model directory
-    assert (model_dir / "data.csv").check()
+    assert (model_dir / "data.parquet").check()
     assert (model_dir / "scaler.pkl").check()
 
 
+def test_main_skips_cached_stages(mocker, tmpdir):
+    """
+    Test that a second run with a stage cache skips every stage whose inputs and parameters are unchanged.
+    """
+    df = pd.DataFrame(
+        {"Close": [1.0, 3.0, 2.0, 4.0], "log_return": [0.1, 0.2, -0.1, 0.3]},
+        index=pd.date_range(start="2022-01-01", periods=4, freq="D"),
+    )
+    stages = {
+        "fetch_bitcoin_data": mocker.Mock(return_value=df),
+        "add_all_technical_indicators": mocker.Mock(side_effect=lambda df: df),
+        "add_blockchain_data": mocker.Mock(side_effect=lambda df, **kwargs: df),
+        "train_lstm_encoder": mocker.Mock(return_value="encoder"),
+        "analyze_feature_importance": mocker.Mock(return_value=["lstm_feature"]),
+    }
+    for name, stage in stages.items():
+        mocker.patch(f"src.data.data_controller.{name}", stage)
+    mocker.patch(
+        "src.data.data_controller.add_lstm_features",
+        side_effect=lambda df, encoder: df.assign(lstm_feature=df["Close"]),
+    )
+    mocker.patch("src.data.data_controller.save_encoder")
+    mocker.patch("src.data.data_controller.clean_data", side_effect=lambda df: df)
+    stage_cache = StageCache(str(tmpdir.mkdir("stages")))
+
+    first = main("2022-01-01", "2022-01-31", tmpdir, stage_cache=stage_cache)
+    second = main("2022-01-01", "2022-01-31", tmpdir, stage_cache=stage_cache)
+
+    pd.testing.assert_frame_equal(first, second)
+    for stage in stages.values():
+        assert stage.call_count == 1
+
+
+def test_main_with_encoder_dir(mocker, tmpdir):
+    """
+    Test that main given the directory of a previous run reuses its LSTM encoder and scaler instead of training.
+    """
+    df = pd.DataFrame(
+        {"Close": [1.0, 3.0, 2.0, 4.0], "log_return": [0.1, 0.2, -0.1, 0.3]},
+        index=pd.date_range(start="2022-01-01", periods=4, freq="D"),
+    )
+    mocker.patch("src.data.data_controller.fetch_bitcoin_data", return_value=df)
+    for name in ("add_all_technical_indicators", "clean_data"):
+        mocker.patch(f"src.data.data_controller.{name}", side_effect=lambda df: df)
+    mocker.patch(
+        "src.data.data_controller.add_blockchain_data",
+        side_effect=lambda df, **kwargs: df,
+    )
+    mocker.patch(
+        "src.data.data_controller.analyze_feature_importance",
+        return_value=["lstm_feature"],
+    )
+    train_spy = mocker.patch("src.data.data_controller.train_lstm_encoder")
+    encoder = mocker.Mock()
+    mocker.patch("src.data.data_controller.load_encoder", return_value=encoder)
+    save_spy = mocker.patch("src.data.data_controller.save_encoder")
+    add_spy = mocker.patch(
+        "src.data.data_controller.add_lstm_features",
+        side_effect=lambda df, encoder: df.assign(lstm_feature=df["Close"]),
+    )
+
+    encoder_dir = tmpdir.mkdir("previous")
+    scaler = MinMaxScaler().fit(pd.DataFrame({"Close": [0.0, 8.0]}))
+    joblib.dump(scaler, encoder_dir / "lstm_scaler.pkl")
+    model_dir = tmpdir.mkdir("model_dir")
+
+    main("2022-01-01", "2022-01-31", model_dir, encoder_dir=str(encoder_dir))
+
+    train_spy.assert_not_called()
+    # The data is normalized with the stored scaler, not refitted
+    normalized = add_spy.call_args[0][0]
+    np.testing.assert_allclose(normalized["Close"], [0.125, 0.375, 0.25, 0.5])
+    assert add_spy.call_args[0][1] is encoder
+    save_spy.assert_called_once_with(encoder, str(model_dir / "lstm_encoder.h5"))
+    assert (model_dir / "lstm_scaler.pkl").check()
+
+
+def test_build_panel(mocker):
+    """
+    Test that build_panel fetches every asset in one request and builds normalized features for each of them.
+    """
+    rng = np.random.default_rng(0)
+    tickers = ["BTC-USD", "ETH-USD"]
+    columns = {}
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120)))
+        for field, scale in (
+            ("Open", 1.0),
+            ("High", 1.01),
+            ("Low", 0.99),
+            ("Close", 1.0),
+        ):
+            columns[(field, ticker)] = close * scale
+        columns[("Volume", ticker)] = rng.uniform(1e3, 1e5, 120)
+    frame = pd.DataFrame(columns, index=pd.date_range(start="1/1/2022", periods=120))
+    fetch = mocker.patch(
+        "src.data.data_controller.fetch_price_data", return_value=frame
+    )
+
+    panel, scaler = build_panel(tickers, "2022-01-01", "2022-05-01")
+
+    fetch.assert_called_once_with(tickers, "2022-01-01", "2022-05-01")
+    assert panel.tickers == tickers
+    assert {"log_return", "rsi", "macd_hist", "cci"} <= set(panel.fields)
+    assert not np.isnan(panel.values).any()
+    scaled = [field for field in panel.fields if field != "log_return"]
+    for field in scaled:
+        np.testing.assert_allclose(panel[field].max(axis=0), 1.0)
+    np.testing.assert_allclose(
+        scaler.inverse_transform(panel)["Close"],
+        frame["Close"].loc[panel.index],
+    )
+
+
 def test_load_data(tmpdir):
     """
     Test the load_data function from the data_controller module.
@@ -72,6 +197,56 @@ def test_load_data(tmpdir):
     pd.testing.assert_frame_equal(loaded_data, df)
 
 
+@pytest.mark.parametrize("data_format", ["csv", "parquet", "feather"])
+def test_save_and_load_data(tmpdir, data_format):
+    """
+    Test that data stored in each format is loaded back with its index, dtypes and a column projection.
+    """
+    df = pd.DataFrame(
+        {
+            "Close": [1.5, 2.5, 3.5, 4.5],
+            "target": [1, 0, 1, 0],
+            "log_return": [0.1, 0.2, 0.3, 0.4],
+        },
+        index=pd.date_range(start="2022-01-01", periods=4, freq="D"),
+    )
+
+    data_path = save_data(df, tmpdir, data_format)
+    assert data_path.endswith(data_format)
+
+    pd.testing.assert_frame_equal(load_data(data_path), df)
+    pd.testing.assert_frame_equal(
+        load_data(data_path, columns=["log_return", "target"]),
+        df[["log_return", "target"]],
+    )
+
+
+def test_save_data_unknown_format(tmpdir):
+    """
+    Test that save_data rejects unsupported formats.
+    """
+    with pytest.raises(ValueError):
+        save_data(pd.DataFrame({"Close": [1]}), tmpdir, "xlsx")
+
+
+def test_find_data_path(tmpdir):
+    """
+    Test that find_data_path prefers binary formats over CSV.
+    """
+    with pytest.raises(FileNotFoundError):
+        find_data_path(str(tmpdir))
+
+    df = pd.DataFrame(
+        {"Close": [1.0, 2.0, 3.0]},
+        index=pd.date_range(start="2022-01-01", periods=3, freq="D"),
+    )
+    save_data(df, tmpdir, "csv")
+    assert find_data_path(str(tmpdir)).endswith("data.csv")
+
+    save_data(df, tmpdir, "parquet")
+    assert find_data_path(str(tmpdir)).endswith("data.parquet")
+
+
 def test_load_scaler(tmpdir):
     """
     Test the load_scaler function from the data_controller module.
@@ -0,0 +1,78 @@
+"""
+This module contains tests for the functions in the feature_matrix module.
+
+Tests cover storing prepared training data as NumPy arrays and opening them as read-only memory maps.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.feature_matrix import (
+    save_feature_matrix,
+    load_feature_matrix,
+    has_feature_matrix,
+)
+
+
+@pytest.fixture
+def mock_data():
+    """
+    A pytest fixture that creates mock prepared training data with a daily DatetimeIndex.
+    """
+    index = pd.date_range("2021-01-01", periods=6, freq="D")
+    return pd.DataFrame(
+        {
+            "Close": np.linspace(0, 1, 6),
+            "lstm_feature": np.linspace(1, 0, 6),
+            "log_return": [0.01, -0.02, 0.03, 0.0, 0.015, -0.005],
+        },
+        index=index,
+    )
+
+
+def test_save_and_load_feature_matrix(mock_data, tmpdir):
+    """
+    Test that the stored arrays round-trip the features, log returns, index and columns.
+    """
+    assert not has_feature_matrix(tmpdir)
+
+    save_feature_matrix(mock_data, tmpdir)
+    features, log_returns, index, columns = load_feature_matrix(tmpdir)
+
+    assert has_feature_matrix(tmpdir)
+    assert columns == ["Close", "lstm_feature", "log_return"]
+    assert features.dtype == np.float32
+    assert features.shape == (6, 3)
+    np.testing.assert_array_equal(features, mock_data.to_numpy(dtype=np.float32))
+    assert log_returns.dtype == np.float64
+    np.testing.assert_array_equal(log_returns, mock_data["log_return"].to_numpy())
+    assert pd.DatetimeIndex(index).equals(mock_data.index)
+
+
+def test_load_feature_matrix_is_read_only_memory_map(mock_data, tmpdir):
+    """
+    Test that the arrays are opened as read-only memory maps and slices stay views of them.
+    """
+    save_feature_matrix(mock_data, tmpdir)
+
+    features, log_returns, index, _ = load_feature_matrix(tmpdir, start=2, stop=5)
+
+    assert isinstance(features, np.memmap)
+    assert isinstance(log_returns, np.memmap)
+    assert not features.flags.writeable
+    assert features.shape == (3, 3)
+    np.testing.assert_array_equal(log_returns, mock_data["log_return"].iloc[2:5])
+    assert pd.DatetimeIndex(index).equals(mock_data.index[2:5])
+
+
+def test_save_feature_matrix_drops_time_zone(mock_data, tmpdir):
+    """
+    Test that a time zone aware index is stored as plain datetime64 values.
+    """
+    mock_data.index = mock_data.index.tz_localize("UTC")
+
+    save_feature_matrix(mock_data, tmpdir)
+    _, _, index, _ = load_feature_matrix(tmpdir)
+
+    assert index.dtype.kind == "M"
+    assert pd.DatetimeIndex(index).equals(mock_data.index.tz_localize(None))
@@ -0,0 +1,178 @@
+"""
+This module contains tests for the incremental module.
+
+Tests cover the IncrementalStore and the incremental refresh of prices, technical indicators and blockchain charts.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data import incremental
+from src.data.incremental import IncrementalStore
+from src.features.feature_engineering import add_all_technical_indicators
+
+
+def make_prices(start, periods, seed=0):
+    """
+    Creates a DataFrame of random daily prices.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    df = pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.005, periods)),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.uniform(1e6, 2e6, periods),
+        },
+        index=pd.date_range(start, periods=periods, freq="D"),
+    )
+    df["log_return"] = np.log(df["Close"] / df["Close"].shift(1))
+    return df.dropna()
+
+
+@pytest.fixture
+def store(tmpdir):
+    """
+    A pytest fixture that creates an IncrementalStore in a temporary directory.
+    """
+    return IncrementalStore(str(tmpdir))
+
+
+def test_store_append_and_load(store):
+    """
+    Test that appended rows are loaded back in order and only newer rows are appended.
+    """
+    prices = make_prices("2022-01-01", 20)
+
+    assert store.last_timestamp("prices") is None
+    assert store.append("prices", prices.iloc[:10]) == 10
+    assert store.append("prices", prices.iloc[5:]) == 9
+    assert store.append("prices", prices.iloc[5:]) == 0
+
+    assert store.last_timestamp("prices") == prices.index[-1]
+    loaded = store.load("prices")
+    pd.testing.assert_frame_equal(loaded, prices, check_freq=False)
+    assert list(store.load("prices", columns=["Close"]).columns) == ["Close"]
+
+
+def test_store_compact(store):
+    """
+    Test that compacting keeps the rows but merges the part files.
+    """
+    prices = make_prices("2022-01-01", 20)
+    store.append("prices", prices.iloc[:10])
+    store.append("prices", prices.iloc[10:])
+
+    store.compact("prices")
+
+    assert len(os.listdir(os.path.join(store.store_dir, "prices"))) == 1
+    pd.testing.assert_frame_equal(store.load("prices"), prices, check_freq=False)
+
+
+def test_refresh_prices_fetches_tail(mocker, store):
+    """
+    Test that refresh_prices only fetches from the last stored day.
+    """
+    prices = make_prices("2022-01-01", 40)
+    store.append("prices", prices.iloc[:30])
+    mock_fetch = mocker.patch(
+        "src.data.incremental.fetch_bitcoin_data", return_value=prices.iloc[29:]
+    )
+
+    appended = incremental.refresh_prices(store, "2022-01-01", "2022-02-10")
+
+    mock_fetch.assert_called_once_with(
+        prices.index[29].strftime("%Y-%m-%d"), "2022-02-10"
+    )
+    assert appended == 9
+
+
+def test_refresh_indicators_matches_full_computation(store, mocker):
+    """
+    Test that indicators computed over a trailing window match those computed over the full history.
+    """
+    prices = make_prices("2021-01-01", 400)
+    expected = add_all_technical_indicators(prices.copy())
+
+    store.append("prices", prices.iloc[:350])
+    incremental.refresh_indicators(store)
+    store.append("prices", prices.iloc[350:])
+    window_lengths = []
+
+    def compute(window):
+        window_lengths.append(len(window))
+        return add_all_technical_indicators(window)
+
+    mocker.patch(
+        "src.data.incremental.add_all_technical_indicators", side_effect=compute
+    )
+    appended = incremental.refresh_indicators(store)
+
+    assert appended == 49
+    assert window_lengths == [49 + incremental.INDICATOR_LOOKBACK]
+    features = store.load("features")
+    pd.testing.assert_frame_equal(
+        features.iloc[-49:], expected.iloc[-49:], check_freq=False, rtol=1e-5, atol=1e-5
+    )
+
+
+def test_refresh_charts_fetches_tail(mocker, store):
+    """
+    Test that refresh_charts requests each chart from its last stored day and skips failed charts.
+    """
+    chart = pd.DataFrame(
+        {"hash-rate": [1.0, 2.0]},
+        index=pd.DatetimeIndex(["2022-01-01", "2022-01-02"], name="Date"),
+    )
+    store.append("hash-rate", chart)
+
+    def fetch(chart_name, timespan=None, start_date=None, cache=None, session=None):
+        if chart_name == "difficulty":
+            return None
+        return pd.DataFrame(
+            {chart_name: [3.0]}, index=pd.DatetimeIndex(["2022-01-10"], name="Date")
+        )
+
+    mock_fetch = mocker.patch(
+        "src.data.incremental.get_blockchain_data", side_effect=fetch
+    )
+
+    appended = incremental.refresh_charts(
+        store, "2021-12-01", "2022-01-10", session=mocker.Mock()
+    )
+
+    calls = {call[0][0]: call[1] for call in mock_fetch.call_args_list}
+    assert calls["hash-rate"]["start_date"] == "2022-01-02"
+    assert calls["hash-rate"]["timespan"] == "9days"
+    assert calls["mempool-size"]["start_date"] == "2021-12-01"
+    assert appended["difficulty"] == 0
+    assert appended["hash-rate"] == 1
+    assert store.last_timestamp("difficulty") is None
+
+
+def test_refresh(mocker, tmpdir):
+    """
+    Test that refresh returns the prices, indicators and blockchain charts merged by date.
+    """
+    prices = make_prices("2022-01-01", 120)
+    mocker.patch("src.data.incremental.fetch_bitcoin_data", return_value=prices)
+
+    def fetch(chart_name, timespan=None, start_date=None, cache=None, session=None):
+        return pd.DataFrame(
+            {chart_name: np.arange(len(prices), dtype=float)},
+            index=pd.DatetimeIndex(prices.index, name="Date"),
+        )
+
+    mocker.patch("src.data.incremental.get_blockchain_data", side_effect=fetch)
+
+    data = incremental.refresh(
+        str(tmpdir), "2022-01-01", "2022-05-01", session=mocker.Mock()
+    )
+
+    assert {"rsi", "obv", "hash-rate", "mempool-size"} <= set(data.columns)
+    assert not data.empty
+    assert not data.isnull().values.any()
@@ -0,0 +1,121 @@
+"""
+This module contains tests for the multi-asset price panel in the panel module.
+
+Tests cover building a panel from a bulk download, and that the log returns, technical indicators and normalization
+of every asset match the single-asset pipeline.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from src.data.panel import (
+    PricePanel,
+    add_log_returns,
+    add_technical_indicators,
+    normalize_panel,
+)
+from src.features.feature_engineering import add_all_technical_indicators
+
+TICKERS = ["BTC-USD", "ETH-USD", "SOL-USD"]
+
+
+@pytest.fixture
+def frame():
+    """
+    A pytest fixture that returns a bulk download of three assets, the last of which is listed ten days late.
+    """
+    rng = np.random.default_rng(0)
+    index = pd.date_range(start="1/1/2022", periods=200)
+    columns = {}
+    for ticker, scale in zip(TICKERS, (20000, 1500, 30)):
+        close = scale * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+        fields = {
+            "Open": close * (1 + rng.normal(0, 0.005, 200)),
+            "High": close * (1 + rng.uniform(0, 0.02, 200)),
+            "Low": close * (1 - rng.uniform(0, 0.02, 200)),
+            "Close": close,
+            "Volume": rng.uniform(1e3, 1e5, 200),
+        }
+        for field, values in fields.items():
+            columns[(field, ticker)] = values
+    frame = pd.DataFrame(columns, index=index)
+    frame.loc[index[:10], (slice(None), "SOL-USD")] = np.nan
+    return frame
+
+
+def test_from_frame(frame):
+    """
+    Test that a panel keeps the dates on which every asset has prices, as a (time, asset, field) array.
+    """
+    panel = PricePanel.from_frame(frame)
+
+    assert panel.values.shape == (190, 3, 5)
+    assert panel.tickers == TICKERS
+    assert panel.fields == ["Open", "High", "Low", "Close", "Volume"]
+    assert panel.index[0] == frame.index[10]
+    np.testing.assert_array_equal(
+        panel.asset("ETH-USD"), frame.xs("ETH-USD", axis=1, level=1).iloc[10:]
+    )
+    np.testing.assert_array_equal(panel["Close"], frame["Close"].iloc[10:])
+    result = panel.to_frame()
+    pd.testing.assert_frame_equal(
+        result, frame.iloc[10:][result.columns], check_freq=False
+    )
+
+
+def test_add_log_returns(frame):
+    """
+    Test that the log returns of every asset are added and the first step is dropped.
+    """
+    panel = add_log_returns(PricePanel.from_frame(frame))
+
+    close = frame["Close"].iloc[10:]
+    expected = np.log(close / close.shift(1)).iloc[1:]
+    assert panel.fields[-1] == "log_return"
+    assert len(panel) == 189
+    np.testing.assert_allclose(panel["log_return"], expected)
+
+
+def test_add_technical_indicators_matches_single_asset(frame):
+    """
+    Test that the indicators of every asset match the single-asset pipeline.
+    """
+    panel = add_log_returns(PricePanel.from_frame(frame))
+
+    result = add_technical_indicators(panel)
+
+    for ticker in TICKERS:
+        expected = add_all_technical_indicators(panel.asset(ticker))
+        pd.testing.assert_frame_equal(
+            result.asset(ticker), expected, check_freq=False, rtol=1e-12
+        )
+
+
+def test_normalize_panel(frame):
+    """
+    Test that every asset is scaled like one MinMaxScaler per asset, except the log returns.
+    """
+    panel = add_log_returns(PricePanel.from_frame(frame))
+
+    normalized, scaler = normalize_panel(panel)
+
+    for ticker in TICKERS:
+        data = panel.asset(ticker).drop(columns="log_return")
+        expected = MinMaxScaler().fit_transform(data)
+        np.testing.assert_allclose(
+            normalized.asset(ticker).drop(columns="log_return"), expected, atol=1e-12
+        )
+    np.testing.assert_array_equal(normalized["log_return"], panel["log_return"])
+    np.testing.assert_allclose(
+        scaler.inverse_transform(normalized).values, panel.values
+    )
+
+
+def test_panel_shape_mismatch():
+    """
+    Test that values that do not match the index, tickers and fields raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        PricePanel(np.zeros((3, 2, 1)), range(3), ["BTC-USD"], ["Close"])
@@ -10,9 +10,10 @@ import pytest
 from unittest.mock import Mock
 from src.evaluation.backtesting import (
     calculate_backtest_returns,
+    calculate_backtest_returns_from_feature_matrix,
     calculate_benchmark_returns,
 )
-
+from src.data.feature_matrix import save_feature_matrix
 
 @pytest.fixture
 def mock_data():
@@ -54,6 +55,7 @@ def mock_scaler():
     """
     scaler = Mock()
     scaler.inverse_transform.side_effect = lambda x: np.ones(x.shape)
+    scaler.transform.side_effect = lambda x: np.asarray(x) * 10
     return scaler
 
 
@@ -78,6 +80,49 @@ def test_calculate_backtest_returns(mock_model, mock_data, mock_scaler):
     assert not return_df.isnull().values.any()
 
 
+def test_calculate_backtest_returns_single_inference(
+    mock_model, mock_data, mock_scaler
+):
+    """
+    Test that calculate_backtest_returns predicts once on the normalized states and leaves the data unchanged.
+    """
+    original = mock_data.copy()
+
+    return_df = calculate_backtest_returns(mock_model, mock_data, mock_scaler)
+
+    mock_model.predict.assert_called_once()
+    states = mock_model.predict.call_args[0][0]
+    expected_states = np.column_stack(
+        [mock_data[["lstm_feature"]] * 10, mock_data["log_return"]]
+    )
+    np.testing.assert_allclose(states, expected_states, rtol=1e-6)
+    pd.testing.assert_frame_equal(mock_data, original)
+
+    # Step 0 is a hold and steps 1-3 are sells, so only steps 2-4 have a (zero) return
+    expected_returns = [0.0, 0.0, 0.0]
+    np.testing.assert_allclose(return_df["strategy_return"], expected_returns)
+    assert list(return_df.index) == [2, 3, 4]
+
+
+def test_calculate_backtest_returns_from_feature_matrix(
+    mock_model, mock_data, mock_scaler, tmpdir
+):
+    """
+    Test that backtesting on a stored feature matrix predicts on the stored states and matches the DataFrame backtest.
+    """
+    mock_data.index = pd.date_range("2021-01-01", periods=5, freq="D")
+    training_data = mock_data.drop(columns=["target"])
+    training_data["lstm_feature"] *= 10
+    save_feature_matrix(training_data, tmpdir)
+
+    return_df = calculate_backtest_returns_from_feature_matrix(mock_model, tmpdir)
+    expected_df = calculate_backtest_returns(mock_model, mock_data, mock_scaler)
+
+    states = mock_model.predict.call_args_list[0][0][0]
+    np.testing.assert_allclose(states, training_data.to_numpy(), rtol=1e-6)
+    pd.testing.assert_frame_equal(return_df, expected_df, check_freq=False)
+
+
 def test_calculate_benchmark_returns(mock_data):
     """
     Test the calculate_benchmark_returns function.
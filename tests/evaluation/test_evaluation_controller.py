@@ -0,0 +1,87 @@
+"""
+This module contains tests for the evaluate_models function in the evaluation_controller module.
+
+Tests cover serial and batched evaluation, including stacked inference of dense models and the thread pool fallback.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+from src.evaluation import evaluation_controller
+from src.learning.rl.models.dqn import DQN
+
+
+@pytest.fixture
+def mock_data():
+    """
+    A pytest fixture that creates a mock DataFrame for testing.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "feature_1": rng.random(30),
+            "feature_2": rng.random(30),
+            "target": rng.integers(0, 2, 30),
+            "log_return": rng.normal(0, 0.01, 30),
+        }
+    )
+    return df
+
+
+@pytest.fixture
+def scaler(mock_data):
+    """
+    A pytest fixture that creates a scaler fitted on the mock data features.
+    """
+    return MinMaxScaler().fit(mock_data[["feature_1", "feature_2"]])
+
+
+@pytest.fixture(autouse=True)
+def mock_plot(mocker):
+    """
+    A pytest fixture that stops the tests from drawing plots.
+    """
+    return mocker.patch(
+        "src.evaluation.evaluation_controller.visualizations.plot_cumulative_returns"
+    )
+
+
+def test_evaluate_models_batched_matches_serial(mock_data, scaler, mock_plot):
+    """
+    Test that batched evaluation of dense models produces the same metrics table as serial evaluation.
+    """
+    models = [DQN(3, 3).model for _ in range(3)]
+
+    serial = evaluation_controller.evaluate_models(models, mock_data, scaler)
+    batched = evaluation_controller.evaluate_models(
+        models, mock_data, scaler, batched=True
+    )
+
+    assert list(batched.index) == ["Model 1", "Model 2", "Model 3"]
+    assert {"sharpe_ratio", "beta", "alpha"} <= set(batched.columns)
+    pd.testing.assert_frame_equal(batched, serial, atol=1e-6)
+    assert mock_plot.call_args[0][1] == ["Model 1", "Model 2", "Model 3", "Benchmark"]
+
+
+def test_evaluate_models_batched_transforms_once(mocker, mock_data, scaler):
+    """
+    Test that batched evaluation normalizes the data once and predicts with non-dense models in a thread pool.
+    """
+    transform = mocker.spy(scaler, "transform")
+    models = []
+    for i in range(4):
+        model = mocker.Mock(spec=["predict"])
+        outputs = np.zeros((len(mock_data), 3))
+        outputs[:, i % 3] = 1
+        model.predict.return_value = outputs
+        models.append(model)
+
+    metrics_df = evaluation_controller.evaluate_models(
+        models, mock_data, scaler, batched=True, max_workers=2
+    )
+
+    assert transform.call_count == 1
+    for model in models:
+        model.predict.assert_called_once()
+    assert len(metrics_df) == 4
@@ -26,6 +26,73 @@ def test_create_sequences(mock_data):
     assert result.shape == (90, 10, 25)  # Check the shape of the output
 
 
+def test_create_sequences_is_a_view(mock_data):
+    """
+    Test that create_sequences returns the same windows as copying each slice, without copying the data.
+    """
+    result = lstm.create_sequences(mock_data, sequence_length=10)
+
+    expected = np.array([mock_data.values[i : i + 10] for i in range(90)])
+    np.testing.assert_array_equal(result, expected)
+    assert np.shares_memory(result, mock_data.values)
+    assert lstm.create_sequences(mock_data.iloc[:5], sequence_length=10).shape == (
+        0,
+        10,
+        25,
+    )
+
+
+def test_iter_sequence_batches(mock_data):
+    """
+    Test that iter_sequence_batches yields every sequence once, in order unless shuffled.
+    """
+    sequences = lstm.create_sequences(mock_data, sequence_length=10)
+
+    batches = list(lstm.iter_sequence_batches(sequences, batch_size=32))
+    assert [len(batch) for batch in batches] == [32, 32, 26]
+    assert batches[0].dtype == np.float32
+    np.testing.assert_allclose(np.concatenate(batches), sequences, rtol=1e-6)
+
+    shuffled = np.concatenate(
+        list(
+            lstm.iter_sequence_batches(
+                sequences, batch_size=32, shuffle=True, rng=np.random.default_rng(0)
+            )
+        )
+    )
+    first_values = sorted(shuffled[:, 0, 0])
+    np.testing.assert_allclose(first_values, sorted(sequences[:, 0, 0]), rtol=1e-6)
+
+
+def test_make_sequence_dataset(mock_data):
+    """
+    Test that make_sequence_dataset streams (inputs, targets) pairs of the same batch.
+    """
+    sequences = lstm.create_sequences(mock_data, sequence_length=10)
+
+    dataset = lstm.make_sequence_dataset(sequences, batch_size=40, shuffle=False)
+    batches = list(dataset.as_numpy_iterator())
+
+    assert [len(inputs) for inputs, _ in batches] == [40, 40, 10]
+    for inputs, targets in batches:
+        np.testing.assert_array_equal(inputs, targets)
+    np.testing.assert_allclose(batches[0][0], sequences[:40], rtol=1e-6)
+
+
+def test_predict_sequence_means(mock_data):
+    """
+    Test that predicting in batches gives the same means as predicting every sequence at once.
+    """
+    model = lstm.build_lstm_model((10, 25))
+    sequences = lstm.create_sequences(mock_data, sequence_length=10)
+
+    result = lstm.predict_sequence_means(model, sequences, batch_size=16)
+
+    expected = model.predict(np.asarray(sequences), verbose=0).mean(axis=(1, 2))
+    assert result.shape == (90,)
+    np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-6)
+
+
 def test_build_lstm_model():
     """
     Test the build_lstm_model function from the lstm module.
@@ -55,6 +122,19 @@ def test_train_model(mocker, mock_data):
     mock_model.fit.assert_called_once_with(X, X, epochs=10, batch_size=32, verbose=1)
 
 
+def test_train_model_with_dataset(mocker, mock_data):
+    """
+    Test that train_model fits on a dataset of batches without passing targets or a batch size.
+    """
+    mock_model = mocker.Mock(spec=Sequential)
+    sequences = lstm.create_sequences(mock_data, sequence_length=10)
+    dataset = lstm.make_sequence_dataset(sequences)
+
+    lstm.train_model(mock_model, dataset, epochs=2)
+
+    mock_model.fit.assert_called_once_with(dataset, epochs=2, verbose=1)
+
+
 def test_extract_features(mocker, mock_data):
     """
     Test the extract_features function from the lstm module.
@@ -5,10 +5,14 @@ The tests cover the main functions which add blockchain data and technical indic
 
 Functions:
 - test_add_blockchain_data: Tests the add_blockchain_data function from the feature_engineering module.
+- test_add_blockchain_data_fetches_concurrently: Tests that add_blockchain_data fetches all charts at once over one session.
 - test_add_all_technical_indicators: Tests the add_all_technical_indicators function from the feature_engineering module.
+- test_add_indicator_sweep: Tests the add_indicator_sweep function from the feature_engineering module.
 - test_extract_features: Tests the extract_features function from the feature_engineering module.
 """
 
+import threading
+
 import pandas as pd
 import numpy as np
 from keras.models import Sequential
@@ -16,7 +20,7 @@ from keras.layers import Dense, Dropout, LSTM, TimeDistributed
 
 import pytest
 from src.features import feature_engineering as fe
-
+from src.features.extraction.lstm import build_lstm_model, build_encoder, save_encoder
 
 @pytest.fixture
 def mock_data(mocker):
@@ -103,6 +107,37 @@ def test_add_blockchain_data(mock_data):
     assert isinstance(result, pd.DataFrame)
 
 
+def test_add_blockchain_data_fetches_concurrently(mocker, mock_data):
+    """
+    Test that add_blockchain_data fetches every chart concurrently with one shared session.
+    """
+    # Each fetch waits until all five are in flight, which only succeeds if they run concurrently
+    barrier = threading.Barrier(5, timeout=5)
+    sessions = []
+    for name in [
+        "get_hash_rate_over_time",
+        "get_avg_block_size",
+        "get_network_difficulty",
+        "get_miners_revenue",
+        "get_mempool_size",
+    ]:
+        getter = getattr(fe, name)
+
+        def fetch(timespan, start_date=None, cache=None, session=None, getter=getter):
+            barrier.wait()
+            sessions.append(session)
+            return getter.return_value
+
+        mocker.patch(f"src.features.feature_engineering.{name}", side_effect=fetch)
+
+    session = mocker.Mock()
+    result = fe.add_blockchain_data(mock_data, session=session)
+
+    assert isinstance(result, pd.DataFrame)
+    assert sessions == [session] * 5
+    session.close.assert_not_called()
+
+
 def test_add_all_technical_indicators(mock_data):
     """
     Test the add_all_technical_indicators function from the feature_engineering module.
@@ -111,6 +146,22 @@ def test_add_all_technical_indicators(mock_data):
     assert isinstance(result, pd.DataFrame)
 
 
+def test_add_indicator_sweep(mock_data):
+    """
+    Test the add_indicator_sweep function from the feature_engineering module.
+    """
+    result = fe.add_indicator_sweep(mock_data, {"sma": [5, 10], "rsi": [14]})
+
+    assert list(result.columns) == list(mock_data.columns) + [
+        "sma_5",
+        "sma_10",
+        "rsi_14",
+    ]
+    assert result.index.equals(mock_data.index)
+    assert result["sma_5"].iloc[:4].isna().all()
+    assert result["sma_5"].iloc[4:].notna().all()
+
+
 def test_extract_lstm_features(mocker, mock_data):
     """
     Test the extract_lstm_features function from the feature_engineering module.
@@ -167,3 +218,25 @@ def test_extract_lstm_features(mocker, mock_data):
 
     assert isinstance(result, pd.DataFrame)
     assert "lstm_feature" in result.columns  # Check that the LSTM feature was added
+
+
+def test_add_lstm_features_with_saved_encoder(mock_data, tmpdir):
+    """
+    Test that a saved encoder extracts the same features as the trained one, without training.
+    """
+    data = pd.DataFrame(
+        np.random.default_rng(0).random((40, 4)),
+        columns=[f"feature_{i}" for i in range(4)],
+        index=pd.date_range("2022-01-01", periods=40, freq="D"),
+    )
+    model = build_lstm_model((10, 4))
+    encoder = build_encoder(model)
+    encoder_path = str(tmpdir.join("lstm_encoder.h5"))
+    save_encoder(encoder, encoder_path)
+
+    expected = fe.add_lstm_features(data, encoder)
+    result = fe.add_lstm_features(data, encoder_path)
+
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-5)
+    assert result["lstm_feature"].isna().sum() == 10
+    assert result["lstm_feature"].notna().iloc[9:-1].all()
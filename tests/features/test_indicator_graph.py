@@ -0,0 +1,158 @@
+"""
+This module contains tests for the indicator planner in the indicator_graph module.
+
+Tests cover the plan of shared intermediates, computing each shared node once, and the results of the technical
+indicators against the ta module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import ta, ta_numpy
+from src.features.indicator_graph import (
+    TECHNICAL_INDICATORS,
+    compute_indicator_arrays,
+    compute_indicators,
+    plan_indicators,
+)
+
+
+@pytest.fixture
+def prices():
+    """
+    A pytest fixture that returns a random walk of high, low, close and volume prices.
+    """
+    rng = np.random.default_rng(0)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+    return pd.DataFrame(
+        {
+            "High": close * (1 + rng.uniform(0, 0.02, 300)),
+            "Low": close * (1 - rng.uniform(0, 0.02, 300)),
+            "Close": close,
+            "Volume": rng.uniform(1e3, 1e5, 300),
+        },
+        index=pd.date_range(start="1/1/2022", periods=300),
+    )
+
+
+def test_plan_indicators_shares_intermediates():
+    """
+    Test that every node is planned once and after the nodes it depends on.
+    """
+    order = plan_indicators(TECHNICAL_INDICATORS)
+
+    assert len(order) == len(set(order))
+    assert order.count(("macd", 12, 26, 9)) == 1
+    # The RSI and OBV share the close price changes, the SMA and Bollinger Bands the prefix sums
+    assert ("change", "Close") in order
+    assert ("prefix_sums", "Close") in order
+    assert order.index(("change", "Close")) < order.index(("rsi", 14))
+    assert order.index(("change", "Close")) < order.index(("obv",))
+    assert order.index(("true_range",)) < order.index(("atr", 14))
+    assert order.index(("typical_price",)) < order.index(("cci", 14))
+
+
+def test_plan_indicators_unknown_operation():
+    """
+    Test that an unknown indicator raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        plan_indicators({"foo": (("foo", 14), None)})
+
+
+def test_compute_indicators_matches_ta(prices):
+    """
+    Test that the technical indicators match the functions of the ta module.
+    """
+    result = compute_indicators(prices)
+
+    upper, middle, lower = ta.calculate_bollinger_bands(prices["Close"])
+    slowk, slowd = ta.calculate_stochastic_oscillator(prices)
+    macd, macdsignal, macdhist = ta.calculate_macd(prices["Close"])
+    expected = {
+        "upper_bb": upper,
+        "middle_bb": middle,
+        "lower_bb": lower,
+        "slowk": slowk,
+        "slowd": slowd,
+        "macd": macd,
+        "macdsignal": macdsignal,
+        "macdhist": macdhist,
+        "rsi": ta.calculate_rsi(prices["Close"]),
+        "sma": ta.calculate_sma(prices["Close"]),
+        "ema": ta.calculate_ema(prices["Close"]),
+        "atr": ta.calculate_atr(prices),
+        "macd_hist": ta.calculate_macd_histogram(prices["Close"]),
+        "obv": ta.calculate_obv(prices),
+        "cci": ta.calculate_cci(prices),
+    }
+
+    assert list(result.columns) == list(TECHNICAL_INDICATORS)
+    assert result.index.equals(prices.index)
+    for column, values in expected.items():
+        np.testing.assert_allclose(
+            result[column], np.asarray(values), rtol=1e-9, err_msg=column
+        )
+
+
+def test_compute_indicators_computes_shared_nodes_once(mocker, prices):
+    """
+    Test that the MACD behind both histogram columns and the price changes shared by the RSI and OBV are
+    computed once.
+    """
+    macd_lines = mocker.patch.object(ta_numpy, "macd_lines", wraps=ta_numpy.macd_lines)
+    price_change = mocker.patch.object(
+        ta_numpy, "price_change", wraps=ta_numpy.price_change
+    )
+
+    result = compute_indicators(prices)
+
+    assert macd_lines.call_count == 1
+    assert price_change.call_count == 1
+    np.testing.assert_array_equal(result["macd_hist"], result["macdhist"])
+
+
+def test_compute_indicators_custom_set(prices):
+    """
+    Test computing a requested subset with parameters other than the defaults.
+    """
+    indicators = {
+        "sma_10": (("rolling_mean", "Close", 10), None),
+        "sma_50": (("rolling_mean", "Close", 50), None),
+        "upper_10": (("bbands", 10, 1.5, 1.5), 0),
+    }
+
+    result = compute_indicators(prices, indicators)
+
+    assert list(result.columns) == ["sma_10", "sma_50", "upper_10"]
+    np.testing.assert_allclose(
+        result["sma_50"], ta_numpy.SMA(prices["Close"], 50), rtol=1e-9
+    )
+    np.testing.assert_allclose(
+        result["upper_10"],
+        ta_numpy.BBANDS(prices["Close"], 10, 1.5, 1.5)[0],
+        rtol=1e-9,
+    )
+
+
+def test_compute_indicator_arrays_of_many_series(prices):
+    """
+    Test that indicators of (time, series) arrays match the indicators of each series on its own.
+    """
+    other = prices * 0.5
+    panel = {
+        column: np.column_stack([prices[column], other[column]])
+        for column in prices.columns
+    }
+
+    result = compute_indicator_arrays(panel)
+
+    assert list(result) == list(TECHNICAL_INDICATORS)
+    for i, series in enumerate((prices, other)):
+        expected = compute_indicators(series)
+        for column, values in result.items():
+            assert values.shape == (len(prices), 2)
+            np.testing.assert_allclose(
+                values[:, i], expected[column], rtol=1e-9, err_msg=column
+            )
@@ -0,0 +1,127 @@
+"""
+This module contains tests for the indicator parameter sweep in the indicator_sweep module.
+
+Tests cross-check every swept variant against the batch indicators of the ta_numpy module and cover the generated
+column names and invalid grids.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import ta_numpy
+from src.features.indicator_sweep import sweep_columns, sweep_indicators
+
+
+@pytest.fixture
+def prices():
+    """
+    A pytest fixture that returns a random walk of high, low and close prices.
+    """
+    rng = np.random.default_rng(0)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+    return pd.DataFrame(
+        {
+            "High": close * (1 + rng.uniform(0, 0.02, 400)),
+            "Low": close * (1 - rng.uniform(0, 0.02, 400)),
+            "Close": close,
+        }
+    )
+
+
+def _expected(prices, grid):
+    """
+    Computes every variant of a grid with one ta_numpy call per variant.
+    """
+    high, low, close = prices["High"], prices["Low"], prices["Close"]
+    expected = {}
+    for period in grid["sma"]:
+        expected[f"sma_{period}"] = ta_numpy.SMA(close, period)
+    for period in grid["ema"]:
+        expected[f"ema_{period}"] = ta_numpy.EMA(close, period)
+    for period in grid["bbands"]:
+        bands = ta_numpy.BBANDS(close, period)
+        for output, values in zip(("upper_bb", "middle_bb", "lower_bb"), bands):
+            expected[f"{output}_{period}"] = values
+    for fastk, slowk, slowd in [(5, 3, 3), (14, 3, 3), (21, 5, 2)]:
+        lines = ta_numpy.STOCH(high, low, close, fastk, slowk, 0, slowd, 0)
+        for output, values in zip(("slowk", "slowd"), lines):
+            expected[f"{output}_{fastk}_{slowk}_{slowd}"] = values
+    for params in grid["macd"]:
+        lines = ta_numpy.MACD(close, *params)
+        suffix = "_".join(str(param) for param in params)
+        for output, values in zip(("macd", "macdsignal", "macdhist"), lines):
+            expected[f"{output}_{suffix}"] = values
+    for period in grid["rsi"]:
+        expected[f"rsi_{period}"] = ta_numpy.RSI(close, period)
+    for period in grid["atr"]:
+        expected[f"atr_{period}"] = ta_numpy.ATR(high, low, close, period)
+    for period in grid["cci"]:
+        expected[f"cci_{period}"] = ta_numpy.CCI(high, low, close, period)
+    return expected
+
+
+def test_sweep_indicators_matches_ta_numpy(prices):
+    """
+    Test that every variant of the sweep matches the batch indicator with the same parameters.
+    """
+    grid = {
+        "sma": [1, 5, 30, 200],
+        "ema": [2, 30, 100],
+        "bbands": [5, 20],
+        "stoch": [5, (14, 3, 3), (21, 5, 2)],
+        "macd": [(12, 26, 9), (26, 12, 9), (5, 35, 5)],
+        "rsi": [2, 14, 30],
+        "atr": [1, 14, 50],
+        "cci": [14, 40],
+    }
+
+    matrix, columns = sweep_indicators(prices, grid)
+    expected = _expected(prices, grid)
+
+    assert matrix.shape == (len(prices), len(expected))
+    assert sorted(columns) == sorted(expected)
+    for i, column in enumerate(columns):
+        np.testing.assert_allclose(
+            matrix[:, i], np.asarray(expected[column]), rtol=1e-9, err_msg=column
+        )
+
+
+def test_sweep_columns():
+    """
+    Test that the columns are named after the outputs and parameters, in the order of the grid.
+    """
+    columns = sweep_columns({"rsi": [7, 14], "macd": [(12, 26, 9)], "stoch": [5]})
+
+    assert columns == [
+        "rsi_7",
+        "rsi_14",
+        "macd_12_26_9",
+        "macdsignal_12_26_9",
+        "macdhist_12_26_9",
+        "slowk_5_3_3",
+        "slowd_5_3_3",
+    ]
+
+
+def test_sweep_indicators_close_only(prices):
+    """
+    Test that indicators of the close prices only need a 'Close' column.
+    """
+    matrix, columns = sweep_indicators(prices[["Close"]], {"sma": [10], "rsi": [14]})
+
+    assert columns == ["sma_10", "rsi_14"]
+    np.testing.assert_allclose(
+        matrix[:, 1], ta_numpy.RSI(prices["Close"], 14), rtol=1e-9
+    )
+
+
+@pytest.mark.parametrize(
+    "grid", [{"obv": [1]}, {"sma": [0]}, {"macd": [12]}, {"rsi": [(14, 3)]}]
+)
+def test_sweep_indicators_invalid_grid(prices, grid):
+    """
+    Test that unknown indicators and malformed parameters raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        sweep_indicators(prices, grid)
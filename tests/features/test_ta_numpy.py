@@ -0,0 +1,165 @@
+"""
+This module contains tests for the NumPy technical indicators in the ta_numpy module.
+
+Tests cross-check every indicator against TA-Lib and cover 2D inputs, float32 inputs and pandas inputs.
+"""
+
+import importlib
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import ta_numpy
+
+talib = pytest.importorskip("talib")
+
+
+@pytest.fixture
+def prices():
+    """
+    A pytest fixture that returns a random walk of high, low, close and volume arrays.
+    """
+    rng = np.random.default_rng(0)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+    high = close * (1 + rng.uniform(0, 0.02, 500))
+    low = close * (1 - rng.uniform(0, 0.02, 500))
+    volume = rng.uniform(1e3, 1e5, 500)
+    return high, low, close, volume
+
+
+def _indicators(module, high, low, close, volume):
+    """
+    Computes every indicator with its default parameters and the parameters used by the ta module.
+    """
+    return {
+        "bbands": module.BBANDS(close, 20),
+        "stoch": module.STOCH(high, low, close, 14, 3, 0, 3, 0),
+        "macd": module.MACD(close),
+        "macd_swapped": module.MACD(close, 26, 12, 9),
+        "rsi": module.RSI(close),
+        "sma": module.SMA(close),
+        "ema": module.EMA(close),
+        "atr": module.ATR(high, low, close),
+        "obv": module.OBV(close, volume),
+        "cci": module.CCI(high, low, close),
+    }
+
+
+def _outputs(result):
+    """
+    Returns the outputs of an indicator as a tuple, whether it has one output or several.
+    """
+    return result if isinstance(result, tuple) else (result,)
+
+
+def test_matches_talib(prices):
+    """
+    Test that every indicator matches TA-Lib, including where the lookback period ends.
+    """
+    expected = _indicators(talib, *prices)
+    result = _indicators(ta_numpy, *prices)
+
+    for name in expected:
+        for output, expected_output in zip(
+            _outputs(result[name]), _outputs(expected[name])
+        ):
+            np.testing.assert_allclose(
+                output, expected_output, rtol=1e-9, atol=1e-9, err_msg=name
+            )
+
+
+def test_matches_talib_on_flat_prices():
+    """
+    Test that flat price ranges give the same results as TA-Lib instead of dividing by zero.
+    """
+    flat = np.full(60, 100.0)
+
+    np.testing.assert_array_equal(ta_numpy.RSI(flat), talib.RSI(flat))
+    np.testing.assert_array_equal(
+        ta_numpy.CCI(flat, flat, flat), talib.CCI(flat, flat, flat)
+    )
+    for output, expected in zip(
+        ta_numpy.STOCH(flat, flat, flat), talib.STOCH(flat, flat, flat)
+    ):
+        np.testing.assert_array_equal(output, expected)
+    for output, expected in zip(ta_numpy.BBANDS(flat), talib.BBANDS(flat)):
+        np.testing.assert_array_equal(output, expected)
+
+
+def test_2d_input_matches_each_column(prices):
+    """
+    Test that a 2D input computes each column like a separate 1D input.
+    """
+    high, low, close, volume = prices
+    columns = [close, close[::-1].copy(), close * 2]
+    stacked = np.column_stack(columns)
+
+    rsi = ta_numpy.RSI(stacked)
+    upper, middle, lower = ta_numpy.BBANDS(stacked, 20)
+    macd, signal, hist = ta_numpy.MACD(stacked)
+
+    assert rsi.shape == stacked.shape
+    for i, column in enumerate(columns):
+        np.testing.assert_allclose(rsi[:, i], talib.RSI(column), rtol=1e-9)
+        np.testing.assert_allclose(upper[:, i], talib.BBANDS(column, 20)[0], rtol=1e-9)
+        np.testing.assert_allclose(hist[:, i], talib.MACD(column)[2], rtol=1e-9)
+
+
+def test_float32_input(prices):
+    """
+    Test that float32 input returns float32 output close to the float64 result.
+    """
+    close = prices[2]
+
+    result = ta_numpy.EMA(close.astype(np.float32))
+
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, talib.EMA(close), rtol=1e-6)
+
+
+def test_pandas_input(prices):
+    """
+    Test that Series inputs return Series and DataFrame inputs return DataFrames with the input's index.
+    """
+    index = pd.date_range("2020-01-01", periods=500, freq="D")
+    close = pd.Series(prices[2], index=index)
+
+    sma = ta_numpy.SMA(close)
+    assert isinstance(sma, pd.Series)
+    assert sma.index.equals(index)
+    pd.testing.assert_series_equal(sma, talib.SMA(close), rtol=1e-9)
+
+    frame = pd.DataFrame({"a": close, "b": close * 2})
+    ema = ta_numpy.EMA(frame)
+    assert isinstance(ema, pd.DataFrame)
+    assert list(ema.columns) == ["a", "b"]
+
+
+def test_unsupported_matype(prices):
+    """
+    Test that moving average types other than the simple moving average are rejected.
+    """
+    with pytest.raises(ValueError):
+        ta_numpy.BBANDS(prices[2], matype=1)
+
+
+def test_ta_falls_back_without_talib(monkeypatch, prices):
+    """
+    Test that the ta module uses the NumPy indicators when TA-Lib cannot be imported.
+    """
+    from src.features import ta
+
+    monkeypatch.setitem(sys.modules, "talib", None)
+    try:
+        importlib.reload(ta)
+        assert ta.talib is ta_numpy
+        close = pd.Series(prices[2])
+        np.testing.assert_allclose(
+            ta.calculate_rsi(close), talib.RSI(prices[2]), rtol=1e-9
+        )
+    finally:
+        monkeypatch.undo()
+        importlib.reload(ta)
+    assert ta.talib is talib
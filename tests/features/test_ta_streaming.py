@@ -0,0 +1,134 @@
+"""
+This module contains tests for the incremental technical indicators in the ta_streaming module.
+
+Tests check that the incremental indicators match the batch indicators, whether they are updated bar by bar or in
+batches, and that their state objects have no instance dictionary.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import ta, ta_streaming
+from src.features.indicator_graph import compute_indicators
+
+
+def random_walk(seed=0, num_steps=300, volatility=0.02):
+    """
+    Returns a random walk of high, low, close and volume prices.
+    """
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, volatility, num_steps)))
+    return pd.DataFrame(
+        {
+            "High": close * (1 + rng.uniform(0, 0.02, num_steps)),
+            "Low": close * (1 - rng.uniform(0, 0.02, num_steps)),
+            "Close": close,
+            "Volume": rng.uniform(1e3, 1e5, num_steps),
+        },
+        index=pd.date_range(start="1/1/2022", periods=num_steps),
+    )
+
+
+@pytest.fixture
+def prices():
+    """
+    A pytest fixture that returns a random walk of high, low, close and volume prices.
+    """
+    return random_walk()
+
+
+@pytest.mark.parametrize(
+    "indicator, batch, uses_bars",
+    [
+        (ta_streaming.BollingerBands(), ta.calculate_bollinger_bands, False),
+        (
+            ta_streaming.StochasticOscillator(),
+            ta.calculate_stochastic_oscillator,
+            True,
+        ),
+        (ta_streaming.MACD(), ta.calculate_macd, False),
+        (ta_streaming.RSI(), ta.calculate_rsi, False),
+        (ta_streaming.SMA(), ta.calculate_sma, False),
+        (ta_streaming.EMA(), ta.calculate_ema, False),
+        (ta_streaming.ATR(), ta.calculate_atr, True),
+        (ta_streaming.MACDHistogram(), ta.calculate_macd_histogram, False),
+        (ta_streaming.OBV(), ta.calculate_obv, True),
+        (ta_streaming.CCI(), ta.calculate_cci, True),
+    ],
+)
+def test_update_batch_matches_ta(prices, indicator, batch, uses_bars):
+    """
+    Test that every incremental indicator matches the batch function of the ta module.
+    """
+    data = prices if uses_bars else prices["Close"]
+
+    result = indicator.update_batch(data)
+    expected = batch(data)
+
+    if not isinstance(expected, tuple):
+        result, expected = (result,), (expected,)
+    assert len(result) == len(expected)
+    for values, expected_values in zip(result, expected):
+        np.testing.assert_allclose(values, np.asarray(expected_values), rtol=1e-9)
+
+
+def test_update_matches_update_batch(prices):
+    """
+    Test that updating bar by bar, or continuing a batch, gives the same values as one batch.
+    """
+    expected = ta_streaming.TechnicalIndicatorStream().update_batch(prices)
+
+    stream = ta_streaming.TechnicalIndicatorStream()
+    head = stream.update_batch(prices.iloc[:200])
+    tail = [stream.update(bar) for _, bar in prices.iloc[200:].iterrows()]
+
+    np.testing.assert_array_equal(head, expected.iloc[:200])
+    np.testing.assert_array_equal(pd.DataFrame(tail), expected.iloc[200:])
+    assert list(tail[0]) == list(expected.columns)
+
+
+@pytest.mark.parametrize(
+    "seed, num_steps, volatility", [(0, 300, 0.02), (1, 800, 0.03), (2, 2000, 0.05)]
+)
+def test_stream_matches_batch_indicators(seed, num_steps, volatility):
+    """
+    Test that the stream gives exactly the columns computed by the batch indicators, over long and volatile
+    histories too.
+    """
+    prices = random_walk(seed, num_steps, volatility)
+    result = ta_streaming.TechnicalIndicatorStream().update_batch(prices)
+    expected = compute_indicators(prices)
+
+    assert list(result.columns) == list(expected.columns)
+    assert result.index.equals(prices.index)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_flat_prices():
+    """
+    Test the indicators of flat prices, whose ranges and deviations are zero.
+    """
+    flat = pd.DataFrame(
+        {"High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1.0}, index=range(60)
+    )
+
+    result = ta_streaming.TechnicalIndicatorStream().update_batch(flat)
+
+    np.testing.assert_array_equal(result, compute_indicators(flat))
+
+
+def test_indicators_have_no_instance_dict():
+    """
+    Test that the state objects use slots instead of an instance dictionary.
+    """
+    for indicator in (
+        ta_streaming.BollingerBands(),
+        ta_streaming.StochasticOscillator(),
+        ta_streaming.MACDHistogram(),
+        ta_streaming.RSI(),
+        ta_streaming.ATR(),
+        ta_streaming.OBV(),
+        ta_streaming.CCI(),
+    ):
+        assert not hasattr(indicator, "__dict__")
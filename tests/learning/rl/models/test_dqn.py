@@ -30,6 +30,16 @@ class TestDQN:
         assert isinstance(dqn.model, Sequential)
         assert isinstance(dqn.target_model, Sequential)
 
+    def test_initialization_hyperparameters(self):
+        """
+        Test that the DQN hyperparameters can be set at initialization.
+        """
+        dqn = DQN(10, 3, gamma=0.5, epsilon=0.2, epsilon_decay=0.9, learning_rate=0.01)
+        assert dqn.gamma == 0.5
+        assert dqn.epsilon == 0.2
+        assert dqn.epsilon_decay == 0.9
+        assert float(dqn.model.optimizer.learning_rate) == pytest.approx(0.01)
+
     def test_build_model(self, dqn):
         """
         Test the build_model method of the DQN class.
@@ -76,17 +86,133 @@ class TestDQN:
         dqn.remember(state, action, reward, next_state, done)
         dqn.replay(1)
 
+    def test_replay_single_update_per_minibatch(self, dqn, mocker):
+        """
+        Test that the replay method computes targets and trains on the whole minibatch at once.
+        """
+        for i in range(8):
+            dqn.remember(
+                np.random.rand(dqn.state_size),
+                i % dqn.action_size,
+                1,
+                np.random.rand(dqn.state_size),
+                i == 7,
+            )
+
+        dqn._q_values = mocker.Mock(wraps=dqn._q_values)
+        dqn._target_q_values = mocker.Mock(wraps=dqn._target_q_values)
+        dqn._train_step = mocker.Mock(wraps=dqn._train_step)
+        predict_spy = mocker.spy(dqn.model, "predict")
+
+        dqn.replay(8)
+
+        assert dqn._q_values.call_count == 0
+        assert dqn._target_q_values.call_count == 1
+        assert dqn._train_step.call_count == 1
+        assert predict_spy.call_count == 0
+        states, actions, targets, weights = dqn._train_step.call_args[0]
+        assert states.shape == (8, dqn.state_size)
+        assert actions.shape == targets.shape == weights.shape == (8,)
+
+    def test_train_step_updates_taken_actions(self, dqn):
+        """
+        Test that the compiled train step returns TD errors and moves the taken action towards its target.
+        """
+        states = np.random.rand(4, dqn.state_size).astype(np.float32)
+        actions = np.array([0, 1, 2, 0], dtype=np.int32)
+        q_before = dqn._q_values(states).numpy()
+        targets = (q_before[np.arange(4), actions] + 1).astype(np.float32)
+
+        td_errors = dqn._train_step(
+            states, actions, targets, np.ones(4, dtype=np.float32)
+        ).numpy()
+
+        assert np.allclose(td_errors, 1, atol=1e-5)
+        q_after = dqn._q_values(states).numpy()
+        assert np.all(q_after[np.arange(4), actions] > q_before[np.arange(4), actions])
+
+    def test_replay_prioritized(self, mocker):
+        """
+        Test that prioritized replay weights the update and refreshes the replayed priorities.
+        """
+        dqn = DQN(10, 3, prioritized=True)
+        for i in range(8):
+            dqn.remember(
+                np.random.rand(dqn.state_size),
+                i % dqn.action_size,
+                i,
+                np.random.rand(dqn.state_size),
+                False,
+            )
+        update_spy = mocker.spy(dqn.memory, "update_priorities")
+        dqn._train_step = mocker.Mock(wraps=dqn._train_step)
+
+        dqn.replay(4)
+
+        weights = dqn._train_step.call_args[0][3]
+        assert weights.shape == (4,)
+        assert weights.max() == 1.0
+        update_spy.assert_called_once()
+
+    def test_replay_hard_target_sync(self):
+        """
+        Test that the target model is copied from the model every target_sync_steps training steps.
+        """
+        dqn = DQN(10, 3, target_sync_steps=2)
+        for i in range(8):
+            dqn.remember(np.random.rand(10), i % 3, 1, np.random.rand(10), False)
+
+        dqn.replay(4)
+        assert not np.array_equal(
+            dqn.model.get_weights()[0], dqn.target_model.get_weights()[0]
+        )
+
+        dqn.replay(4)
+        for w1, w2 in zip(dqn.model.get_weights(), dqn.target_model.get_weights()):
+            assert np.array_equal(w1, w2)
+
+    def test_soft_update_target_model(self, dqn):
+        """
+        Test that soft updates blend the model weights into the target model weights.
+        """
+        for layer in dqn.model.layers:
+            layer.set_weights([np.ones(w.shape) for w in layer.get_weights()])
+        for layer in dqn.target_model.layers:
+            layer.set_weights([np.zeros(w.shape) for w in layer.get_weights()])
+
+        dqn.soft_update_target_model(0.25)
+
+        for weight in dqn.target_model.get_weights():
+            assert np.allclose(weight, 0.25)
+
+    def test_replay_soft_target_sync(self, mocker):
+        """
+        Test that setting tau soft-updates the target model after every training step.
+        """
+        dqn = DQN(10, 3, tau=0.01)
+        for i in range(8):
+            dqn.remember(np.random.rand(10), i % 3, 1, np.random.rand(10), False)
+        soft_update_spy = mocker.spy(dqn, "soft_update_target_model")
+
+        dqn.replay(4)
+        dqn.replay(4)
+
+        assert soft_update_spy.call_count == 2
+        soft_update_spy.assert_called_with(0.01)
+
     def test_remember(self, dqn):
         """
         Test the remember method of the DQN class.
         """
-        state = np.array([1, 2, 3])
+        state = np.arange(dqn.state_size)
         action = 1
         reward = 1
-        next_state = np.array([4, 5, 6])
+        next_state = np.arange(dqn.state_size) + 1
         done = False
         dqn.remember(state, action, reward, next_state, done)
         assert len(dqn.memory) == 1
+        assert np.array_equal(dqn.memory.states[0], state)
+        assert np.array_equal(dqn.memory.next_states[0], next_state)
 
     def test_act(self, dqn):
         """
@@ -104,6 +230,33 @@ class TestDQN:
         action = dqn.act(state)
         assert action in range(dqn.action_size)
 
+    def test_act_batch(self, dqn, mocker):
+        """
+        Test that the act_batch method chooses actions for all states with one forward pass.
+        """
+        states = np.random.rand(5, dqn.state_size)
+        dqn._q_values = mocker.Mock(wraps=dqn._q_values)
+
+        dqn.epsilon = 0.0
+        actions = dqn.act_batch(states)
+
+        assert actions.shape == (5,)
+        assert set(actions.tolist()) <= set(range(dqn.action_size))
+        assert dqn._q_values.call_count == 1
+
+        dqn.epsilon = 1.0
+        actions = dqn.act_batch(states)
+        assert set(actions.tolist()) <= set(range(dqn.action_size))
+
+    def test_remember_batch(self, dqn):
+        """
+        Test the remember_batch method of the DQN class.
+        """
+        states = np.random.rand(4, dqn.state_size)
+        dqn.remember_batch(states, np.ones(4), np.ones(4), states, np.zeros(4))
+        assert len(dqn.memory) == 4
+        assert np.allclose(dqn.memory.states[:4], states)
+
     def test_save_model(self, dqn, tmpdir):
         """
         Test the save_model method of the DQN class.
@@ -0,0 +1,50 @@
+"""
+This module contains tests for the functions in the numpy_policy module.
+"""
+
+import numpy as np
+from src.learning.rl.models.dqn import DQN
+from src.learning.rl.models.numpy_policy import (
+    dense_forward,
+    dense_weights,
+    stacked_dense_forward,
+)
+
+
+def test_dense_forward_matches_keras_model():
+    """
+    Test that dense_forward reproduces the Q-values of the Keras DQN model.
+    """
+    dqn = DQN(10, 3)
+    states = np.random.rand(6, 10).astype(np.float32)
+
+    q_values = dense_forward(dqn.model.get_weights(), states)
+
+    assert q_values.shape == (6, 3)
+    assert np.allclose(q_values, dqn.model(states).numpy(), atol=1e-5)
+
+
+def test_stacked_dense_forward_matches_dense_forward():
+    """
+    Test that stacked_dense_forward computes each model's Q-values like dense_forward.
+    """
+    weight_sets = [DQN(10, 3).model.get_weights() for _ in range(3)]
+    states = np.random.rand(6, 10).astype(np.float32)
+
+    q_values = stacked_dense_forward(weight_sets, states)
+
+    assert q_values.shape == (3, 6, 3)
+    for weights, model_q_values in zip(weight_sets, q_values):
+        assert np.allclose(model_q_values, dense_forward(weights, states), atol=1e-5)
+
+
+def test_dense_weights():
+    """
+    Test that dense_weights returns the weights of dense models and None for other architectures.
+    """
+    model = DQN(10, 3).model
+    assert len(dense_weights(model)) == len(model.get_weights())
+
+    model.layers[-1].activation = model.layers[0].activation
+    assert dense_weights(model) is None
+    assert dense_weights(object()) is None
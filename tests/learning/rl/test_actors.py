@@ -0,0 +1,123 @@
+"""
+This module contains tests for the actor functions in the actors module.
+
+Tests cover collecting and sending experience chunks and broadcasting weights to actors.
+"""
+
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.feature_matrix import save_feature_matrix
+from src.learning.rl.actors import run_actor, broadcast_weights
+
+
+@pytest.fixture
+def mock_data():
+    """
+    A pytest fixture that creates a mock DataFrame for testing.
+    """
+    df = pd.DataFrame(
+        {"Close": np.linspace(0, 1, 10), "log_return": np.linspace(-0.05, 0.05, 10)}
+    )
+    return df
+
+
+@pytest.fixture
+def mock_weights():
+    """
+    A pytest fixture that creates weights for a 2-4-3 dense network.
+    """
+    rng = np.random.default_rng(0)
+    return [
+        rng.random((2, 4), dtype=np.float32),
+        np.zeros(4, dtype=np.float32),
+        rng.random((4, 3), dtype=np.float32),
+        np.zeros(3, dtype=np.float32),
+    ]
+
+
+def test_run_actor_sends_chunks(mock_data, mock_weights):
+    """
+    Test that run_actor sends experience chunks of the configured size and stops at max_transitions.
+    """
+    transition_queue = queue.Queue()
+    weights_queue = queue.Queue()
+    weights_queue.put((mock_weights, 0.5))
+
+    run_actor(
+        mock_data,
+        transition_queue,
+        weights_queue,
+        threading.Event(),
+        chunk_size=4,
+        max_transitions=12,
+        seed=0,
+    )
+
+    chunks = [transition_queue.get_nowait() for _ in range(transition_queue.qsize())]
+    assert len(chunks) == 3
+    states, actions, rewards, next_states, dones = chunks[0]
+    assert states.shape == next_states.shape == (4, 2)
+    assert actions.shape == rewards.shape == dones.shape == (4,)
+    assert set(actions.tolist()) <= {0, 1, 2}
+    # Consecutive experiences chain together within an episode
+    assert np.array_equal(states[1:], next_states[:-1])
+
+
+def test_run_actor_stops_when_stop_event_is_set(mock_data, mock_weights):
+    """
+    Test that run_actor returns without sending anything once the stop event is set.
+    """
+    transition_queue = queue.Queue()
+    weights_queue = queue.Queue()
+    weights_queue.put((mock_weights, 0.0))
+    stop_event = threading.Event()
+    stop_event.set()
+
+    run_actor(mock_data, transition_queue, weights_queue, stop_event)
+
+    assert transition_queue.empty()
+
+
+def test_run_actor_from_feature_matrix(mock_data, mock_weights, tmpdir):
+    """
+    Test that run_actor given a model directory trades on its slice of the stored feature matrix.
+    """
+    save_feature_matrix(mock_data, tmpdir)
+    transition_queue = queue.Queue()
+    weights_queue = queue.Queue()
+    weights_queue.put((mock_weights, 1.0))
+
+    run_actor(
+        str(tmpdir),
+        transition_queue,
+        weights_queue,
+        threading.Event(),
+        chunk_size=4,
+        max_transitions=4,
+        seed=0,
+        start=5,
+        stop=10,
+    )
+
+    states, _, _, _, _ = transition_queue.get_nowait()
+    expected_states = mock_data.iloc[5:10].to_numpy(dtype=np.float32)
+    assert all(any(np.array_equal(s, e) for e in expected_states) for s in states)
+    np.testing.assert_array_equal(states[0], expected_states[0])
+
+
+def test_broadcast_weights_replaces_stale_messages(mock_weights):
+    """
+    Test that broadcast_weights leaves only the latest message on each actor's queue.
+    """
+    weights_queues = [queue.Queue(maxsize=1) for _ in range(2)]
+    broadcast_weights(weights_queues, mock_weights, 0.9)
+    broadcast_weights(weights_queues, mock_weights, 0.5)
+
+    for weights_queue in weights_queues:
+        weights, epsilon = weights_queue.get_nowait()
+        assert epsilon == 0.5
+        assert weights_queue.empty()
@@ -1,13 +1,15 @@
 """
 This module contains tests for the TradingEnvironment class in the environment module.
 
-Tests cover the initialization, reset, step, calculate_reward, _get_state, render, and calculate_fee methods.
+Tests cover the initialization, reset, step, calculate_reward, _get_state, render, and calculate_fee methods,
+as well as the VecTradingEnvironment class that steps several environments together.
 """
 
 import pandas as pd
 import numpy as np
 import pytest
-from src.learning.rl.environment import TradingEnvironment
+from src.data.feature_matrix import save_feature_matrix, load_feature_matrix
+from src.learning.rl.environment import TradingEnvironment, VecTradingEnvironment
 
 
 @pytest.fixture
@@ -33,6 +35,31 @@ def test_trading_environment_initialization(mock_data):
     assert env.position == 0
 
 
+def test_trading_environment_from_feature_matrix(mock_data, tmpdir):
+    """
+    Test that an environment created over a memory-mapped feature matrix uses it without copying and steps
+    like one created from the DataFrame.
+    """
+    save_feature_matrix(mock_data, tmpdir)
+    features, log_returns, _, _ = load_feature_matrix(tmpdir)
+
+    env = TradingEnvironment.from_feature_matrix(features, log_returns)
+    reference = TradingEnvironment(mock_data)
+
+    assert env.data is None
+    assert np.shares_memory(env.features, features)
+    assert env.num_steps == 3
+    assert env.balance == 10000
+    np.testing.assert_array_equal(env.reset(), reference.reset())
+    for action in (1, 0, 2):
+        state, reward, done = env.step(action)
+        expected_state, expected_reward, expected_done = reference.step(action)
+        np.testing.assert_array_equal(state, expected_state)
+        assert reward == expected_reward
+        assert done == expected_done
+    assert env.balance == reference.balance
+
+
 def test_trading_environment_reset(mock_data):
     """
     Test the reset method of the TradingEnvironment class.
@@ -51,7 +78,7 @@ def test_trading_environment_reset(mock_data):
     assert env.done == False
     assert env.current_step == 0
     assert env.position == 0
-    assert state.equals(mock_data.iloc[0, :])
+    assert np.array_equal(state, mock_data.iloc[0, :].to_numpy(dtype=np.float32))
 
 
 def test_trading_environment_step_sell(mock_data):
@@ -69,7 +96,7 @@ def test_trading_environment_step_sell(mock_data):
     assert env.reward == np.exp(0.1)
     assert env.current_step == 1
     assert done == False
-    assert next_state.equals(mock_data.iloc[1, :])
+    assert np.array_equal(next_state, mock_data.iloc[1, :].to_numpy(dtype=np.float32))
     assert reward == env.reward
 
 
@@ -86,7 +113,7 @@ def test_trading_environment_step_buy(mock_data):
     assert env.reward == 0
     assert env.current_step == 1
     assert done == False
-    assert next_state.equals(mock_data.iloc[1, :])
+    assert np.array_equal(next_state, mock_data.iloc[1, :].to_numpy(dtype=np.float32))
     assert reward == env.reward
 
 
@@ -103,7 +130,7 @@ def test_trading_environment_step_hold(mock_data):
     assert env.reward == 0
     assert env.current_step == 1
     assert done == False
-    assert next_state.equals(mock_data.iloc[1, :])
+    assert np.array_equal(next_state, mock_data.iloc[1, :].to_numpy(dtype=np.float32))
     assert reward == env.reward
 
 
@@ -129,7 +156,25 @@ def test_trading_environment_get_state(mock_data):
 
     state = env._get_state()
 
-    assert state.equals(mock_data.iloc[1, :])
+    assert np.array_equal(state, mock_data.iloc[1, :].to_numpy(dtype=np.float32))
+    assert state.dtype == np.float32
+    # The state is a view of the feature matrix rather than a copy
+    assert np.shares_memory(state, env.features)
+
+
+def test_trading_environment_logging(mock_data, capsys):
+    """
+    Test that the step method only prints when verbose, and then every log_interval steps.
+    """
+    env = TradingEnvironment(mock_data)
+    env.step(0)
+    assert capsys.readouterr().out == ""
+
+    env = TradingEnvironment(mock_data, verbose=True, log_interval=2)
+    env.step(0)
+    assert capsys.readouterr().out == ""
+    env.step(0)
+    assert "Step: 2" in capsys.readouterr().out
 
 
 def test_trading_environment_render(mock_data):
@@ -149,3 +194,89 @@ def test_trading_environment_calculate_fee(mock_data):
     fee = env.calculate_fee(1000000)
 
     assert fee == 1000000 * 0.0026  # Check that the correct fee tier is used
+
+
+def test_vec_trading_environment_initialization(mock_data):
+    """
+    Test the initialization of the VecTradingEnvironment class.
+    """
+    env = VecTradingEnvironment(
+        mock_data, start_offsets=[0, 1], initial_balances=[10000, 500]
+    )
+    assert env.num_envs == 2
+    assert np.array_equal(env.balances, [10000, 500])
+    assert np.array_equal(env.current_steps, [0, 1])
+    assert np.array_equal(env.positions, [0, 0])
+    assert np.array_equal(env.total_volumes, [0, 0])
+
+
+def test_vec_trading_environment_reset(mock_data):
+    """
+    Test the reset method of the VecTradingEnvironment class.
+    """
+    env = VecTradingEnvironment(mock_data, start_offsets=[0, 1])
+    env.step([1, 1])
+    states = env.reset()
+
+    assert states.shape == (2, 2)
+    assert np.array_equal(states, mock_data.to_numpy(dtype=np.float32)[[0, 1]])
+    assert np.array_equal(env.balances, [10000, 10000])
+    assert np.array_equal(env.positions, [0, 0])
+    assert not env.dones.any()
+
+
+def test_vec_trading_environment_step_matches_single_environment(mock_data):
+    """
+    Test that stepping the VecTradingEnvironment matches stepping a TradingEnvironment per environment.
+    """
+    actions = [[1, 0, 2], [0, 1, 1], [2, 2, 0]]
+    vec_env = VecTradingEnvironment(mock_data, num_envs=3)
+    single_envs = [TradingEnvironment(mock_data) for _ in range(3)]
+    single_envs[2].position = vec_env.positions[2] = 1
+
+    for step_actions in actions:
+        states, rewards, dones = vec_env.step(step_actions)
+        for i, env in enumerate(single_envs):
+            state, reward, done = env.step(step_actions[i])
+            assert np.array_equal(states[i], state)
+            assert rewards[i] == reward
+            assert dones[i] == done
+            assert vec_env.balances[i] == env.balance
+            assert vec_env.positions[i] == env.position
+            assert vec_env.total_volumes[i] == env.total_volume
+
+
+def test_vec_trading_environment_calculate_fees(mock_data):
+    """
+    Test that each environment pays fees from its own tier table.
+    """
+    cheap_tiers = [(-np.inf, 0.001)]
+    env = VecTradingEnvironment(
+        mock_data,
+        num_envs=2,
+        fee_tiers=[cheap_tiers, [(1000, 0.0001), (-np.inf, 0.01)]],
+    )
+    env.total_volumes = np.array([0.0, 2000.0])
+
+    fees = env.calculate_fees(np.array([1000.0, 1000.0]))
+
+    assert np.allclose(fees, [1.0, 0.1])
+
+
+def test_vec_trading_environment_calculate_fees_below_every_tier(mock_data):
+    """
+    Test that an environment below every volume threshold pays the rate of the last tier of its table.
+    """
+    env = VecTradingEnvironment(
+        mock_data,
+        num_envs=2,
+        fee_tiers=[
+            [(1000, 0.0001), (500, 0.001)],
+            [(1000, 0.0001), (500, 0.001), (100, 0.01)],
+        ],
+    )
+    env.total_volumes = np.array([0.0, 0.0])
+
+    fees = env.calculate_fees(np.array([1000.0, 1000.0]))
+
+    assert np.allclose(fees, [1.0, 10.0])
@@ -0,0 +1,167 @@
+"""
+This module contains tests for the ReplayBuffer class in the replay_buffer module.
+
+Tests cover the initialization, adding experiences, wrapping of the write cursor, and sampling, as well as the
+SumTree and PrioritizedReplayBuffer classes used for prioritized experience replay.
+"""
+
+import numpy as np
+import pytest
+from src.learning.rl.replay_buffer import (
+    ReplayBuffer,
+    SumTree,
+    PrioritizedReplayBuffer,
+)
+
+
+@pytest.fixture
+def buffer():
+    """
+    A pytest fixture that creates a small ReplayBuffer for testing.
+    """
+    return ReplayBuffer(capacity=4, state_size=3, seed=0)
+
+
+def test_replay_buffer_initialization(buffer):
+    """
+    Test the initialization of the ReplayBuffer class.
+    """
+    assert len(buffer) == 0
+    assert buffer.states.shape == (4, 3)
+    assert buffer.states.dtype == np.float32
+    assert buffer.next_states.shape == (4, 3)
+    assert buffer.actions.dtype == np.int8
+    assert buffer.rewards.dtype == np.float32
+    assert buffer.dones.dtype == np.int8
+
+
+def test_replay_buffer_add(buffer):
+    """
+    Test the add method of the ReplayBuffer class.
+    """
+    index = buffer.add(np.array([1, 2, 3]), 2, 0.5, np.array([4, 5, 6]), True)
+
+    assert index == 0
+    assert len(buffer) == 1
+    assert np.array_equal(buffer.states[0], [1, 2, 3])
+    assert buffer.actions[0] == 2
+    assert buffer.rewards[0] == 0.5
+    assert np.array_equal(buffer.next_states[0], [4, 5, 6])
+    assert buffer.dones[0] == 1
+
+
+def test_replay_buffer_wraps_around(buffer):
+    """
+    Test that the write cursor wraps around and overwrites the oldest experiences.
+    """
+    for i in range(6):
+        buffer.add(np.full(3, i), 0, i, np.full(3, i), False)
+
+    assert len(buffer) == 4
+    assert buffer.position == 2
+    assert sorted(buffer.rewards.tolist()) == [2, 3, 4, 5]
+
+
+def test_replay_buffer_add_batch(buffer):
+    """
+    Test that add_batch writes consecutive slots and wraps around the end of the buffer.
+    """
+    buffer.add(np.zeros(3), 0, 0, np.zeros(3), False)
+    indices = buffer.add_batch(
+        np.ones((4, 3)),
+        np.array([1, 2, 1, 2]),
+        np.arange(4),
+        np.ones((4, 3)),
+        np.ones(4),
+    )
+
+    assert indices.tolist() == [1, 2, 3, 0]
+    assert len(buffer) == 4
+    assert buffer.position == 1
+    assert buffer.rewards.tolist() == [3, 0, 1, 2]
+    assert buffer.dones.tolist() == [1, 1, 1, 1]
+
+
+def test_replay_buffer_sample(buffer):
+    """
+    Test the sample method of the ReplayBuffer class.
+    """
+    for i in range(3):
+        buffer.add(np.full(3, i), i, i, np.full(3, i + 1), False)
+
+    states, actions, rewards, next_states, dones = buffer.sample(8)
+
+    assert states.shape == (8, 3)
+    assert next_states.shape == (8, 3)
+    assert actions.shape == rewards.shape == dones.shape == (8,)
+    # Only filled slots may be sampled
+    assert set(rewards.tolist()) <= {0, 1, 2}
+    assert np.array_equal(states[:, 0], rewards)
+    assert np.array_equal(next_states[:, 0], rewards + 1)
+
+
+def test_sum_tree_update_and_total():
+    """
+    Test that updating leaves of the SumTree keeps the root equal to the sum of the priorities.
+    """
+    tree = SumTree(5)
+    tree.update([0, 1, 2, 3, 4], [1.0, 2.0, 3.0, 4.0, 5.0])
+    assert tree.total() == 15.0
+
+    tree.update([2], [0.0])
+    assert tree.total() == 12.0
+    assert np.array_equal(tree.get([0, 2, 4]), [1.0, 0.0, 5.0])
+
+
+def test_sum_tree_find():
+    """
+    Test that the SumTree maps values to the leaf whose cumulative range contains them.
+    """
+    tree = SumTree(4)
+    tree.update([0, 1, 2, 3], [1.0, 2.0, 3.0, 4.0])
+
+    indices = tree.find(np.array([0.5, 1.5, 2.9, 3.5, 6.1, 9.9]))
+
+    assert indices.tolist() == [0, 1, 1, 2, 3, 3]
+
+
+def test_prioritized_replay_buffer_sampling_follows_priorities():
+    """
+    Test that the PrioritizedReplayBuffer samples high-priority experiences more often.
+    """
+    buffer = PrioritizedReplayBuffer(capacity=4, state_size=1, alpha=1.0, seed=0)
+    for i in range(4):
+        buffer.add(np.array([i]), 0, i, np.array([i]), False)
+
+    buffer.update_priorities(np.arange(4), np.array([0.0, 0.0, 0.0, 10.0]))
+    indices = buffer.sample_indices(100)
+
+    assert np.mean(indices == 3) > 0.9
+
+
+def test_prioritized_replay_buffer_importance_weights():
+    """
+    Test that the importance-sampling weights down-weight frequently sampled experiences.
+    """
+    buffer = PrioritizedReplayBuffer(capacity=4, state_size=1, alpha=1.0, seed=0)
+    for i in range(2):
+        buffer.add(np.array([i]), 0, i, np.array([i]), False)
+
+    buffer.update_priorities(np.array([0, 1]), np.array([1.0, 3.0]))
+    weights = buffer.importance_weights(np.array([0, 1]))
+
+    assert weights.max() == 1.0
+    assert weights[0] == 1.0
+    assert weights[1] < weights[0]
+
+
+def test_prioritized_replay_buffer_new_experiences_get_max_priority():
+    """
+    Test that new experiences are stored with the highest priority seen so far.
+    """
+    buffer = PrioritizedReplayBuffer(capacity=4, state_size=1, alpha=1.0, seed=0)
+    buffer.add(np.array([0]), 0, 0, np.array([0]), False)
+    buffer.update_priorities(np.array([0]), np.array([5.0]))
+    buffer.add(np.array([1]), 0, 0, np.array([1]), False)
+
+    assert np.isclose(buffer.tree.get([1])[0], 5.0 + buffer.epsilon)
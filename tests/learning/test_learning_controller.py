@@ -6,10 +6,17 @@ Tests cover the training of a DQN model and loading a trained model from a file.
 
 import os
 import pytest
+import numpy as np
 import pandas as pd
 from keras.models import Sequential
 
-from src.learning.learning_controller import train_model, load_trained_model, BATCH_SIZE
+from src.learning.learning_controller import (
+    train_model,
+    train_model_vectorized,
+    train_model_parallel,
+    load_trained_model,
+    BATCH_SIZE,
+)
 
 
 @pytest.fixture
@@ -51,6 +58,91 @@ def test_train_model(mocker, mock_data, tmpdir):
     instance.replay.assert_called()
 
 
+def test_train_model_vectorized(mocker, mock_data, tmpdir):
+    """
+    Test the train_model_vectorized function from the learning_controller module.
+    """
+    mock_model = mocker.patch("src.learning.learning_controller.dqn.DQN")
+    instance = mock_model.return_value
+    instance.model = Sequential()
+    instance.act_batch.side_effect = lambda states: np.ones(len(states), dtype=int)
+    instance.memory = [(0, 0, 0, 0, False)] * (BATCH_SIZE + 1)
+
+    model, scaler = train_model_vectorized(mock_data, tmpdir, num_envs=2)
+
+    assert isinstance(model, Sequential)
+    instance.save_model.assert_called_once_with(os.path.join(tmpdir, "dqn_model.h5"))
+    instance.replay.assert_called()
+
+    # Each step stores one experience per environment
+    states = instance.remember_batch.call_args_list[0][0][0]
+    assert states.shape == (2, 2)
+
+
+def test_train_model_vectorized_settings(mocker, mock_data, tmpdir):
+    """
+    Test that train_model_vectorized uses the given training settings and DQN parameters.
+    """
+    mock_model = mocker.patch("src.learning.learning_controller.dqn.DQN")
+    instance = mock_model.return_value
+    instance.model = Sequential()
+    instance.act_batch.side_effect = lambda states: np.zeros(len(states), dtype=int)
+    instance.memory = [(0, 0, 0, 0, False)] * 5
+
+    train_model_vectorized(
+        mock_data,
+        tmpdir,
+        num_envs=2,
+        num_episodes=3,
+        max_steps=1,
+        batch_size=4,
+        dqn_params={"gamma": 0.9},
+    )
+
+    mock_model.assert_called_once_with(2, 3, gamma=0.9)
+    assert instance.remember_batch.call_count == 3
+    instance.replay.assert_called_with(4)
+
+
+def test_train_model_parallel(tmpdir):
+    """
+    Test the train_model_parallel function from the learning_controller module with real actor processes.
+    """
+    data = pd.DataFrame(
+        {
+            "Close": [float(i) for i in range(40)],
+            "log_return": [0.01] * 40,
+            "target": [0, 1] * 20,
+        }
+    )
+
+    model, scaler = train_model_parallel(data, tmpdir, num_actors=2, num_updates=2)
+
+    assert isinstance(model, Sequential)
+    assert os.path.exists(os.path.join(tmpdir, "dqn_model.h5"))
+
+
+def test_train_model_parallel_actors_exited(mocker, tmpdir):
+    """
+    Test that the learner raises instead of waiting forever when every actor process exits early.
+    """
+    data = pd.DataFrame(
+        {
+            "Close": [float(i) for i in range(40)],
+            "log_return": [0.01] * 40,
+            "target": [0, 1] * 20,
+        }
+    )
+    # len fails on the actor arguments, so every actor process exits with an error right after it starts
+    mocker.patch("src.learning.learning_controller.run_actor", len)
+    mocker.patch("src.learning.learning_controller.QUEUE_TIMEOUT", 0.1)
+
+    with pytest.raises(RuntimeError, match="actor processes exited"):
+        train_model_parallel(data, tmpdir, num_actors=2, num_updates=2)
+
+    assert not os.path.exists(os.path.join(tmpdir, "dqn_model.h5"))
+
+
 def test_load_trained_model(mocker, tmpdir):
     """
     Test the load_trained_model function from the learning_controller module.
@@ -0,0 +1,117 @@
+"""
+This module contains tests for the search strategies in the hyperparameter_search module.
+
+Tests cover expanding and sampling configurations, evaluating trials in worker processes,
+and the grid, random, successive halving and Hyperband searches.
+"""
+
+import pytest
+from src.tuning import hyperparameter_search as hs
+from src.tuning.results_store import ResultsStore
+
+
+def quadratic_objective(config, budget):
+    """
+    A cheap objective peaking at x == 3, which improves slightly with budget.
+    """
+    return -((config["x"] - 3) ** 2) + 0.01 * budget
+
+
+@pytest.fixture
+def store(tmpdir):
+    """
+    A pytest fixture that creates a ResultsStore in a temporary directory.
+    """
+    return ResultsStore(str(tmpdir))
+
+
+def test_grid_configs():
+    """
+    Test that grid_configs expands every combination of values.
+    """
+    configs = hs.grid_configs({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(configs) == 6
+    assert {"a": 2, "b": "z"} in configs
+
+
+def test_sample_configs():
+    """
+    Test that sample_configs draws from lists and callables reproducibly.
+    """
+    distributions = {"a": [1, 2, 3], "lr": hs.log_uniform(1e-4, 1e-2)}
+    configs = hs.sample_configs(distributions, 10, seed=0)
+
+    assert len(configs) == 10
+    assert all(config["a"] in (1, 2, 3) for config in configs)
+    assert all(1e-4 <= config["lr"] <= 1e-2 for config in configs)
+    assert isinstance(configs[0]["a"], int)
+    assert configs == hs.sample_configs(distributions, 10, seed=0)
+
+
+def test_run_trials():
+    """
+    Test that run_trials evaluates configurations in worker processes and keeps their order.
+    """
+    configs = [{"x": 1}, {"x": 3}, {"x": 5}]
+    scores = hs.run_trials(quadratic_objective, configs, budget=1, max_workers=2)
+    assert scores == [quadratic_objective(config, 1) for config in configs]
+
+
+def test_run_trials_without_configs():
+    """
+    Test that run_trials returns no scores, without starting a pool, when there are no configurations.
+    """
+    assert hs.run_trials(quadratic_objective, [], budget=1) == []
+
+
+def test_grid_search(store):
+    """
+    Test that grid_search ranks the best configuration first and records every trial.
+    """
+    results = hs.grid_search(
+        quadratic_objective, {"x": [0, 2, 3, 6]}, 1, store, max_workers=2
+    )
+
+    assert results[0][0] == {"x": 3}
+    assert len(store.load()) == 4
+
+
+def test_random_search(store):
+    """
+    Test that random_search evaluates the requested number of trials.
+    """
+    results = hs.random_search(
+        quadratic_objective, {"x": [0, 1, 2, 3]}, 5, 1, store, max_workers=2, seed=0
+    )
+
+    assert len(results) == 5
+    assert results[0][1] >= results[-1][1]
+    assert len(store.load()) == 5
+
+
+def test_successive_halving_terminates_weak_trials(store):
+    """
+    Test that successive_halving only promotes the best trials to larger budgets.
+    """
+    configs = [{"x": x} for x in range(9)]
+    results = hs.successive_halving(
+        quadratic_objective, configs, 1, 9, store, eta=3, max_workers=2
+    )
+
+    assert results == [({"x": 3}, quadratic_objective({"x": 3}, 9))]
+    recorded = store.load()
+    assert recorded.groupby("budget").size().to_dict() == {1: 9, 3: 3, 9: 1}
+
+
+def test_hyperband(store):
+    """
+    Test that hyperband runs a bracket per budget level and returns the best configuration first.
+    """
+    results = hs.hyperband(
+        quadratic_objective, {"x": list(range(7))}, 1, 9, store, max_workers=2, seed=0
+    )
+
+    recorded = store.load()
+    final = recorded[recorded["budget"] == 9]
+    assert results[0][1] == final["score"].max()
+    assert set(recorded["bracket"]) == {0, 1, 2}
@@ -0,0 +1,34 @@
+"""
+This module contains tests for the ResultsStore class in the results_store module.
+"""
+
+from src.tuning.results_store import ResultsStore
+
+
+def test_results_store_append_and_load(tmpdir):
+    """
+    Test that appended results are loaded back, including across store instances.
+    """
+    store = ResultsStore(str(tmpdir))
+    assert store.load().empty
+
+    store.append({"config": {"gamma": 0.9}, "budget": 1, "score": 1.5})
+    ResultsStore(str(tmpdir)).append(
+        {"config": {"gamma": 0.99}, "budget": 3, "score": 2.0}
+    )
+
+    results = store.load()
+    assert len(results) == 2
+    assert results["config"].tolist() == [{"gamma": 0.9}, {"gamma": 0.99}]
+    assert "recorded_at" in results.columns
+
+
+def test_results_store_best(tmpdir):
+    """
+    Test that best returns the highest scoring results first.
+    """
+    store = ResultsStore(str(tmpdir))
+    for score in [1.0, 3.0, 2.0]:
+        store.append({"config": {}, "budget": 1, "score": score})
+
+    assert store.best(2)["score"].tolist() == [3.0, 2.0]
@@ -0,0 +1,72 @@
+"""
+This module contains tests for the tuning_controller module.
+
+Tests cover scoring a trained policy, evaluating a trial configuration, and dispatching to the search methods.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from src.learning.rl.models.dqn import DQN
+from src.tuning import tuning_controller
+
+
+@pytest.fixture
+def mock_data():
+    """
+    A pytest fixture that creates a mock DataFrame for testing.
+    """
+    df = pd.DataFrame(
+        {
+            "Close": np.linspace(1, 2, 20),
+            "log_return": [0.01] * 20,
+            "target": [1] * 20,
+        }
+    )
+    return df
+
+
+def test_score_policy(mock_data):
+    """
+    Test that score_policy returns the final balance relative to the initial balance.
+    """
+    scaler = MinMaxScaler().fit(mock_data[["Close"]])
+    model = DQN(2, 3).model
+
+    score = tuning_controller.score_policy(model, mock_data, scaler)
+
+    assert isinstance(score, float)
+    assert 0 < score < 2
+
+
+def test_evaluate_trial_splits_config(mocker, mock_data):
+    """
+    Test that evaluate_trial passes training parameters to the training loop and the rest to the DQN.
+    """
+    mock_train = mocker.patch(
+        "src.tuning.tuning_controller.learning_controller.train_model",
+        return_value=(mocker.Mock(), mocker.Mock()),
+    )
+    mocker.patch("src.tuning.tuning_controller.score_policy", return_value=1.1)
+
+    score = tuning_controller.evaluate_trial(
+        {"gamma": 0.9, "batch_size": 32}, 3, mock_data
+    )
+
+    assert score == 1.1
+    kwargs = mock_train.call_args[1]
+    assert kwargs["num_episodes"] == 3
+    assert kwargs["batch_size"] == 32
+    assert kwargs["dqn_params"] == {"gamma": 0.9}
+
+
+def test_tune_hyperparameters_unknown_method(mock_data, tmpdir):
+    """
+    Test that tune_hyperparameters rejects unknown search methods.
+    """
+    with pytest.raises(ValueError):
+        tuning_controller.tune_hyperparameters(
+            mock_data, results_dir=str(tmpdir), method="bayesian"
+        )
@@ -0,0 +1,166 @@
+"""
+This module contains tests for the StageCache class in the stage_cache module.
+
+Tests cover reusing stored stage results, invalidating them when inputs, parameters or code change (including the
+code of the modules a stage depends on), recomputing unreadable results, and size-based eviction.
+"""
+
+import importlib
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.stage_cache import StageCache
+
+
+def scale(df, factor=2):
+    """
+    A stage that scales a DataFrame.
+    """
+    return df * factor
+
+
+def scale_and_shift(df, factor=2):
+    """
+    A stage with the same parameters as `scale` but different code.
+    """
+    return df * factor + 1
+
+
+@pytest.fixture
+def df():
+    """
+    A pytest fixture that creates a DataFrame for testing.
+    """
+    return pd.DataFrame({"Close": [1.0, 2.0, 3.0]})
+
+
+def test_run_reuses_stored_result(df, tmpdir, mocker):
+    """
+    Test that a stage with unchanged inputs and parameters is only run once.
+    """
+    stage = mocker.Mock(wraps=scale)
+    stage_cache = StageCache(str(tmpdir))
+
+    first = stage_cache.run(stage, df, factor=3)
+    second = stage_cache.run(stage, df.copy(), factor=3)
+
+    assert stage.call_count == 1
+    pd.testing.assert_frame_equal(first, df * 3)
+    pd.testing.assert_frame_equal(second, df * 3)
+
+
+def test_run_reruns_when_inputs_or_parameters_change(df, tmpdir, mocker):
+    """
+    Test that changing the input data or a parameter runs the stage again.
+    """
+    stage = mocker.Mock(wraps=scale)
+    stage_cache = StageCache(str(tmpdir))
+
+    stage_cache.run(stage, df, factor=3)
+    stage_cache.run(stage, df, factor=4)
+    changed = df.copy()
+    changed.iloc[0, 0] = 10.0
+    result = stage_cache.run(stage, changed, factor=3)
+
+    assert stage.call_count == 3
+    pd.testing.assert_frame_equal(result, changed * 3)
+
+
+def test_run_ignores_listed_parameters(df, tmpdir, mocker):
+    """
+    Test that keyword arguments listed in `ignore` are passed to the stage but left out of the key.
+    """
+    stage = mocker.Mock(side_effect=lambda df, session=None: df)
+    stage_cache = StageCache(str(tmpdir))
+
+    stage_cache.run(stage, df, session=object(), ignore=("session",))
+    stage_cache.run(stage, df, session=object(), ignore=("session",))
+
+    assert stage.call_count == 1
+
+
+def test_key_depends_on_code(df, tmpdir):
+    """
+    Test that stage functions with different code get different keys for the same arguments.
+    """
+    stage_cache = StageCache(str(tmpdir))
+
+    assert stage_cache.key(scale, df, factor=2) == stage_cache.key(scale, df, factor=2)
+    assert stage_cache.key(scale, df, factor=2) != stage_cache.key(
+        scale_and_shift, df, factor=2
+    )
+
+
+def test_key_depends_on_code_of_dependencies(df, tmpdir, monkeypatch):
+    """
+    Test that changing a function the stage calls from another module of its package changes the key.
+    """
+    package = tmpdir.mkdir("stagepkg")
+    package.join("__init__.py").write("")
+    package.join("helpers.py").write("def factor():\n    return 2\n")
+    package.join("stages.py").write(
+        "from stagepkg.helpers import factor\n\n\ndef stage(df):\n    return df * factor()\n"
+    )
+    monkeypatch.syspath_prepend(str(tmpdir))
+    stages = importlib.import_module("stagepkg.stages")
+    stage_cache = StageCache(str(tmpdir.mkdir("cache")))
+
+    key = stage_cache.key(stages.stage, df)
+    package.join("helpers.py").write("def factor():\n    return 3  # changed\n")
+    importlib.reload(importlib.import_module("stagepkg.helpers"))
+    stages = importlib.reload(stages)
+
+    assert stage_cache.key(stages.stage, df) != key
+
+
+def test_run_recomputes_unreadable_result(df, tmpdir, mocker):
+    """
+    Test that a corrupt stored result is treated as missing and overwritten.
+    """
+    stage = mocker.Mock(wraps=scale)
+    stage_cache = StageCache(str(tmpdir))
+    with open(stage_cache._path(stage_cache.key(stage, df)), "wb") as f:
+        f.write(b"not a joblib file")
+
+    result = stage_cache.run(stage, df)
+    again = stage_cache.run(stage, df)
+
+    assert stage.call_count == 1
+    pd.testing.assert_frame_equal(result, df * 2)
+    pd.testing.assert_frame_equal(again, df * 2)
+
+
+def test_evicts_least_recently_used(tmpdir):
+    """
+    Test that the least recently used results are evicted once the cache exceeds max_bytes.
+    """
+    stage_cache = StageCache(str(tmpdir))
+    arrays = [np.full(1000, i, dtype=np.float64) for i in range(3)]
+
+    stage_cache.run(scale, arrays[0])
+    size = sum(os.path.getsize(tmpdir.join(name)) for name in os.listdir(tmpdir))
+    stage_cache.max_bytes = 2 * size
+
+    paths = [stage_cache._path(stage_cache.key(scale, array)) for array in arrays]
+    os.utime(paths[0], (0, 0))
+    stage_cache.run(scale, arrays[1])
+    stage_cache.run(scale, arrays[2])
+
+    assert not os.path.exists(paths[0])
+    assert os.path.exists(paths[1])
+    assert os.path.exists(paths[2])
+
+
+def test_clear(df, tmpdir):
+    """
+    Test that clear removes every stored result.
+    """
+    stage_cache = StageCache(str(tmpdir))
+    stage_cache.run(scale, df)
+
+    stage_cache.clear()
+
+    assert os.listdir(tmpdir) == []